@@ -0,0 +1,90 @@
+"""Thousands of concurrent coroutine lookups: blocking vs executor vs coalesced.
+
+Usage: python benchmarks/bench_aio.py [--coroutines 1000,5000,20000] [--workers 4]
+
+Every coroutine looks up one random IATA code. "blocking" calls GlobeLogDB
+straight from the coroutine (what the gateway does today), "executor" sends
+each lookup to a thread pool on its own, and "coalesced" uses
+AsyncGlobeLogDB.lookup. A heartbeat task that should wake every millisecond
+records the worst event-loop stall each strategy causes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from globelog.aio import AsyncGlobeLogDB  # noqa: E402
+from globelog.data import load_airports  # noqa: E402
+from globelog.db import GlobeLogDB  # noqa: E402
+
+HEARTBEAT_SECONDS = 0.001
+
+
+async def heartbeat(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        worst = max(worst, time.perf_counter() - start - HEARTBEAT_SECONDS)
+    return worst
+
+
+async def measure(lookup: Callable[[str], Awaitable[object]], codes: List[str]) -> Tuple[float, float]:
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await asyncio.gather(*(lookup(code) for code in codes))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await monitor
+
+
+async def run(coroutines: int, workers: int) -> None:
+    rng = random.Random(coroutines)
+    codes = rng.choices(list(load_airports()), k=coroutines)
+    loop = asyncio.get_running_loop()
+
+    with GlobeLogDB() as db, ThreadPoolExecutor(max_workers=workers) as pool:
+        async def blocking(code: str):
+            return db.airport_by_iata(code)
+
+        async def executor(code: str):
+            return await loop.run_in_executor(pool, db.airport_by_iata, code)
+
+        results = {"blocking": await measure(blocking, codes), "executor": await measure(executor, codes)}
+
+    async with AsyncGlobeLogDB(max_workers=workers) as adb:
+        results["coalesced"] = await measure(adb.lookup, codes)
+        batches = adb.batches
+
+    print(f"{coroutines} concurrent lookups ({workers} workers):")
+    for name, (elapsed, stall) in results.items():
+        print(
+            f"  {name:<10} {elapsed * 1e3:>9.1f} ms  {coroutines / elapsed:>10,.0f} lookups/s  "
+            f"worst loop stall {stall * 1e3:>7.1f} ms"
+        )
+    print(f"  coalesced into {batches} IN queries")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--coroutines", default="1000,5000,20000")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    for count in (int(value) for value in args.coroutines.split(",")):
+        asyncio.run(run(count, args.workers))
+
+
+if __name__ == "__main__":
+    main()
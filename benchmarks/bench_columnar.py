@@ -0,0 +1,97 @@
+"""Load time of the Parquet and Arrow IPC exports against csv.DictReader.
+
+Usage: python benchmarks/bench_columnar.py [--scale 100] [--runs 7]
+
+The curated airports CSV is repeated ``--scale`` times with unique codes
+and exported to both formats in a temporary directory. Each reader loads
+all columns and then only the (iata, latitude_deg, longitude_deg) subset
+most analytics jobs need. The CSV rows must be parsed in full either way,
+and the subset read also converts the coordinates to floats. The columnar
+subset reads copy the coordinates into NumPy, so the mapped Arrow pages are
+actually touched; the full Arrow read only maps the file. Files are read
+warm from the page cache; medians of ``--runs``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from globelog.columnar import airports_table, read_table, write_arrow, write_parquet  # noqa: E402
+from globelog.data import load_airports  # noqa: E402
+from suite import write_scaled_curated_airports  # noqa: E402
+
+SUBSET = ["iata", "latitude_deg", "longitude_deg"]
+
+
+def median_seconds(run: Callable[[], object], runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def read_csv(path: Path) -> list:
+    with path.open(newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def read_csv_subset(path: Path) -> list:
+    with path.open(newline="", encoding="utf-8") as handle:
+        return [
+            (row["iata"], float(row["latitude_deg"]), float(row["longitude_deg"]))
+            for row in csv.DictReader(handle)
+        ]
+
+
+def read_subset(path: Path) -> None:
+    table = read_table(path, SUBSET)
+    table.column("latitude_deg").to_numpy()
+    table.column("longitude_deg").to_numpy()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        source = Path(workdir) / "airports.csv"
+        write_scaled_curated_airports(source, args.scale)
+        table = airports_table(load_airports(source).values())
+        parquet, arrow = Path(workdir) / "airports.parquet", Path(workdir) / "airports.arrow"
+        write_parquet(table, parquet)
+        write_arrow(table, arrow)
+
+        cases = (
+            ("csv.DictReader", source, read_csv, read_csv_subset),
+            ("Parquet", parquet, read_table, read_subset),
+            ("Arrow IPC (mmap)", arrow, read_table, read_subset),
+        )
+        print(f"Loading {table.num_rows:,} airports (median of {args.runs} warm runs):")
+        print(f"  {'':<18} {'file':>10}  {'all columns':>12}  {'3 columns':>12}")
+        baseline = None
+        for label, path, read_all, read_some in cases:
+            full = median_seconds(lambda: read_all(path), args.runs)
+            subset = median_seconds(lambda: read_some(path), args.runs)
+            baseline = baseline or (full, subset)
+            print(
+                f"  {label:<18} {path.stat().st_size / 1024:>6,.0f} KiB  "
+                f"{full * 1e3:8.2f} ms {baseline[0] / full:>4.0f}x  {subset * 1e3:8.2f} ms {baseline[1] / subset:>4.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Multi-threaded lookup throughput: GlobeLogDB against connect-per-request.
+
+Usage: python benchmarks/bench_db.py [--requests 20000] [--threads 1,2,4,8] [--churn 300]
+
+Each request is one lookup from a fixed mix (IATA, ICAO, country, timezone,
+full-text search). "per-request" mirrors what API servers did before: open
+``sqlite3.connect(DB_PATH)`` for every request and run ad-hoc SQL with
+``sqlite3.Row``. "GlobeLogDB" shares one instance across the worker threads.
+It then starts and joins ``--churn`` short-lived threads, one query each, and
+exits non-zero if their connections or file descriptors are still open.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from globelog.data import DB_PATH, load_airports  # noqa: E402
+from globelog.db import GlobeLogDB, match_expression  # noqa: E402
+
+Request = Tuple[str, str]
+
+
+def make_requests(count: int, seed: int = 11) -> List[Request]:
+    airports = list(load_airports().values())
+    rng = random.Random(seed)
+    kinds = ["iata"] * 50 + ["icao"] * 15 + ["country"] * 10 + ["timezone"] * 10 + ["search"] * 15
+    requests: List[Request] = []
+    for _ in range(count):
+        airport = rng.choice(airports)
+        kind = rng.choice(kinds)
+        value = {
+            "iata": airport.iata,
+            "icao": airport.icao_code or airport.iata,
+            "country": airport.iso_country,
+            "timezone": airport.timezone,
+            "search": airport.name.split()[0],
+        }[kind]
+        requests.append((kind, value))
+    return requests
+
+
+def per_request(request: Request) -> int:
+    kind, value = request
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        if kind == "search":
+            sql = (
+                "SELECT a.* FROM airport_search JOIN airport AS a ON a.rowid = airport_search.rowid "
+                "WHERE airport_search MATCH ? ORDER BY rank LIMIT 10"
+            )
+            value = match_expression(value)
+        else:
+            column = {"iata": "iata", "icao": "icao_code", "country": "country_code", "timezone": "timezone"}[kind]
+            sql = f"SELECT * FROM airport WHERE {column} = ?"
+        return len(conn.execute(sql, (value,)).fetchall())
+    finally:
+        conn.close()
+
+
+def service(db: GlobeLogDB) -> Callable[[Request], int]:
+    methods = {
+        "iata": lambda value: [db.airport_by_iata(value)],
+        "icao": lambda value: [db.airport_by_icao(value)],
+        "country": db.airports_in_country,
+        "timezone": db.airports_in_timezone,
+        "search": db.search,
+    }
+
+    def handle(request: Request) -> int:
+        kind, value = request
+        return len(methods[kind](value))
+
+    return handle
+
+
+def throughput(handler: Callable[[Request], int], requests: List[Request], threads: int) -> float:
+    chunks = [requests[index::threads] for index in range(threads)]
+
+    def work(chunk: List[Request]) -> None:
+        for request in chunk:
+            handler(request)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(work, chunks))
+    return len(requests) / (time.perf_counter() - start)
+
+
+def open_files() -> int:
+    return len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else 0
+
+
+def thread_churn(threads: int) -> bool:
+    """Query from ``threads`` short-lived threads in turn; True if nothing they opened is left open."""
+    with GlobeLogDB() as db:
+        db.airport_by_iata("LHR")
+        connections, files = db.open_connections(), open_files()
+        for _ in range(threads):
+            thread = threading.Thread(target=db.airport_by_iata, args=("LHR",))
+            thread.start()
+            thread.join()
+        leaked_connections = db.open_connections() - connections
+        leaked_files = open_files() - files
+    print(f"{threads} short-lived threads: {leaked_connections} connections and {leaked_files} file descriptors left open")
+    return leaked_connections <= 0 and leaked_files <= 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--churn", type=int, default=300)
+    args = parser.parse_args()
+
+    requests = make_requests(args.requests)
+    print(f"{args.requests} mixed requests against {DB_PATH.name}")
+    print(f"  {'threads':>7} {'per-request':>14} {'GlobeLogDB':>14} {'speedup':>8}")
+    for threads in (int(value) for value in args.threads.split(",")):
+        baseline = throughput(per_request, requests, threads)
+        with GlobeLogDB() as db:
+            pooled = throughput(service(db), requests, threads)
+        print(f"  {threads:>7} {baseline:>10,.0f} r/s {pooled:>10,.0f} r/s {pooled / baseline:>7.1f}x")
+    if not thread_churn(args.churn):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Delta patch size and apply time against shipping the whole database.
+
+Usage: python benchmarks/bench_delta.py [--runs 7]
+
+Each scenario edits a copy of the curated airports CSV, builds it into a
+temporary database and diffs that against data/globelog.sqlite:
+
+- one new airport;
+- one timezone override (an airport moved to another zone);
+- 100 airports renamed and moved;
+- 100 new airports.
+
+Apply time is the median of ``--runs`` applications to fresh copies of the
+base database. It includes the target content check and the FTS5 integrity
+check. Sizes are shown raw and gzip-compressed, as served over HTTP.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from itertools import product
+from pathlib import Path
+from string import ascii_uppercase
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import build_sqlite  # noqa: E402
+from delta_patch import apply_patch, create_delta  # noqa: E402
+from globelog._cache import FILE_CACHE  # noqa: E402
+from globelog.data import CURATED_AIRPORTS, DB_PATH  # noqa: E402
+from suite import patched  # noqa: E402
+
+Rows = List[Dict[str, str]]
+
+
+def add_airports(count: int) -> Callable[[Rows], None]:
+    def edit(rows: Rows) -> None:
+        taken = {row["iata"] for row in rows}
+        free = ("".join(letters) for letters in product(ascii_uppercase, repeat=3))
+        codes = [code for code in free if code not in taken][:count]
+        for index, code in enumerate(codes):
+            rows.append(dict(rows[index * 7], iata=code, name=f"New Field {index}"))
+
+    return edit
+
+
+def move_timezone(rows: Rows) -> None:
+    rows[10]["timezone"] = next(row["timezone"] for row in rows if row["timezone"] != rows[10]["timezone"])
+
+
+def rename_and_move(rows: Rows) -> None:
+    for row in rows[1000:1100]:
+        row["name"] += " (renamed)"
+        row["latitude_deg"] = f"{float(row['latitude_deg']) + 0.001:.6f}"
+
+
+SCENARIOS = (
+    ("1 new airport", add_airports(1)),
+    ("1 timezone override", move_timezone),
+    ("100 renamed and moved", rename_and_move),
+    ("100 new airports", add_airports(100)),
+)
+
+
+def build_target(workdir: Path, name: str, edit: Callable[[Rows], None]) -> Path:
+    with CURATED_AIRPORTS.open(newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        fieldnames, rows = reader.fieldnames, list(reader)
+    edit(rows)
+    source = workdir / f"{name}.csv"
+    with source.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    output = workdir / f"{name}.sqlite"
+    FILE_CACHE.clear()
+    with patched(build_sqlite, CURATED_AIRPORTS=source, OUTPUT_DB=output):
+        build_sqlite.build_database(force=True)
+    return output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    full = DB_PATH.read_bytes()
+    print(
+        f"Full database: {len(full) / 1024:,.0f} KiB raw, {len(gzip.compress(full)) / 1024:,.0f} KiB gzipped. "
+        f"Apply times are medians of {args.runs} runs."
+    )
+    print(f"  {'change':<22} {'patch':>10} {'gzipped':>10} {'create':>10} {'apply':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        work = Path(workdir)
+        for index, (label, edit) in enumerate(SCENARIOS):
+            target = build_target(work, f"target{index}", edit)
+            start = time.perf_counter()
+            patch = create_delta(DB_PATH, target).render()
+            created = time.perf_counter() - start
+            manifest = json.loads(build_sqlite.manifest_path(target).read_text(encoding="utf-8"))
+
+            timings = []
+            for run in range(args.runs):
+                copy = work / f"base{index}_{run}.sqlite"
+                shutil.copyfile(DB_PATH, copy)
+                start = time.perf_counter()
+                apply_patch(copy, patch, manifest)
+                timings.append(time.perf_counter() - start)
+                copy.unlink()
+
+            payload = patch.encode()
+            print(
+                f"  {label:<22} {len(payload):>8,} B {len(gzip.compress(payload)):>8,} B "
+                f"{created * 1e3:>7.1f} ms {statistics.median(timings) * 1e3:>7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Vectorised great-circle distances against a per-pair Python haversine loop.
+
+Usage: python benchmarks/bench_distance.py [--pairs 1000000] [--loop-sample 200000]
+
+The loop is what callers do today: look both airports up in load_airports()
+and call haversine on every leg. It is timed on ``--loop-sample`` pairs and
+extrapolated. The all-pairs matrix covers every curated airport, and the
+memory-mapped matrix is saved to a temporary directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from globelog.data import load_airports  # noqa: E402
+from globelog.distance import DistanceMatrix, default_table, distance_matrix, distances, save_matrix  # noqa: E402
+from nearby_airports import haversine_km  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=1_000_000)
+    parser.add_argument("--loop-sample", type=int, default=200_000)
+    args = parser.parse_args()
+
+    airports = load_airports()
+    codes = list(airports)
+    rng = random.Random(17)
+    pairs = np.array([(rng.choice(codes), rng.choice(codes)) for _ in range(args.pairs)], dtype="U3")
+    table = default_table()
+
+    sample = pairs[: args.loop_sample].tolist()
+    start = time.perf_counter()
+    for a, b in sample:
+        origin, destination = airports[a], airports[b]
+        haversine_km(origin.latitude_deg, origin.longitude_deg, destination.latitude_deg, destination.longitude_deg)
+    loop_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    distances(pairs, table)
+    vector_rate = len(pairs) / (time.perf_counter() - start)
+
+    print(f"{args.pairs:,} leg distances:")
+    print(f"  python haversine loop  {loop_rate:>12,.0f} pairs/s  ({args.pairs / loop_rate:6.2f} s extrapolated)")
+    print(f"  distances()            {vector_rate:>12,.0f} pairs/s  ({args.pairs / vector_rate:6.2f} s)  "
+          f"{vector_rate / loop_rate:.0f}x")
+
+    count = len(table)
+    for dtype in (np.float64, np.float32):
+        start = time.perf_counter()
+        matrix = distance_matrix(table=table, dtype=dtype)
+        elapsed = time.perf_counter() - start
+        print(
+            f"  distance_matrix({np.dtype(dtype).name}) {count}×{count}: {elapsed:6.2f} s, "
+            f"{count * count / elapsed:,.0f} pairs/s, {matrix.nbytes / 2**20:,.0f} MiB "
+            f"(loop would take {count * count / loop_rate:,.0f} s)"
+        )
+        del matrix
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "distance_matrix.npy"
+        start = time.perf_counter()
+        save_matrix(path=path, table=table)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        precomputed = DistanceMatrix(path)
+        opened = time.perf_counter() - start
+        start = time.perf_counter()
+        precomputed.distances(pairs)
+        lookup_rate = len(pairs) / (time.perf_counter() - start)
+        print(
+            f"  memory-mapped matrix: saved in {saved:.2f} s, opened in {opened * 1e3:.1f} ms, "
+            f"{lookup_rate:,.0f} pairs/s"
+        )
+        del precomputed
+
+
+if __name__ == "__main__":
+    main()
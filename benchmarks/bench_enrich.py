@@ -0,0 +1,113 @@
+"""Throughput and peak memory of ``globelog enrich`` against per-row SQLite lookups.
+
+Usage: python benchmarks/bench_enrich.py [--rows 1000000] [--baseline-rows 50000] [--workers N]
+
+Writes synthetic flight logs (flight number, origin, destination, UTC
+timestamp; about 0.1 % unknown codes) as CSV and JSON Lines in a temporary
+directory. Each is enriched in a fresh process, once with a single worker and
+once with ``--workers`` processes (default: CPU count). Peak RSS is the
+largest of the parent and its worker processes. The smaller files show
+whether memory grows with the input. The baseline is the current approach:
+two ``SELECT ... WHERE iata = ?`` queries per row against globelog.sqlite
+plus a haversine, timed on ``--baseline-rows`` rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import multiprocessing
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from globelog.data import DB_PATH, load_airports  # noqa: E402
+from nearby_airports import haversine_km  # noqa: E402
+
+CHILD = r"""
+import json, resource, sys
+from pathlib import Path
+sys.path.insert(0, {root!r})
+from globelog.enrich import enrich_file
+stats = enrich_file(Path({source!r}), Path({output!r}), workers={workers})
+peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+print(json.dumps({{"rate": stats.rows_per_second, "rss": peak}}))
+"""
+
+
+def write_logs(directory: Path, rows: int) -> tuple:
+    codes = list(load_airports())
+    rng = random.Random(rows)
+    source_csv, source_jsonl = directory / f"log{rows}.csv", directory / f"log{rows}.jsonl"
+    with source_csv.open("w", newline="", encoding="utf-8") as csv_handle, source_jsonl.open(
+        "w", encoding="utf-8"
+    ) as jsonl_handle:
+        writer = csv.writer(csv_handle)
+        writer.writerow(("flight", "origin", "destination", "timestamp"))
+        for index in range(rows):
+            origin = rng.choice(codes) if rng.random() > 0.001 else "ZZZ"
+            row = (f"GL{index % 10000:04d}", origin, rng.choice(codes), 1_700_000_000 + index * 37)
+            writer.writerow(row)
+            jsonl_handle.write(json.dumps(dict(zip(("flight", "origin", "destination", "timestamp"), row))) + "\n")
+    return source_csv, source_jsonl
+
+
+def enrich(source: Path, workers: int) -> dict:
+    output = source.with_name(f"enriched_{source.name}")
+    code = CHILD.format(root=str(ROOT), source=str(source), output=str(output), workers=workers)
+    result = json.loads(subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout)
+    output.unlink()
+    return result
+
+
+def per_row_sqlite(source: Path, rows: int) -> float:
+    conn = sqlite3.connect(DB_PATH)
+    query = "SELECT name, country_code, continent_code, timezone, latitude, longitude FROM airport WHERE iata = ?"
+    start = time.perf_counter()
+    with source.open(newline="", encoding="utf-8") as handle:
+        for count, row in enumerate(csv.DictReader(handle)):
+            if count == rows:
+                break
+            origin = conn.execute(query, (row["origin"],)).fetchone()
+            destination = conn.execute(query, (row["destination"],)).fetchone()
+            if origin and destination:
+                haversine_km(origin[4], origin[5], destination[4], destination[5])
+    conn.close()
+    return rows / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        sizes = sorted({args.rows // 10, args.rows})
+        files = {rows: write_logs(Path(workdir), rows) for rows in sizes}
+        baseline = per_row_sqlite(files[args.rows][0], args.baseline_rows)
+        print(f"Per-row SQLite lookups: {baseline:>10,.0f} rows/s (CSV, {args.baseline_rows:,} rows)")
+        for rows in sizes:
+            for index, label in enumerate(("CSV", "JSON Lines")):
+                source = files[rows][index]
+                size = source.stat().st_size / 2 ** 20
+                for workers in sorted({1, args.workers}):
+                    result = enrich(source, workers)
+                    print(
+                        f"globelog enrich {label:<10} {rows:>10,} rows ({size:5.0f} MiB) {workers} worker(s): "
+                        f"{result['rate']:>10,.0f} rows/s  {result['rate'] / baseline:4.1f}x  "
+                        f"peak RSS {result['rss'] / 1024:5.0f} MiB"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Cold open-all-flags time: the packed bundle against the flags/ directory.
+
+Usage: python benchmarks/bench_flags.py [--runs 7]
+
+Each run starts a fresh interpreter that first evicts the flag files and
+the bundle from the page cache (posix_fadvise DONTNEED, where the OS
+supports it; the directory entries themselves stay cached). It then reads
+every flag: the directory case lists flags/ with iterdir() and opens and
+reads each file, as validate_flags.py and the image service do; the bundle
+case opens data/flags.bundle and copies each flag out of the mapping. A
+warm pass (page cache populated) follows in the same process. Medians of
+``--runs`` runs. Needs data/flags.bundle (python export_flags.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from globelog.data import FLAGS_DIR  # noqa: E402
+from globelog.flags import FLAG_BUNDLE_PATH, FlagBundle, write_bundle  # noqa: E402
+
+CHILD = r"""
+import json, os, sys, time
+from pathlib import Path
+sys.path.insert(0, {root!r})
+from globelog.flags import FlagBundle
+
+def evict(path):
+    if hasattr(os, "posix_fadvise"):
+        fd = os.open(path, os.O_RDONLY)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        os.close(fd)
+
+def directory():
+    return sum(len(path.read_bytes()) for path in Path({flags!r}).iterdir() if path.is_file())
+
+def bundle():
+    with FlagBundle(Path({bundle!r})) as flags:
+        return sum(len(flags.read(code)) for code in flags)
+
+for path in Path({flags!r}).iterdir():
+    evict(path)
+evict({bundle!r})
+read = {{"directory": directory, "bundle": bundle}}[{case!r}]
+timings = []
+for _ in range(2):
+    start = time.perf_counter()
+    size = read()
+    timings.append(time.perf_counter() - start)
+print(json.dumps({{"cold": timings[0], "warm": timings[1], "bytes": size}}))
+"""
+
+
+def run(case: str) -> dict:
+    code = CHILD.format(root=str(ROOT), flags=str(FLAGS_DIR), bundle=str(FLAG_BUNDLE_PATH), case=case)
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+    if not FLAG_BUNDLE_PATH.exists():
+        write_bundle()
+    with FlagBundle() as bundle:
+        count = len(bundle)
+
+    print(f"Reading all {count} flags (median of {args.runs} fresh processes):")
+    print(f"  {'':<22} {'cold':>10} {'warm':>10}")
+    baseline = None
+    for label, case in (("flags/ directory", "directory"), ("flags.bundle (mmap)", "bundle")):
+        results = [run(case) for _ in range(args.runs)]
+        cold = statistics.median(result["cold"] for result in results)
+        warm = statistics.median(result["warm"] for result in results)
+        baseline = baseline or (cold, warm)
+        print(
+            f"  {label:<22} {cold * 1e3:>7.2f} ms {warm * 1e3:>7.2f} ms"
+            f"  ({baseline[0] / cold:.1f}x cold, {baseline[1] / warm:.1f}x warm)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Latency of trigram-backed fuzzy search versus a full Levenshtein scan.
+
+Usage: python benchmarks/bench_fuzzy.py [--repeat 50]
+
+The baseline is the fuzzy layer clients used to write: compute the full
+edit distance between the query and every word of every airport name.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import fuzzy_search  # noqa: E402
+
+QUERIES = ["dubia", "heatrow", "frankfrut", "sao paulo", "zurik", "new yrok", "heath", "sing", "lhr"]
+
+
+def levenshtein(source: str, target: str) -> int:
+    previous = list(range(len(target) + 1))
+    for i, source_char in enumerate(source, start=1):
+        current = [i]
+        for j, target_char in enumerate(target, start=1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (source_char != target_char))
+            )
+        previous = current
+    return previous[-1]
+
+
+def full_scan(airports: List[Tuple[str, List[str]]], query: str, limit: int = 10) -> List[str]:
+    terms = fuzzy_search.tokenize(query)
+    scored = []
+    for iata, words in airports:
+        score = sum(min(levenshtein(term, word) for word in words) for term in terms)
+        scored.append((score, iata))
+    scored.sort()
+    return [iata for _, iata in scored[:limit]]
+
+
+def latencies(func: Callable[[str], object], query: str, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    conn = fuzzy_search.connect()
+    airports = [
+        (iata, fuzzy_search.tokenize(f"{name} {municipality or ''} {iata}"))
+        for iata, name, municipality in conn.execute("SELECT iata, name, municipality FROM airport")
+    ]
+
+    print(f"{'query':<12} {'trigram ms (mean/p95)':>22} {'full scan ms':>14}  top hit")
+    for query in QUERIES:
+        indexed = latencies(lambda q: fuzzy_search.search(q, conn=conn), query, args.repeat)
+        scanned = latencies(lambda q: full_scan(airports, q), query, max(1, args.repeat // 10))
+        hits = fuzzy_search.search(query, limit=1, conn=conn)
+        top = f"{hits[0].iata} {hits[0].name}" if hits else "no hits"
+        p95 = statistics.quantiles(indexed, n=20)[-1] if len(indexed) > 1 else indexed[0]
+        print(
+            f"{query:<12} {statistics.mean(indexed):>12.2f} / {p95:>7.2f} "
+            f"{statistics.mean(scanned):>14.1f}  {top}"
+        )
+
+
+if __name__ == "__main__":
+    main()
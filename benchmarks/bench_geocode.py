@@ -0,0 +1,92 @@
+"""Batched reverse geocoding against a brute-force nearest-airport scan.
+
+Usage: python benchmarks/bench_geocode.py [--points 1000000] [--scan-sample 20000]
+
+Two point sets are geocoded with reverse_geocode(): points uniform over the
+globe (mostly ocean, far from any airport) and points jittered about half a
+degree around random airports (the flight-log case). The baseline is a
+vectorised NumPy scan, one matrix product of each point against every
+airport, timed on ``--scan-sample`` points and extrapolated; the same
+sample checks that the KD-tree returns the exact nearest airport. The cold
+build (parse the CSVs, build the tree, write the cache) is timed against
+loading the cache in a temporary directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from globelog.distance import unit_vectors  # noqa: E402
+from globelog.geocode import load_geocoder, reverse_geocode  # noqa: E402
+
+
+def scan(geocoder, latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    points = geocoder.tree.points
+    rows = [
+        np.argmax(unit_vectors(latitude[start : start + 1024], longitude[start : start + 1024]) @ points.T, axis=1)
+        for start in range(0, len(latitude), 1024)
+    ]
+    return np.concatenate(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--scan-sample", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cache = Path(workdir) / "reverse_geocoder.npz"
+        start = time.perf_counter()
+        load_geocoder(cache_path=cache)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        geocoder = load_geocoder(cache_path=cache)
+        warm = time.perf_counter() - start
+    print(f"{len(geocoder):,} airports: build and cache {cold * 1e3:.0f} ms, load cached {warm * 1e3:.1f} ms")
+
+    rng = np.random.default_rng(21)
+    uniform = (np.degrees(np.arcsin(rng.uniform(-1, 1, args.points))), rng.uniform(-180, 180, args.points))
+    points = geocoder.tree.points[rng.integers(0, len(geocoder), args.points)]
+    anchors = (np.degrees(np.arcsin(points[:, 2])), np.degrees(np.arctan2(points[:, 1], points[:, 0])))
+    near = (
+        np.clip(anchors[0] + rng.normal(0, 0.5, args.points), -90, 90),
+        (anchors[1] + rng.normal(0, 0.5, args.points) + 180) % 360 - 180,
+    )
+
+    print(f"{args.points:,} points:")
+    for label, (latitude, longitude) in (("uniform over the globe", uniform), ("near airports", near)):
+        sample = slice(0, args.scan_sample)
+        start = time.perf_counter()
+        expected = scan(geocoder, latitude[sample], longitude[sample])
+        scan_rate = args.scan_sample / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        result = reverse_geocode(latitude, longitude, geocoder)
+        rate = args.points / (time.perf_counter() - start)
+
+        # Ties are equally near; compare distances rather than rows.
+        chosen = unit_vectors(latitude[sample], longitude[sample])
+        exact = np.allclose(
+            np.einsum("ij,ij->i", chosen, geocoder.tree.points[result.row[sample]]),
+            np.einsum("ij,ij->i", chosen, geocoder.tree.points[expected]),
+            rtol=0,
+            atol=1e-12,
+        )
+        print(f"  {label}:")
+        print(f"    brute-force scan    {scan_rate:>12,.0f} points/s  ({args.points / scan_rate:6.2f} s extrapolated)")
+        print(f"    reverse_geocode()   {rate:>12,.0f} points/s  ({args.points / rate:6.2f} s)  "
+              f"{rate / scan_rate:.0f}x, {'exact' if exact else 'MISMATCH'} on the sample")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Vectorised to_local() against per-event zoneinfo conversion.
+
+Usage: python benchmarks/bench_localtime.py [--events 1000000] [--loop-sample 200000]
+
+Events are random (airport, UTC timestamp) pairs between 2000 and 2040.
+The loop is what callers do today: look the airport's timezone up in
+load_airports() and call datetime.fromtimestamp with a cached ZoneInfo per
+event. It is timed on ``--loop-sample`` events and extrapolated. Needs a
+globelog.sqlite built with the timezone transition tables.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from globelog.data import load_airports  # noqa: E402
+from globelog.localtime import TransitionTable, to_local  # noqa: E402
+from globelog.table import AirportTable  # noqa: E402
+
+START = 946684800  # 2000-01-01T00:00:00Z
+END = 2240611200  # 2041-01-01T00:00:00Z
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--loop-sample", type=int, default=200_000)
+    args = parser.parse_args()
+
+    airports = load_airports()
+    codes = list(airports)
+    rng = random.Random(23)
+    events = [(rng.choice(codes), rng.randrange(START, END)) for _ in range(args.events)]
+    code_array = np.array([code for code, _ in events], dtype="U3")
+    timestamps = np.array([timestamp for _, timestamp in events], dtype=np.int64)
+
+    start = time.perf_counter()
+    table = AirportTable.from_sqlite()
+    transitions = TransitionTable.from_sqlite()
+    loaded = time.perf_counter() - start
+
+    zones = {}
+    start = time.perf_counter()
+    for code, timestamp in events[: args.loop_sample]:
+        name = airports[code].timezone
+        if name:
+            zone = zones.get(name) or zones.setdefault(name, ZoneInfo(name))
+            datetime.fromtimestamp(timestamp, zone)
+    loop_rate = min(args.loop_sample, args.events) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    to_local(code_array, timestamps, table, transitions)
+    vector_rate = args.events / (time.perf_counter() - start)
+
+    print(f"{args.events:,} UTC → local conversions ({len(transitions.names)} zones, "
+          f"{len(transitions):,} transitions, tables loaded in {loaded * 1e3:.0f} ms):")
+    print(f"  zoneinfo per event  {loop_rate:>12,.0f} events/s  ({args.events / loop_rate:6.2f} s extrapolated)")
+    print(f"  to_local()          {vector_rate:>12,.0f} events/s  ({args.events / vector_rate:6.2f} s)  "
+          f"{vector_rate / loop_rate:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
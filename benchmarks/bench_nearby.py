@@ -0,0 +1,89 @@
+"""Compare R*Tree-backed nearby lookups against a full haversine scan.
+
+Usage: python benchmarks/bench_nearby.py [--queries 10000,100000] [--scan-sample 1000]
+
+The full scan is what clients do without the index: load every airport once,
+then run haversine over all of them for each query. It is too slow to run
+100k times, so it is timed over ``--scan-sample`` queries and extrapolated.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import nearby_airports  # noqa: E402
+
+K = 5
+RADIUS_KM = 150.0
+
+
+def random_points(count: int, seed: int = 1) -> List[Tuple[float, float]]:
+    rng = random.Random(seed)
+    return [(rng.uniform(-60.0, 70.0), rng.uniform(-180.0, 180.0)) for _ in range(count)]
+
+
+def load_all(conn: sqlite3.Connection) -> List[Tuple[str, float, float]]:
+    return list(conn.execute("SELECT iata, latitude, longitude FROM airport"))
+
+
+def scan_nearest(airports, lat: float, lon: float, k: int):
+    haversine = nearby_airports.haversine_km
+    return heapq.nsmallest(k, ((haversine(lat, lon, a_lat, a_lon), iata) for iata, a_lat, a_lon in airports))
+
+
+def scan_within(airports, lat: float, lon: float, km: float):
+    haversine = nearby_airports.haversine_km
+    return [iata for iata, a_lat, a_lon in airports if haversine(lat, lon, a_lat, a_lon) <= km]
+
+
+def timed(func, points) -> float:
+    start = time.perf_counter()
+    for lat, lon in points:
+        func(lat, lon)
+    return time.perf_counter() - start
+
+
+def report(label: str, count: int, seconds: float, note: str = "") -> None:
+    rate = count / seconds if seconds else float("inf")
+    print(f"  {label:<28} {count:>7} queries  {seconds:>9.2f} s  {rate:>10.0f} q/s{note}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", default="10000,100000")
+    parser.add_argument("--scan-sample", type=int, default=1000)
+    args = parser.parse_args()
+
+    conn = nearby_airports.connect()
+    airports = load_all(conn)
+    sample = random_points(args.scan_sample)
+
+    scan_nearest_s = timed(lambda lat, lon: scan_nearest(airports, lat, lon, K), sample)
+    scan_within_s = timed(lambda lat, lon: scan_within(airports, lat, lon, RADIUS_KM), sample)
+
+    for count in (int(value) for value in args.queries.split(",")):
+        points = random_points(count)
+        scale = count / len(sample)
+        print(f"{count} queries (k={K}, radius={RADIUS_KM:.0f} km):")
+        report("nearest / full scan", count, scan_nearest_s * scale, "  (extrapolated)")
+        report("nearest / R*Tree", count, timed(lambda lat, lon: nearby_airports.nearest(lat, lon, K, conn), points))
+        report("within_radius / full scan", count, scan_within_s * scale, "  (extrapolated)")
+        report(
+            "within_radius / R*Tree",
+            count,
+            timed(lambda lat, lon: nearby_airports.within_radius(lat, lon, RADIUS_KM, conn), points),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Peak RSS and wall time of airport curation on a synthetic OurAirports dump.
+
+Usage: python benchmarks/bench_process_airports.py [--rows 1000000]
+
+Each pipeline runs in its own subprocess so peak RSS is measured in
+isolation. "materialised" reproduces the previous implementation (every raw
+row held as a dict, then a list of kept dicts sorted in memory); "streaming"
+is process_airports.curate_airports.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+import resource
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import process_airports  # noqa: E402
+
+SOURCE_FIELDNAMES = [
+    "id", "ident", "type", "name", "latitude_deg", "longitude_deg", "elevation_ft",
+    "continent", "iso_country", "iso_region", "municipality", "scheduled_service",
+    "icao_code", "iata_code", "gps_code", "local_code", "home_link", "wikipedia_link", "keywords",
+]
+TYPES = ["small_airport"] * 14 + ["heliport"] * 6 + ["closed"] * 3 + ["medium_airport", "large_airport"]
+COUNTRIES = ["US", "BR", "CA", "AU", "RU", "DE", "GB", "FR", "JP", "CN", "IN", "MX"]
+CONTINENTS = ["NA", "SA", "NA", "OC", "EU", "EU", "EU", "EU", "AS", "AS", "AS", "NA"]
+
+
+def write_synthetic_airports(path: Path, rows: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    letters = string.ascii_uppercase
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SOURCE_FIELDNAMES)
+        for index in range(rows):
+            airport_type = rng.choice(TYPES)
+            country = rng.randrange(len(COUNTRIES))
+            iata = "".join(rng.choices(letters, k=3)) if airport_type.endswith("_airport") and rng.random() < 0.7 else ""
+            ident = f"X{index:07d}"
+            writer.writerow([
+                index, ident, airport_type, f"Synthetic Field {index}",
+                f"{rng.uniform(-60, 70):.6f}", f"{rng.uniform(-180, 180):.6f}", rng.randrange(0, 3000),
+                CONTINENTS[country], COUNTRIES[country], f"{COUNTRIES[country]}-{rng.randrange(50)}",
+                f"Town {rng.randrange(20000)}" if rng.random() < 0.9 else "", "no",
+                ident if rng.random() < 0.5 else "", iata, ident, "", "", "", "",
+            ])
+
+
+def materialised(input_path: Path, output_path: Path, timezones) -> int:
+    all_rows = list(process_airports.load_airports(input_path))
+    filtered = []
+    for row in all_rows:
+        if row.get("type", "").strip() not in process_airports.ALLOWED_TYPES:
+            continue
+        iata_code = row.get("iata_code", "").strip()
+        if not iata_code:
+            continue
+        filtered.append({
+            "iata": iata_code,
+            "name": row.get("name", "").strip(),
+            "latitude_deg": row.get("latitude_deg", "").strip(),
+            "longitude_deg": row.get("longitude_deg", "").strip(),
+            "continent": row.get("continent", "").strip(),
+            "iso_country": row.get("iso_country", "").strip(),
+            "municipality": (row.get("municipality") or "").strip(),
+            "timezone": timezones.get(iata_code, ""),
+            "icao_code": row.get("icao_code", "").strip(),
+            "gps_code": row.get("gps_code", "").strip(),
+        })
+    filtered.sort(key=lambda airport: (airport["iata"], airport["name"]))
+    with output_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=process_airports.OUTPUT_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(filtered)
+    return len(filtered)
+
+
+def streaming(input_path: Path, output_path: Path, timezones) -> int:
+    stats, _ = process_airports.curate_airports(input_path, output_path, timezones)
+    return stats.kept
+
+
+def run_child(mode: str, input_path: Path, output_path: Path) -> None:
+    timezones = process_airports.load_timezones(process_airports.AIRPORT_TIMEZONES_JSON)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    kept = {"materialised": materialised, "streaming": streaming}[mode](input_path, output_path, timezones)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed:.3f} {baseline} {peak} {kept}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--child", choices=["materialised", "streaming"])
+    parser.add_argument("--input", type=Path)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.input, args.output)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = Path(tmp) / "airports.csv"
+        write_synthetic_airports(input_path, args.rows)
+        print(f"Synthetic airports.csv: {args.rows} rows, {input_path.stat().st_size / 1e6:.0f} MB")
+        outputs = {}
+        for mode in ("materialised", "streaming"):
+            outputs[mode] = Path(tmp) / f"curated_{mode}.csv"
+            result = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--input", str(input_path), "--output", str(outputs[mode])],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            elapsed, baseline, peak, kept = result.stdout.split()
+            # ru_maxrss is in KiB on Linux.
+            print(
+                f"  {mode:<13} {float(elapsed):>7.2f} s  peak RSS {int(peak) / 1024:>7.1f} MiB "
+                f"(+{(int(peak) - int(baseline)) / 1024:.1f} MiB over startup)  kept {kept}"
+            )
+        identical = outputs["materialised"].read_bytes() == outputs["streaming"].read_bytes()
+        print(f"  outputs identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Route graph build time and shortest-path query latency.
+
+Usage: python benchmarks/bench_routing.py [--queries 200] [--baseline-queries 20]
+
+Builds the range-limited graph at several leg ranges, timing the build
+(KD-tree pair search and CSR assembly) against loading the cached graph,
+and reports the edge count and cache size. Queries are random airport pairs.
+Each leg limit is queried with A* on the 2,000 km graph, minimising either
+distance or hops. Latency is per query and includes the path reconstruction.
+The baseline is what callers do today: read every airport from
+globelog.sqlite and run Dijkstra, computing the distance from each settled
+airport to all others, timed on ``--baseline-queries`` pairs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from globelog.data import DB_PATH  # noqa: E402
+from globelog.distance import chord_to_km, unit_vectors  # noqa: E402
+from globelog.routing import RouteGraph, load_graph  # noqa: E402
+
+RANGES_KM = (500.0, 1000.0, 2000.0, 3000.0)
+LEG_LIMITS_KM = (800.0, 1500.0, 2000.0)
+
+
+def brute_force(points: np.ndarray, source: int, target: int, limit: float) -> Optional[float]:
+    cost = np.full(len(points), np.inf)
+    settled = np.zeros(len(points), dtype=bool)
+    cost[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        distance, row = heapq.heappop(heap)
+        if settled[row]:
+            continue
+        if row == target:
+            return distance
+        settled[row] = True
+        km = chord_to_km(np.linalg.norm(points - points[row], axis=1))
+        candidate = distance + km
+        better = (km <= limit) & (candidate < cost)
+        cost[better] = candidate[better]
+        for item in zip(candidate[better].tolist(), np.flatnonzero(better).tolist()):
+            heapq.heappush(heap, item)
+    return None
+
+
+def percentiles(timings: List[float]) -> str:
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return f"median {statistics.median(timings) * 1e3:7.2f} ms  p95 {p95 * 1e3:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--baseline-queries", type=int, default=20)
+    args = parser.parse_args()
+
+    print("Graph build (4,480 airports):")
+    with tempfile.TemporaryDirectory() as workdir:
+        for max_leg_km in RANGES_KM:
+            cache = Path(workdir) / f"graph_{max_leg_km:g}.npz"
+            start = time.perf_counter()
+            graph = RouteGraph.build(max_leg_km)
+            built = time.perf_counter() - start
+            graph.save(cache)
+            start = time.perf_counter()
+            RouteGraph.load(cache)
+            loaded = time.perf_counter() - start
+            print(
+                f"  {max_leg_km:>6,.0f} km legs  {graph.edge_count:>10,} edges  build {built * 1e3:7.1f} ms  "
+                f"load cached {loaded * 1e3:6.1f} ms  {cache.stat().st_size / 2 ** 20:6.1f} MiB"
+            )
+
+    graph = load_graph(2000.0)
+    rng = random.Random(11)
+    pairs = [rng.sample(range(len(graph)), 2) for _ in range(args.queries)]
+    codes = graph.iata.tolist()
+    print(f"Shortest paths on the 2,000 km graph ({args.queries} random pairs):")
+    for limit in LEG_LIMITS_KM:
+        for minimise in ("distance", "hops"):
+            timings, found = [], 0
+            for source, target in pairs:
+                start = time.perf_counter()
+                route = graph.shortest_path(codes[source], codes[target], limit, minimise)
+                timings.append(time.perf_counter() - start)
+                found += route is not None
+            print(f"  legs <= {limit:>5,.0f} km, fewest {minimise:<8}  {percentiles(timings)}  ({found} routable)")
+
+    conn = sqlite3.connect(DB_PATH)
+    start = time.perf_counter()
+    rows = conn.execute("SELECT latitude, longitude FROM airport ORDER BY iata").fetchall()
+    coordinates = np.array(rows)
+    points = unit_vectors(coordinates[:, 0], coordinates[:, 1])
+    load = time.perf_counter() - start
+    timings = []
+    for source, target in pairs[: args.baseline_queries]:
+        start = time.perf_counter()
+        brute_force(points, source, target, 1500.0)
+        timings.append(time.perf_counter() - start)
+    print(
+        f"  baseline: SQLite rows + brute-force Dijkstra, legs <= 1,500 km  {percentiles(timings)}  "
+        f"(+{load * 1e3:.0f} ms to load the airports)"
+    )
+
+
+if __name__ == "__main__":
+    main()
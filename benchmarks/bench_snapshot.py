@@ -0,0 +1,100 @@
+"""Cold start and resident memory: mmap snapshot vs opening globelog.sqlite.
+
+Usage: python benchmarks/bench_snapshot.py [--runs 7] [--lookups 2000]
+
+Each cold start runs in a fresh interpreter, which first evicts the file
+from the page cache (posix_fadvise DONTNEED, where the OS supports it). It
+then times opening the store and answering the first airport_by_iata
+lookup, then ``--lookups`` random lookups. "RSS growth" is the change in
+VmRSS (Linux) from before the store is opened to after the lookups.
+Medians of ``--runs`` runs are reported. Needs data/globelog.snapshot
+(python export_snapshot.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from globelog.data import DB_PATH  # noqa: E402
+from globelog.snapshot import SNAPSHOT_PATH  # noqa: E402
+
+CHILD = r"""
+import json, os, random, sys, time
+sys.path.insert(0, {root!r})
+from globelog.db import GlobeLogDB
+from globelog.snapshot import Snapshot
+
+def rss_kib():
+    try:
+        with open("/proc/self/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+path = {path!r}
+if hasattr(os, "posix_fadvise"):
+    fd = os.open(path, os.O_RDONLY)
+    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    os.close(fd)
+codes = random.Random(7).choices(json.loads({codes!r}), k={lookups})
+before = rss_kib()
+start = time.perf_counter()
+store = {opener}(__import__("pathlib").Path(path))
+store.airport_by_iata(codes[0])
+first = time.perf_counter() - start
+start = time.perf_counter()
+for code in codes:
+    store.airport_by_iata(code)
+lookups = time.perf_counter() - start
+print(json.dumps({{"first": first, "rate": len(codes) / lookups, "rss": rss_kib() - before}}))
+"""
+
+
+def cold_start(opener: str, path: Path, codes: str, lookups: int) -> dict:
+    code = CHILD.format(root=str(ROOT), path=str(path), codes=codes, lookups=lookups, opener=opener)
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    if not SNAPSHOT_PATH.exists():
+        raise SystemExit("No snapshot; run python export_snapshot.py first.")
+
+    conn = sqlite3.connect(DB_PATH)
+    codes = json.dumps([code for (code,) in conn.execute("SELECT iata FROM airport")])
+    conn.close()
+
+    print(f"Cold start + first lookup, then {args.lookups:,} lookups (median of {args.runs} fresh processes):")
+    for label, opener, path in (
+        ("GlobeLogDB (SQLite)", "GlobeLogDB", DB_PATH),
+        ("Snapshot (mmap)", "Snapshot", SNAPSHOT_PATH),
+    ):
+        runs = [cold_start(opener, path, codes, args.lookups) for _ in range(args.runs)]
+        first = statistics.median(run["first"] for run in runs)
+        rate = statistics.median(run["rate"] for run in runs)
+        rss = statistics.median(run["rss"] for run in runs)
+        size = path.stat().st_size / 1024
+        print(
+            f"  {label:<20} file {size:>6,.0f} KiB  open+first {first * 1e3:6.2f} ms  "
+            f"{rate:>9,.0f} lookups/s  RSS growth {rss:>6,.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
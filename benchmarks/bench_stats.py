@@ -0,0 +1,70 @@
+"""Dashboard region queries: aggregates over ``airport`` against the precomputed stats tables.
+
+Usage: python benchmarks/bench_stats.py [--queries 20000]
+
+Each query asks for one country's or continent's airport count, bounding
+box and distinct timezones, for codes drawn at random from the curated
+countries and continents. The baseline is the ad-hoc SQL dashboards ran
+before: ``COUNT``/``MIN``/``MAX``/``GROUP_CONCAT(DISTINCT timezone)`` over
+the airports with that code (through ``idx_airport_country`` for
+countries; the continent code has no index, so those scan the table).
+"GlobeLogDB" reads the ``country_stats`` / ``continent_stats`` row by
+primary key. Both run on one reused connection; the centroid, which the
+aggregate SQL cannot compute, is left out of the baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from globelog.data import DB_PATH, load_continents, load_countries  # noqa: E402
+from globelog.db import GlobeLogDB  # noqa: E402
+
+AGGREGATE_SQL = """
+    SELECT COUNT(*), MIN(latitude), MAX(latitude), MIN(longitude), MAX(longitude),
+           GROUP_CONCAT(DISTINCT timezone)
+    FROM airport WHERE {column} = ?
+"""
+
+
+def rate(lookup: Callable[[str], object], codes: List[str]) -> float:
+    start = time.perf_counter()
+    for code in codes:
+        lookup(code)
+    return len(codes) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    conn = sqlite3.connect(f"{DB_PATH.resolve().as_uri()}?mode=ro", uri=True)
+    db = GlobeLogDB()
+    for label, regions, column, stats in (
+        ("country", list(load_countries()), "country_code", db.country_stats),
+        ("continent", list(load_continents()), "continent_code", db.continent_stats),
+    ):
+        codes = [rng.choice(regions) for _ in range(args.queries)]
+        sql = AGGREGATE_SQL.format(column=column)
+        aggregate = rate(lambda code: conn.execute(sql, (code,)).fetchone(), codes)
+        lookup = rate(stats, codes)
+        print(f"{label.capitalize()} stats ({args.queries:,} random codes):")
+        print(f"  {'aggregate over airport':<28} {aggregate:>10,.0f} queries/s")
+        print(f"  {f'GlobeLogDB.{label}_stats()':<28} {lookup:>10,.0f} queries/s  ({lookup / aggregate:.1f}x)")
+    conn.close()
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Memory footprint and IATA lookup throughput: AirportTable vs dict loaders vs SQLite.
+
+Usage: python benchmarks/bench_table.py [--lookups 1000000] [--sqlite-sample 20000]
+
+Footprints are traced allocations (tracemalloc) of each structure built from
+scratch. Each lookup resolves a code to latitude, longitude and country.
+About 5 % of the codes are unknown. The per-code SQLite round trip
+(GlobeLogDB.airport_by_iata) is timed on ``--sqlite-sample`` codes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import gc
+import random
+import string
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from globelog.data import CURATED_AIRPORTS, _parse_airports  # noqa: E402
+from globelog.db import GlobeLogDB  # noqa: E402
+from globelog.table import AirportTable  # noqa: E402
+
+
+def dict_of_dicts() -> dict:
+    """The loaders before the globelog package: one DictReader dict per airport."""
+    with CURATED_AIRPORTS.open(newline="", encoding="utf-8") as handle:
+        return {row["iata"]: row for row in csv.DictReader(handle)}
+
+
+def traced(build: Callable[[], object]) -> Tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current
+
+
+def random_codes(count: int, known, seed: int = 13) -> list:
+    rng = random.Random(seed)
+    known = list(known)
+    return [
+        rng.choice(known) if rng.random() < 0.95 else "".join(rng.choices(string.ascii_uppercase, k=3))
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--sqlite-sample", type=int, default=20_000)
+    args = parser.parse_args()
+
+    dicts, dicts_bytes = traced(dict_of_dicts)
+    records, records_bytes = traced(lambda: _parse_airports(CURATED_AIRPORTS))
+    table, table_bytes = traced(AirportTable.from_sqlite)
+    print(f"Footprint for {len(table)} airports (traced allocations):")
+    print(f"  dict of DictReader dicts     {dicts_bytes / 1024:>9,.0f} KiB")
+    print(f"  load_airports() NamedTuples  {records_bytes / 1024:>9,.0f} KiB")
+    print(f"  AirportTable                 {table_bytes / 1024:>9,.0f} KiB  (arrays {table.nbytes / 1024:,.0f} KiB)")
+
+    codes = random_codes(args.lookups, records)
+    code_array = np.array(codes, dtype="U3")
+    print(f"{args.lookups:,} lookups (code → latitude, longitude, country):")
+
+    start = time.perf_counter()
+    hits = [(a["latitude_deg"], a["longitude_deg"], a["iso_country"]) for a in map(dicts.get, codes) if a]
+    elapsed = time.perf_counter() - start
+    print(f"  dict of dicts                {len(codes) / elapsed:>13,.0f} lookups/s  ({len(hits)} hits)")
+
+    start = time.perf_counter()
+    hits = [(a.latitude_deg, a.longitude_deg, a.iso_country) for a in map(records.get, codes) if a]
+    elapsed = time.perf_counter() - start
+    print(f"  load_airports() mapping      {len(codes) / elapsed:>13,.0f} lookups/s  ({len(hits)} hits)")
+
+    start = time.perf_counter()
+    columns = table.lookup(code_array)
+    elapsed = time.perf_counter() - start
+    print(f"  AirportTable.lookup(ndarray) {len(codes) / elapsed:>13,.0f} lookups/s  ({int(columns.found.sum())} hits)")
+
+    start = time.perf_counter()
+    columns = table.lookup(codes)
+    elapsed = time.perf_counter() - start
+    print(f"  AirportTable.lookup(list)    {len(codes) / elapsed:>13,.0f} lookups/s  (incl. list → array)")
+
+    sample = codes[: args.sqlite_sample]
+    with GlobeLogDB() as db:
+        start = time.perf_counter()
+        for code in sample:
+            db.airport_by_iata(code)
+        elapsed = time.perf_counter() - start
+    print(f"  GlobeLogDB per-code query    {len(sample) / elapsed:>13,.0f} lookups/s  ({len(sample):,}-code sample)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+"""Benchmark suite for the build and query paths, with stored baselines.
+
+Usage:
+  python benchmarks/suite.py run [--filter SUBSTRING] [--scales 1,10,100] [--output PATH] [--save-baseline NAME]
+  python benchmarks/suite.py compare BASELINE [RESULTS] [--threshold 1.25]
+  python benchmarks/suite.py list
+
+``run`` times every benchmark (``repeat`` timed calls after one untimed
+warm-up, divided by the operations each call performs) and writes the results to
+``benchmarks/results/latest.json``; ``--save-baseline NAME`` also stores them as
+``benchmarks/baselines/NAME.json`` (updating only the benchmarks that ran). ``compare`` is offline: it diffs the median
+per-operation time of two result files (the second defaults to the latest run) and
+exits non-zero if any benchmark got slower than ``--threshold``.
+
+Scaled inputs are synthetic: 1x is roughly the size of the real inputs
+(countries.csv, an 80k-row OurAirports dump, the curated airports CSV).
+Nothing under ``data/`` is written; builds go to a temporary directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+
+import build_sqlite  # noqa: E402
+import process_airports  # noqa: E402
+import process_countries  # noqa: E402
+import validate_datasets  # noqa: E402
+import verify_sqlite  # noqa: E402
+import verify_timezones  # noqa: E402
+from bench_process_airports import write_synthetic_airports  # noqa: E402
+from globelog._cache import FILE_CACHE  # noqa: E402
+from globelog.data import CURATED_AIRPORTS, DB_PATH  # noqa: E402
+
+RESULTS_DIR = BENCH_DIR / "results"
+BASELINES_DIR = BENCH_DIR / "baselines"
+LATEST_RESULTS = RESULTS_DIR / "latest.json"
+
+RAW_AIRPORTS_ROWS = 80_000
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_THRESHOLD = 1.25
+QUERY_COUNT = 200
+
+
+class Benchmark(NamedTuple):
+    """``setup(workdir)`` prepares inputs untimed and returns the callable to time.
+
+    Each call performs ``ops`` operations (e.g. queries); times are reported per operation.
+    """
+
+    name: str
+    setup: Callable[[Path], Callable[[], object]]
+    ops: int = 1
+    repeat: int = 5
+
+
+@contextmanager
+def patched(module, **attributes) -> Iterator[None]:
+    """Temporarily repoint a script's module-level path constants."""
+    original = {name: getattr(module, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in original.items():
+            setattr(module, name, value)
+
+
+def repeat_for(scale: int) -> int:
+    return 5 if scale == 1 else 3 if scale <= 10 else 1
+
+
+# ── synthetic inputs ───────────────────────────────────────────────────────
+
+
+def write_scaled_countries(path: Path, scale: int) -> None:
+    """countries.csv repeated ``scale`` times; copies get suffixed codes."""
+    with process_countries.INPUT_COUNTRIES_CSV.open(newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fieldnames)
+        writer.writeheader()
+        for copy in range(scale):
+            for row in rows:
+                writer.writerow(dict(row, code=row["code"] + (str(copy) if copy else "")))
+
+
+def write_scaled_curated_airports(path: Path, scale: int) -> None:
+    """The curated airports CSV repeated ``scale`` times with unique codes."""
+    with CURATED_AIRPORTS.open(newline="", encoding="utf-8") as handle:
+        reader = csv.DictReader(handle)
+        fieldnames = reader.fieldnames
+        rows = list(reader)
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fieldnames)
+        writer.writeheader()
+        for copy in range(scale):
+            for row in rows:
+                writer.writerow(dict(row, iata=row["iata"] + (str(copy) if copy else "")))
+
+
+# ── build path ─────────────────────────────────────────────────────────────
+
+
+def bench_process_countries(scale: int) -> Benchmark:
+    def setup(workdir: Path) -> Callable[[], object]:
+        source = workdir / f"countries_{scale}x.csv"
+        write_scaled_countries(source, scale)
+
+        def run() -> None:
+            countries = process_countries.load_countries(source)
+            process_countries.write_curated_countries(workdir / "curated_countries.csv", countries)
+            process_countries.write_curated_continents(
+                workdir / "curated_continents.csv", process_countries.derive_continents(countries)
+            )
+
+        return run
+
+    return Benchmark(f"process_countries[{scale}x]", setup, repeat=repeat_for(scale))
+
+
+def bench_process_airports(scale: int) -> Benchmark:
+    def setup(workdir: Path) -> Callable[[], object]:
+        source = workdir / f"airports_{scale}x.csv"
+        write_synthetic_airports(source, RAW_AIRPORTS_ROWS * scale)
+        timezones = process_airports.load_timezones(process_airports.AIRPORT_TIMEZONES_JSON)
+        return lambda: process_airports.curate_airports(source, workdir / "curated_airports.csv", timezones)
+
+    return Benchmark(f"process_airports[{scale}x]", setup, repeat=repeat_for(scale))
+
+
+def bench_build_sqlite(scale: int, fast: bool = False) -> Benchmark:
+    build = build_sqlite.build_database_fast if fast else build_sqlite.build_database
+
+    def setup(workdir: Path) -> Callable[[], object]:
+        airports = workdir / f"curated_airports_{scale}x.csv"
+        write_scaled_curated_airports(airports, scale)
+        output = workdir / "globelog.sqlite"
+
+        def run() -> None:
+            # End to end: parsing the curated CSVs is part of the build.
+            FILE_CACHE.clear()
+            with patched(build_sqlite, CURATED_AIRPORTS=airports, OUTPUT_DB=output):
+                build(force=True)
+
+        return run
+
+    return Benchmark(f"build_sqlite{'_fast' if fast else ''}[{scale}x]", setup, repeat=repeat_for(scale))
+
+
+def bench_build_sqlite_fast(scale: int) -> Benchmark:
+    return bench_build_sqlite(scale, fast=True)
+
+
+# ── query path ─────────────────────────────────────────────────────────────
+
+
+def query_benchmark(name: str, sql: str, make_params: Callable[[sqlite3.Connection], List[tuple]]) -> Benchmark:
+    """Time ``QUERY_COUNT`` executions of ``sql`` against the committed database."""
+
+    def setup(workdir: Path) -> Callable[[], object]:
+        conn = sqlite3.connect(f"{DB_PATH.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        params = make_params(conn)
+
+        def run() -> None:
+            for values in params:
+                conn.execute(sql, values).fetchall()
+
+        return run
+
+    return Benchmark(name, setup, ops=QUERY_COUNT, repeat=5)
+
+
+def sample_column(conn: sqlite3.Connection, column: str) -> List[tuple]:
+    values = [row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM airport WHERE {column} IS NOT NULL")]
+    rng = random.Random(3)
+    return [(rng.choice(values),) for _ in range(QUERY_COUNT)]
+
+
+def sample_name_tokens(conn: sqlite3.Connection) -> List[tuple]:
+    names = [row[0] for row in conn.execute("SELECT name FROM airport")]
+    rng = random.Random(5)
+    return [(rng.choice(names).split()[0].strip("()\"'-/") or "Airport",) for _ in range(QUERY_COUNT)]
+
+
+def sample_prefixes(conn: sqlite3.Connection) -> List[tuple]:
+    return [(f'"{token[:3]}"*',) for (token,) in sample_name_tokens(conn)]
+
+
+QUERY_BENCHMARKS = (
+    query_benchmark(
+        "fts_match[token]",
+        "SELECT iata, name FROM airport_search WHERE airport_search MATCH ? ORDER BY rank LIMIT 10",
+        lambda conn: [(f'"{token}"',) for (token,) in sample_name_tokens(conn)],
+    ),
+    query_benchmark(
+        "fts_match[prefix]",
+        "SELECT iata, name FROM airport_search WHERE airport_search MATCH ? ORDER BY rank LIMIT 10",
+        sample_prefixes,
+    ),
+    query_benchmark(
+        "lookup[country]",
+        "SELECT iata, name FROM airport WHERE country_code = ?",
+        lambda conn: sample_column(conn, "country_code"),
+    ),
+    query_benchmark(
+        "lookup[timezone]",
+        "SELECT iata, name FROM airport WHERE timezone = ?",
+        lambda conn: sample_column(conn, "timezone"),
+    ),
+)
+
+
+# ── verify scripts ─────────────────────────────────────────────────────────
+
+
+def verify_benchmark(name: str, check: Callable[[], object]) -> Benchmark:
+    def setup(workdir: Path) -> Callable[[], object]:
+        def run() -> None:
+            # Include parsing: a fresh process has an empty file cache.
+            FILE_CACHE.clear()
+            check()
+
+        return run
+
+    return Benchmark(name, setup, repeat=5)
+
+
+VERIFY_BENCHMARKS = (
+    verify_benchmark("validate_datasets", validate_datasets.check_datasets),
+    verify_benchmark("verify_timezones", verify_timezones.check_timezones),
+    verify_benchmark("verify_sqlite", verify_sqlite.check_database),
+)
+
+
+def all_benchmarks(scales: Sequence[int] = DEFAULT_SCALES) -> List[Benchmark]:
+    benchmarks: List[Benchmark] = []
+    for factory in (bench_process_countries, bench_process_airports, bench_build_sqlite, bench_build_sqlite_fast):
+        benchmarks.extend(factory(scale) for scale in scales)
+    return benchmarks + list(QUERY_BENCHMARKS) + list(VERIFY_BENCHMARKS)
+
+
+# ── runner ─────────────────────────────────────────────────────────────────
+
+
+def time_benchmark(benchmark: Benchmark, workdir: Path) -> Dict[str, object]:
+    function = benchmark.setup(workdir)
+    function()  # warm-up: page cache, imports, statement cache
+    timings: List[float] = []
+    for _ in range(benchmark.repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) / benchmark.ops)
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "mean": statistics.fmean(timings),
+        "repeat": benchmark.repeat,
+        "ops": benchmark.ops,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.1f} µs"
+
+
+def run_suite(benchmarks: Sequence[Benchmark]) -> Dict[str, object]:
+    results: Dict[str, Dict[str, object]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for benchmark in benchmarks:
+            workdir = Path(tmp) / benchmark.name.replace("[", "_").rstrip("]")
+            workdir.mkdir()
+            results[benchmark.name] = time_benchmark(benchmark, workdir)
+            print(f"  {benchmark.name:<26} {format_seconds(results[benchmark.name]['median']):>12} per op")
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def write_results(payload: Dict[str, object], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_results(reference: str) -> Dict[str, object]:
+    """Read a results file by path, or a stored baseline by name."""
+    path = Path(reference)
+    if not path.exists():
+        path = BASELINES_DIR / f"{reference}.json"
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(baseline: Dict[str, object], current: Dict[str, object], threshold: float) -> int:
+    """Print per-benchmark ratios of median times; return the number of regressions."""
+    before, after = baseline["results"], current["results"]
+    if baseline.get("environment") != current.get("environment"):
+        print("Note: results come from different environments; ratios may not be comparable.")
+    regressions = 0
+    print(f"  {'benchmark':<26} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name in sorted(set(before) | set(after)):
+        if name not in before or name not in after:
+            print(f"  {name:<26} {'only in ' + ('current' if name in after else 'baseline'):>33}")
+            continue
+        old, new = before[name]["median"], after[name]["median"]
+        ratio = new / old if old else float("inf")
+        if ratio > threshold:
+            verdict, regressions = "slower", regressions + 1
+        elif ratio < 1 / threshold:
+            verdict = "faster"
+        else:
+            verdict = ""
+        print(f"  {name:<26} {format_seconds(old):>12} {format_seconds(new):>12} {ratio:>6.2f}x {verdict}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="time the benchmarks and write a results file")
+    run.add_argument("--filter", default="", help="only run benchmarks whose name contains this")
+    run.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)), help="input scale factors")
+    run.add_argument("--output", type=Path, default=LATEST_RESULTS)
+    run.add_argument("--save-baseline", metavar="NAME", help="also store the results as a named baseline")
+
+    diff = commands.add_parser("compare", help="compare results against a baseline (offline)")
+    diff.add_argument("baseline", help="baseline name in benchmarks/baselines/ or a results file path")
+    diff.add_argument("results", nargs="?", default=str(LATEST_RESULTS))
+    diff.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="slowdown ratio that fails")
+
+    commands.add_parser("list", help="list benchmark names")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        for benchmark in all_benchmarks():
+            print(benchmark.name)
+        return 0
+    if args.command == "compare":
+        regressions = compare(load_results(args.baseline), load_results(args.results), args.threshold)
+        print(f"{regressions} regression(s) beyond {args.threshold:.2f}x.")
+        return 1 if regressions else 0
+
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    benchmarks = [b for b in all_benchmarks(scales) if args.filter in b.name]
+    payload = run_suite(benchmarks)
+    write_results(payload, args.output)
+    print(f"Wrote {args.output}")
+    if args.save_baseline:
+        baseline_path = BASELINES_DIR / f"{args.save_baseline}.json"
+        if baseline_path.exists():
+            # A filtered run only refreshes the benchmarks it ran.
+            previous = load_results(str(baseline_path))
+            payload["results"] = {**previous["results"], **payload["results"]}
+        write_results(payload, baseline_path)
+        print(f"Saved baseline {args.save_baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
-import csv
+import argparse
+import hashlib
+import json
+import math
+import os
 import sqlite3
+import time
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from globelog.data import fold_accents, load_airports, load_continents, load_countries
+from globelog.timezones import (
+    TRANSITION_END_YEAR,
+    TRANSITION_START_YEAR,
+    file_digest,
+    load_zone_transitions,
+    zone_source_digest,
+)
 
 
 ROOT = Path(__file__).parent
@@ -12,21 +26,34 @@ CURATED_COUNTRIES = DATA_DIR / "curated_countries.csv"
 CURATED_CONTINENTS = DATA_DIR / "curated_continents.csv"
 CURATED_AIRPORTS = DATA_DIR / "curated_airports.csv"
 OUTPUT_DB = DATA_DIR / "globelog.sqlite"
+CORRECTIONS_DIR = DATA_DIR / "corrections"
 
-
-def read_csv(path: Path) -> Iterable[dict[str, str]]:
-    with path.open("r", newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            yield {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
+# Bump whenever create_schema() or the way rows are derived changes, so that
+# existing databases are rebuilt even though their inputs did not change.
+SCHEMA_VERSION = 3
+# Set explicitly so the file layout does not depend on SQLite's compile-time defaults.
+PAGE_SIZE = 4096
+MANIFEST_TABLES = (
+    "continent", "country", "airport", "timezone", "timezone_transition", "country_stats", "continent_stats"
+)
 
 
-def create_schema(conn: sqlite3.Connection) -> None:
+def create_schema(conn: sqlite3.Connection, indexes: bool = True) -> None:
     conn.executescript(
-        """
+        f"""
+        PRAGMA page_size = {PAGE_SIZE};
+        PRAGMA auto_vacuum = NONE;
         PRAGMA foreign_keys = ON;
+        PRAGMA user_version = {SCHEMA_VERSION};
 
+        DROP TABLE IF EXISTS metadata;
+        DROP TABLE IF EXISTS continent_stats;
+        DROP TABLE IF EXISTS country_stats;
         DROP TABLE IF EXISTS airport_search;
+        DROP TABLE IF EXISTS airport_geo;
+        DROP TABLE IF EXISTS airport_trigram;
+        DROP TABLE IF EXISTS timezone_transition;
+        DROP TABLE IF EXISTS timezone;
         DROP TABLE IF EXISTS airport;
         DROP TABLE IF EXISTS country;
         DROP TABLE IF EXISTS continent;
@@ -52,78 +79,327 @@ def create_schema(conn: sqlite3.Connection) -> None:
             country_code TEXT NOT NULL REFERENCES country(code),
             timezone TEXT,
             icao_code TEXT,
-            gps_code TEXT
+            gps_code TEXT,
+            name_folded TEXT NOT NULL,
+            municipality_folded TEXT
         );
 
-        CREATE INDEX idx_airport_country ON airport(country_code);
-        CREATE INDEX idx_airport_municipality ON airport(municipality);
-        CREATE INDEX idx_airport_timezone ON airport(timezone);
+        CREATE TABLE timezone (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            first_year INTEGER NOT NULL,
+            last_year INTEGER NOT NULL
+        );
+
+        CREATE TABLE timezone_transition (
+            timezone_id INTEGER NOT NULL REFERENCES timezone(id) ON DELETE CASCADE,
+            utc_start INTEGER NOT NULL,
+            utc_offset INTEGER NOT NULL,
+            is_dst INTEGER NOT NULL,
+            abbreviation TEXT NOT NULL,
+            PRIMARY KEY (timezone_id, utc_start)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE country_stats (
+            country_code TEXT PRIMARY KEY REFERENCES country(code) ON DELETE CASCADE,
+            airport_count INTEGER NOT NULL,
+            has_airports INTEGER NOT NULL,
+            min_latitude REAL,
+            max_latitude REAL,
+            min_longitude REAL,
+            max_longitude REAL,
+            centroid_latitude REAL,
+            centroid_longitude REAL,
+            timezones TEXT NOT NULL
+        ) WITHOUT ROWID;
+
+        CREATE TABLE continent_stats (
+            continent_code TEXT PRIMARY KEY REFERENCES continent(code) ON DELETE CASCADE,
+            airport_count INTEGER NOT NULL,
+            has_airports INTEGER NOT NULL,
+            min_latitude REAL,
+            max_latitude REAL,
+            min_longitude REAL,
+            max_longitude REAL,
+            centroid_latitude REAL,
+            centroid_longitude REAL,
+            timezones TEXT NOT NULL
+        ) WITHOUT ROWID;
+
+        CREATE TABLE metadata (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        ) WITHOUT ROWID;
         """
     )
+    if indexes:
+        create_indexes(conn)
 
 
-def populate_continents(conn: sqlite3.Connection) -> None:
-    rows = [(row["code"], row["name"]) for row in read_csv(CURATED_CONTINENTS)]
-    conn.executemany("INSERT INTO continent(code, name) VALUES (?, ?)", rows)
+SECONDARY_INDEXES = """
+    CREATE INDEX idx_airport_country ON airport(country_code);
+    CREATE INDEX idx_airport_municipality ON airport(municipality);
+    CREATE INDEX idx_airport_timezone ON airport(timezone);
+    CREATE INDEX idx_airport_icao ON airport(icao_code);
+"""
 
 
-def populate_countries(conn: sqlite3.Connection) -> None:
-    rows = [
+def create_indexes(conn: sqlite3.Connection) -> None:
+    conn.executescript(SECONDARY_INDEXES)
+
+
+AIRPORT_COLUMNS = (
+    "iata",
+    "name",
+    "municipality",
+    "latitude",
+    "longitude",
+    "continent_code",
+    "country_code",
+    "timezone",
+    "icao_code",
+    "gps_code",
+    "name_folded",
+    "municipality_folded",
+)
+
+# Columns of each external-content FTS5 table and the airport expressions that feed them.
+FTS_TABLES = {
+    "airport_search": (
+        "name, municipality, iata, icao_code, country_code",
+        "name, IFNULL(municipality, ''), iata, IFNULL(icao_code, ''), country_code",
+    ),
+    # Accent-folded copies, so "sao paulo" finds "São Paulo"; fuzzy_search folds queries the same way.
+    "airport_trigram": (
+        "name_folded, municipality_folded, iata",
+        "name_folded, IFNULL(municipality_folded, ''), iata",
+    ),
+}
+
+# Incremental updates only VACUUM once this share of pages is on the freelist.
+VACUUM_FREELIST_THRESHOLD = 0.25
+
+# Page cache for --fast builds, in KiB (SQLite takes negative cache_size as KiB).
+FAST_BUILD_CACHE_KIB = 256 * 1024
+# FTS5 merge settings while bulk loading, and the FTS5 defaults restored afterwards.
+FTS_BULK_CRISISMERGE = 64
+FTS_DEFAULT_AUTOMERGE = 4
+FTS_DEFAULT_CRISISMERGE = 16
+
+
+def continent_rows() -> Iterable[Tuple[str, str]]:
+    return ((c.code, c.name) for c in load_continents(CURATED_CONTINENTS).values())
+
+
+def country_rows() -> Iterable[Tuple[str, str, str]]:
+    return ((c.code, c.name, c.continent) for c in load_countries(CURATED_COUNTRIES).values())
+
+
+def airport_rows() -> Iterable[
+    Tuple[str, str, str | None, float, float, str, str, str | None, str | None, str | None, str, str | None]
+]:
+    return (
         (
-            row["code"],
-            row["name"],
-            row["continent"],
+            a.iata,
+            a.name,
+            a.municipality or None,
+            a.latitude_deg,
+            a.longitude_deg,
+            a.continent,
+            a.iso_country,
+            a.timezone or None,
+            a.icao_code or None,
+            a.gps_code or None,
+            fold_accents(a.name),
+            fold_accents(a.municipality) or None,
         )
-        for row in read_csv(CURATED_COUNTRIES)
-    ]
-    conn.executemany(
-        "INSERT INTO country(code, name, continent_code) VALUES (?, ?, ?)", rows
+        for a in load_airports(CURATED_AIRPORTS).values()
     )
 
 
-def coerce_float(value: str) -> float:
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return 0.0
+def populate_continents(conn: sqlite3.Connection) -> None:
+    conn.executemany("INSERT INTO continent(code, name) VALUES (?, ?)", continent_rows())
+
+
+def populate_countries(conn: sqlite3.Connection) -> None:
+    conn.executemany(
+        "INSERT INTO country(code, name, continent_code) VALUES (?, ?, ?)", country_rows()
+    )
 
 
 def populate_airports(conn: sqlite3.Connection) -> None:
-    rows: Iterable[Tuple[str, str, str | None, float, float, str, str, str | None, str | None, str | None]] = (
-        (
-            row["iata"],
-            row["name"],
-            row.get("municipality") or None,
-            coerce_float(row.get("latitude_deg", "0")),
-            coerce_float(row.get("longitude_deg", "0")),
-            row.get("continent", ""),
-            row.get("iso_country", ""),
-            row.get("timezone") or None,
-            row.get("icao_code") or None,
-            row.get("gps_code") or None,
-        )
-        for row in read_csv(CURATED_AIRPORTS)
+    conn.executemany(
+        f"INSERT INTO airport({', '.join(AIRPORT_COLUMNS)}) VALUES ({', '.join('?' * len(AIRPORT_COLUMNS))})",
+        airport_rows(),
+    )
+
+
+STATS_COLUMNS = (
+    "airport_count",
+    "has_airports",
+    "min_latitude",
+    "max_latitude",
+    "min_longitude",
+    "max_longitude",
+    "centroid_latitude",
+    "centroid_longitude",
+    "timezones",
+)
+# Stats table → (parent table, the airport column it groups by).
+STATS_TABLES = {
+    "country_stats": ("country", "country_code"),
+    "continent_stats": ("continent", "continent_code"),
+}
+
+
+def region_stats(airports: Sequence[Tuple[float, float, Optional[str]]]) -> tuple:
+    """``STATS_COLUMNS`` values for a group of (latitude, longitude, timezone) airports.
+
+    The bounding box is the plain min/max of the coordinates, so a region
+    spanning the antimeridian gets a box nearly 360° wide. The centroid is
+    the normalised mean of the airports' unit vectors, which does not have
+    that problem. Timezones are a sorted JSON array of distinct names.
+    """
+    if not airports:
+        return (0, 0, None, None, None, None, None, None, "[]")
+    x = y = z = 0.0
+    for latitude, longitude, _ in airports:
+        lat, lon = math.radians(latitude), math.radians(longitude)
+        x += math.cos(lat) * math.cos(lon)
+        y += math.cos(lat) * math.sin(lon)
+        z += math.sin(lat)
+    # Airports spread evenly round the globe have no meaningful centre.
+    centred = math.hypot(x, y, z) > 1e-9 * len(airports)
+    timezones = sorted({timezone for _, _, timezone in airports if timezone})
+    return (
+        len(airports),
+        1,
+        min(latitude for latitude, _, _ in airports),
+        max(latitude for latitude, _, _ in airports),
+        min(longitude for _, longitude, _ in airports),
+        max(longitude for _, longitude, _ in airports),
+        round(math.degrees(math.atan2(z, math.hypot(x, y))), 6) if centred else None,
+        round(math.degrees(math.atan2(y, x)), 6) if centred else None,
+        json.dumps(timezones, separators=(",", ":")),
     )
+
+
+def refresh_stats(
+    conn: sqlite3.Connection, countries: Optional[Iterable[str]] = None, continents: Optional[Iterable[str]] = None
+) -> None:
+    """Recompute ``country_stats`` and ``continent_stats`` from the airport table.
+
+    ``None`` rebuilds every row of that table; otherwise only the given codes
+    are recomputed, and codes no longer in ``country``/``continent`` lose
+    their row. Airports are always read in IATA order, so an incremental
+    refresh gives the same floating-point results as a full one.
+    """
+    for table, codes in (("country_stats", countries), ("continent_stats", continents)):
+        parent, column = STATS_TABLES[table]
+        existing = {code for (code,) in conn.execute(f"SELECT code FROM {parent}")}
+        if codes is None:
+            conn.execute(f"DELETE FROM {table}")
+            keys = sorted(existing)
+        else:
+            codes = sorted(set(codes))
+            conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", [(code,) for code in codes])
+            keys = [code for code in codes if code in existing]
+        if not keys:
+            continue
+        groups: Dict[str, List[Tuple[float, float, Optional[str]]]] = {key: [] for key in keys}
+        where = "" if codes is None else f"WHERE {column} IN ({', '.join('?' * len(keys))}) "
+        for code, latitude, longitude, timezone in conn.execute(
+            f"SELECT {column}, latitude, longitude, timezone FROM airport {where}ORDER BY iata",
+            () if codes is None else keys,
+        ):
+            if code in groups:
+                groups[code].append((latitude, longitude, timezone))
+        conn.executemany(
+            f"INSERT INTO {table}({column}, {', '.join(STATS_COLUMNS)}) VALUES ({', '.join('?' * (len(STATS_COLUMNS) + 1))})",
+            [(key, *region_stats(groups[key])) for key in keys],
+        )
+
+
+def airport_regions(conn: sqlite3.Connection, codes: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """The countries and continents of the given airports, as currently stored."""
+    countries: Set[str] = set()
+    continents: Set[str] = set()
+    for code in codes:
+        row = conn.execute("SELECT country_code, continent_code FROM airport WHERE iata = ?", (code,)).fetchone()
+        if row:
+            countries.add(row[0])
+            continents.add(row[1])
+    return countries, continents
+
+
+def airport_timezones(conn: sqlite3.Connection) -> List[str]:
+    return [
+        name
+        for (name,) in conn.execute(
+            "SELECT DISTINCT timezone FROM airport WHERE timezone IS NOT NULL ORDER BY timezone"
+        )
+    ]
+
+
+def populate_timezones(
+    conn: sqlite3.Connection,
+    start_year: int = TRANSITION_START_YEAR,
+    end_year: int = TRANSITION_END_YEAR,
+) -> None:
+    """Sync the timezone tables with the zones the airports use, covering ``start_year``..``end_year``.
+
+    Zones already stored for the same year range are kept, so an incremental
+    update only computes transitions for new zones, and computed zones are
+    cached across builds (see ``load_zone_transitions``). Zones unknown to
+    the local tz database are reported and left out.
+    """
+    existing: Dict[str, Tuple[int, int, int]] = {
+        name: (zone_id, first, last)
+        for zone_id, name, first, last in conn.execute("SELECT id, name, first_year, last_year FROM timezone")
+    }
+    wanted = airport_timezones(conn)
     conn.executemany(
-        """
-        INSERT INTO airport(
-            iata,
-            name,
-            municipality,
-            latitude,
-            longitude,
-            continent_code,
-            country_code,
-            timezone,
-            icao_code,
-            gps_code
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        list(rows),
+        "DELETE FROM timezone WHERE id = ?",
+        [(zone_id,) for name, (zone_id, *_) in existing.items() if name not in wanted],
     )
+    pending = [
+        name for name in wanted if name not in existing or existing[name][1:] != (start_year, end_year)
+    ]
+    computed = load_zone_transitions(pending, start_year, end_year)
+    for name in pending:
+        if name not in computed:
+            continue
+        if name in existing:
+            conn.execute("DELETE FROM timezone WHERE id = ?", (existing[name][0],))
+        zone_id = conn.execute(
+            "INSERT INTO timezone(name, first_year, last_year) VALUES (?, ?, ?)", (name, start_year, end_year)
+        ).lastrowid
+        conn.executemany(
+            """
+            INSERT INTO timezone_transition(timezone_id, utc_start, utc_offset, is_dst, abbreviation)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            ((zone_id, *transition) for transition in computed[name]),
+        )
+    unknown = [name for name in pending if name not in computed]
+    if unknown:
+        print(f"Skipped {len(unknown)} timezones missing from the tz database: {', '.join(unknown[:5])}")
+
 
+def fill_fts(conn: sqlite3.Connection, table: str, bulk: bool = False) -> None:
+    """Index every airport row in one of the FTS5 tables.
 
-def populate_fts(conn: sqlite3.Connection) -> None:
+    With ``bulk`` the incremental segment merges are switched off for the
+    load; ``optimize_fts`` then merges once and restores the defaults.
+    """
+    if bulk:
+        conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('automerge', 0)")
+        conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('crisismerge', {FTS_BULK_CRISISMERGE})")
+    columns, source = FTS_TABLES[table]
+    conn.execute(f"INSERT INTO {table}(rowid, {columns}) SELECT rowid, {source} FROM airport")
+
+
+def populate_fts(conn: sqlite3.Connection, bulk: bool = False) -> None:
     conn.execute(
         """
         CREATE VIRTUAL TABLE airport_search USING fts5(
@@ -137,20 +413,350 @@ def populate_fts(conn: sqlite3.Connection) -> None:
         )
         """
     )
+    fill_fts(conn, "airport_search", bulk)
+
+
+def populate_trigram(conn: sqlite3.Connection, bulk: bool = False) -> None:
+    # Substring index for typo-tolerant search (see fuzzy_search.py).
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE airport_trigram USING fts5(
+            name_folded,
+            municipality_folded,
+            iata,
+            content='airport',
+            content_rowid='rowid',
+            tokenize='trigram'
+        )
+        """
+    )
+    fill_fts(conn, "airport_trigram", bulk)
+
+
+def populate_geo(conn: sqlite3.Connection) -> None:
+    # R*Tree keyed on airport rowid; each airport is a degenerate (point) box.
+    conn.execute(
+        """
+        CREATE VIRTUAL TABLE airport_geo USING rtree(
+            id,
+            min_lat, max_lat,
+            min_lon, max_lon
+        )
+        """
+    )
 
     conn.execute(
         """
-        INSERT INTO airport_search(rowid, name, municipality, iata, icao_code, country_code)
-        SELECT rowid, name, IFNULL(municipality, ''), iata, IFNULL(icao_code, ''), country_code
+        INSERT INTO airport_geo(id, min_lat, max_lat, min_lon, max_lon)
+        SELECT rowid, latitude, latitude, longitude, longitude
         FROM airport
         """
     )
 
 
-def build_database() -> None:
+def unindex_airports(conn: sqlite3.Connection, rowids: List[int]) -> None:
+    """Remove airport rows from the derived indexes while their old values are still in place."""
+    params = [(rowid,) for rowid in rowids]
+    for table, (columns, source) in FTS_TABLES.items():
+        conn.executemany(
+            f"INSERT INTO {table}({table}, rowid, {columns}) SELECT 'delete', rowid, {source} FROM airport WHERE rowid = ?",
+            params,
+        )
+    conn.executemany("DELETE FROM airport_geo WHERE id = ?", params)
+
+
+def index_airports(conn: sqlite3.Connection, rowids: List[int]) -> None:
+    params = [(rowid,) for rowid in rowids]
+    for table, (columns, source) in FTS_TABLES.items():
+        conn.executemany(
+            f"INSERT INTO {table}(rowid, {columns}) SELECT rowid, {source} FROM airport WHERE rowid = ?",
+            params,
+        )
+    conn.executemany(
+        """
+        INSERT INTO airport_geo(id, min_lat, max_lat, min_lon, max_lon)
+        SELECT rowid, latitude, latitude, longitude, longitude
+        FROM airport
+        WHERE rowid = ?
+        """,
+        params,
+    )
+
+
+class TableDiff:
+    """Rows to insert, update and delete to turn a table into the curated CSV."""
+
+    def __init__(self, conn: sqlite3.Connection, table: str, columns: Sequence[str], rows: Iterable[tuple]) -> None:
+        self.table = table
+        self.columns = columns
+        existing = {row[0]: tuple(row) for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table}")}
+        desired = {row[0]: tuple(row) for row in rows}
+        self.inserts = [row for key, row in desired.items() if key not in existing]
+        self.updates = [row for key, row in desired.items() if key in existing and existing[key] != row]
+        self.deletes = [key for key in existing if key not in desired]
+
+    def __len__(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    def apply_upserts(self, conn: sqlite3.Connection) -> None:
+        key, *values = self.columns
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        conn.executemany(
+            f"UPDATE {self.table} SET {assignments} WHERE {key} = ?",
+            [(*row[1:], row[0]) for row in self.updates],
+        )
+        conn.executemany(
+            f"INSERT INTO {self.table}({', '.join(self.columns)}) VALUES ({', '.join('?' * len(self.columns))})",
+            self.inserts,
+        )
+
+    def apply_deletes(self, conn: sqlite3.Connection) -> None:
+        conn.executemany(f"DELETE FROM {self.table} WHERE {self.columns[0]} = ?", [(key,) for key in self.deletes])
+
+    def summary(self) -> str:
+        return f"{self.table}: +{len(self.inserts)} ~{len(self.updates)} -{len(self.deletes)}"
+
+
+def airport_rowids(conn: sqlite3.Connection, codes: Iterable[str]) -> List[int]:
+    return [
+        rowid
+        for (rowid,) in (
+            conn.execute("SELECT rowid FROM airport WHERE iata = ?", (code,)).fetchone() for code in codes
+        )
+    ]
+
+
+def build_inputs() -> List[Path]:
+    return [CURATED_CONTINENTS, CURATED_COUNTRIES, CURATED_AIRPORTS, *sorted(CORRECTIONS_DIR.glob("*.json"))]
+
+
+def input_hash(start_year: int = TRANSITION_START_YEAR, end_year: int = TRANSITION_END_YEAR) -> str:
+    """SHA-256 over everything a build's contents depend on.
+
+    That is ``SCHEMA_VERSION``, the transition year range, the curated CSVs,
+    the corrections JSON and the TZif file of each airport timezone. Files
+    are identified by name, not path, and hashed with line endings
+    normalised, so the hash is the same in any checkout and a CRLF rewrite
+    of unchanged rows does not trigger a rebuild.
+    """
+    digest = hashlib.sha256(f"schema {SCHEMA_VERSION}\ntz-years {start_year} {end_year}\n".encode())
+    for path in build_inputs():
+        content = hashlib.sha256(path.read_bytes().replace(b"\r\n", b"\n")).hexdigest()
+        digest.update(f"{path.name} {content}\n".encode())
+    zones = sorted({airport.timezone for airport in load_airports(CURATED_AIRPORTS).values() if airport.timezone})
+    for name in zones:
+        digest.update(f"{name} {zone_source_digest(name) or '-'}\n".encode())
+    return digest.hexdigest()
+
+
+def write_metadata(conn: sqlite3.Connection, digest: str, start_year: int, end_year: int) -> None:
+    conn.executemany(
+        "INSERT OR REPLACE INTO metadata(key, value) VALUES (?, ?)",
+        (
+            ("input_hash", digest),
+            ("schema_version", str(SCHEMA_VERSION)),
+            ("tz_first_year", str(start_year)),
+            ("tz_last_year", str(end_year)),
+        ),
+    )
+
+
+def stored_hash(path: Path) -> Optional[str]:
+    """The ``input_hash`` recorded in the database at ``path``, if it has one for this ``SCHEMA_VERSION``."""
+    if not path.exists():
+        return None
+    try:
+        conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            metadata = dict(conn.execute("SELECT key, value FROM metadata"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    if metadata.get("schema_version") != str(SCHEMA_VERSION):
+        return None
+    return metadata.get("input_hash")
+
+
+# Each table's rows in key order, with timezone ids replaced by zone names, so
+# that a patched database and a fresh build of the same inputs compare equal.
+CONTENT_QUERIES = {
+    "continent": "SELECT code, name FROM continent ORDER BY code",
+    "country": "SELECT code, name, continent_code FROM country ORDER BY code",
+    "airport": f"SELECT {', '.join(AIRPORT_COLUMNS)} FROM airport ORDER BY iata",
+    "timezone": "SELECT name, first_year, last_year FROM timezone ORDER BY name",
+    "timezone_transition": """
+        SELECT z.name, t.utc_start, t.utc_offset, t.is_dst, t.abbreviation
+        FROM timezone_transition AS t JOIN timezone AS z ON z.id = t.timezone_id
+        ORDER BY z.name, t.utc_start
+    """,
+    "country_stats": f"SELECT country_code, {', '.join(STATS_COLUMNS)} FROM country_stats ORDER BY country_code",
+    "continent_stats": f"SELECT continent_code, {', '.join(STATS_COLUMNS)} FROM continent_stats ORDER BY continent_code",
+    "metadata": "SELECT key, value FROM metadata ORDER BY key",
+}
+
+
+def content_digest(conn: sqlite3.Connection) -> str:
+    """SHA-256 of the rows in ``CONTENT_QUERIES``, independent of rowids and the file layout."""
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    digest = hashlib.sha256()
+    for table, query in CONTENT_QUERIES.items():
+        digest.update(f"{table}\n".encode())
+        digest.update("".join(f"{encode(row)}\n" for row in conn.execute(query)).encode())
+    return digest.hexdigest()
+
+
+def manifest_path(db_path: Path) -> Path:
+    return db_path.with_name(f"{db_path.stem}.manifest.json")
+
+
+def write_manifest(db_path: Path, digest: str, start_year: int, end_year: int, build_seconds: Optional[float]) -> dict:
+    """Write the JSON manifest clients poll to decide whether to download ``db_path``."""
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        rows = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in MANIFEST_TABLES}
+        content = content_digest(conn)
+    finally:
+        conn.close()
+    manifest = {
+        "database": db_path.name,
+        "input_hash": digest,
+        "schema_version": SCHEMA_VERSION,
+        "content_sha256": content,
+        "sha256": file_digest(db_path),
+        "bytes": db_path.stat().st_size,
+        "tz_years": [start_year, end_year],
+        "rows": rows,
+        "build_seconds": None if build_seconds is None else round(build_seconds, 3),
+    }
+    path = manifest_path(db_path)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    os.replace(temp_path, path)
+    return manifest
+
+
+def is_up_to_date(digest: str, start_year: int, end_year: int) -> bool:
+    """Whether ``OUTPUT_DB`` was built from inputs hashing to ``digest``; restores a missing or stale manifest."""
+    if stored_hash(OUTPUT_DB) != digest:
+        return False
+    try:
+        manifest = json.loads(manifest_path(OUTPUT_DB).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("input_hash") != digest or manifest.get("sha256") != file_digest(OUTPUT_DB):
+        write_manifest(OUTPUT_DB, digest, start_year, end_year, manifest.get("build_seconds"))
+    print(f"{OUTPUT_DB.name} is up to date (inputs {digest[:12]}); nothing to build.")
+    return True
+
+
+def has_schema(path: Path) -> bool:
+    """Whether ``path`` is a database of this ``SCHEMA_VERSION`` with every table in place."""
+    if not path.exists():
+        return False
+    conn = sqlite3.connect(path)
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    return version == SCHEMA_VERSION and {
+        "continent", "country", "airport", "airport_geo", "timezone", "timezone_transition", "metadata",
+        *STATS_TABLES, *FTS_TABLES,
+    } <= names
+
+
+def update_database(
+    start_year: int = TRANSITION_START_YEAR, end_year: int = TRANSITION_END_YEAR, force: bool = False
+) -> None:
+    """Apply only the curated-CSV changes to an existing database.
+
+    Rows are diffed by primary key; changed airports are removed from the
+    FTS5 and R*Tree indexes using their old values before being rewritten,
+    then re-indexed. VACUUM only runs once the free-page ratio crosses
+    ``VACUUM_FREELIST_THRESHOLD``. Falls back to a full build when there is
+    no database (or an older schema) to update. The result matches a full
+    build row for row, but not byte for byte.
+    """
+    if not CURATED_COUNTRIES.exists() or not CURATED_AIRPORTS.exists():
+        raise FileNotFoundError("Run the processing scripts before building the database.")
+
+    if not has_schema(OUTPUT_DB):
+        print(f"No incremental base in {OUTPUT_DB.name}; running a full build.")
+        build_database(start_year, end_year, force)
+        return
+
+    digest = input_hash(start_year, end_year)
+    if not force and is_up_to_date(digest, start_year, end_year):
+        return
+    started = time.perf_counter()
+    conn = sqlite3.connect(OUTPUT_DB)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        with conn:
+            continents = TableDiff(conn, "continent", ("code", "name"), continent_rows())
+            countries = TableDiff(conn, "country", ("code", "name", "continent_code"), country_rows())
+            airports = TableDiff(conn, "airport", AIRPORT_COLUMNS, airport_rows())
+
+            continents.apply_upserts(conn)
+            countries.apply_upserts(conn)
+
+            # Stats are recomputed for the regions airports leave and the ones they join.
+            stale_countries, stale_continents = airport_regions(
+                conn, [row[0] for row in airports.updates] + airports.deletes
+            )
+            changed = airport_rowids(conn, [row[0] for row in airports.updates] + airports.deletes)
+            unindex_airports(conn, changed)
+            airports.apply_deletes(conn)
+            airports.apply_upserts(conn)
+            index_airports(
+                conn,
+                airport_rowids(conn, [row[0] for row in airports.updates + airports.inserts]),
+            )
+            new_countries, new_continents = airport_regions(conn, [row[0] for row in airports.updates + airports.inserts])
+
+            countries.apply_deletes(conn)
+            continents.apply_deletes(conn)
+            refresh_stats(
+                conn,
+                stale_countries | new_countries | {row[0] for row in countries.inserts} | set(countries.deletes),
+                stale_continents | new_continents | {row[0] for row in continents.inserts} | set(continents.deletes),
+            )
+            populate_timezones(conn, start_year, end_year)
+            write_metadata(conn, digest, start_year, end_year)
+
+        (free_pages,) = conn.execute("PRAGMA freelist_count").fetchone()
+        (total_pages,) = conn.execute("PRAGMA page_count").fetchone()
+        vacuumed = total_pages > 0 and free_pages / total_pages > VACUUM_FREELIST_THRESHOLD
+        if vacuumed:
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+    write_manifest(OUTPUT_DB, digest, start_year, end_year, time.perf_counter() - started)
+
+    changes = len(continents) + len(countries) + len(airports)
+    print(
+        f"Applied {changes} changes to {OUTPUT_DB.name} "
+        f"({continents.summary()}; {countries.summary()}; {airports.summary()})"
+        + ("; vacuumed." if vacuumed else ".")
+    )
+
+
+def build_database(
+    start_year: int = TRANSITION_START_YEAR, end_year: int = TRANSITION_END_YEAR, force: bool = False
+) -> None:
+    """Rebuild the database from scratch, unless its stored input hash shows it is current.
+
+    The same inputs always produce a byte-identical file (for a given SQLite
+    version), and a manifest is written next to it.
+    """
     if not CURATED_COUNTRIES.exists() or not CURATED_AIRPORTS.exists():
         raise FileNotFoundError("Run the processing scripts before building the database.")
 
+    digest = input_hash(start_year, end_year)
+    if not force and is_up_to_date(digest, start_year, end_year):
+        return
+    started = time.perf_counter()
     if OUTPUT_DB.exists():
         OUTPUT_DB.unlink()
 
@@ -159,10 +765,115 @@ def build_database() -> None:
         populate_continents(conn)
         populate_countries(conn)
         populate_airports(conn)
+        refresh_stats(conn)
         populate_fts(conn)
+        populate_trigram(conn)
+        populate_geo(conn)
+        populate_timezones(conn, start_year, end_year)
+        write_metadata(conn, digest, start_year, end_year)
         conn.commit()
         conn.execute("VACUUM")
+    write_manifest(OUTPUT_DB, digest, start_year, end_year, time.perf_counter() - started)
+
+
+def optimize_fts(conn: sqlite3.Connection) -> None:
+    """Merge each FTS5 index into a single segment and restore the default merge settings."""
+    for table in FTS_TABLES:
+        conn.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+        conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('automerge', {FTS_DEFAULT_AUTOMERGE})")
+        conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('crisismerge', {FTS_DEFAULT_CRISISMERGE})")
+
+
+def build_database_fast(
+    start_year: int = TRANSITION_START_YEAR, end_year: int = TRANSITION_END_YEAR, force: bool = False
+) -> None:
+    """Bulk-load build into a temporary file, then rename it over the database.
+
+    Durability is switched off (no journal, no fsync) because a crash only
+    loses the temporary file. Secondary indexes are created after the rows
+    are in, the FTS5 indexes are loaded without incremental merges and
+    optimised once, and the tables are ANALYZEd before the file is
+    atomically moved into place, so readers see either the old database or
+    the finished new one. Like ``build_database()``, it is skipped when the
+    stored input hash matches and is deterministic otherwise.
+    """
+    if not CURATED_COUNTRIES.exists() or not CURATED_AIRPORTS.exists():
+        raise FileNotFoundError("Run the processing scripts before building the database.")
+
+    digest = input_hash(start_year, end_year)
+    if not force and is_up_to_date(digest, start_year, end_year):
+        return
+    started = time.perf_counter()
+    temp_path = OUTPUT_DB.with_name(f"{OUTPUT_DB.name}.{os.getpid()}.tmp")
+    temp_path.unlink(missing_ok=True)
+    conn = sqlite3.connect(temp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA cache_size = -{FAST_BUILD_CACHE_KIB}")
+        with conn:
+            create_schema(conn, indexes=False)
+            populate_continents(conn)
+            populate_countries(conn)
+            populate_airports(conn)
+            create_indexes(conn)
+            refresh_stats(conn)
+            populate_fts(conn, bulk=True)
+            populate_trigram(conn, bulk=True)
+            populate_geo(conn)
+            populate_timezones(conn, start_year, end_year)
+            write_metadata(conn, digest, start_year, end_year)
+            optimize_fts(conn)
+            conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+    except BaseException:
+        conn.close()
+        temp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(temp_path, OUTPUT_DB)
+    write_manifest(OUTPUT_DB, digest, start_year, end_year, time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build data/globelog.sqlite from the curated CSVs.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--incremental",
+        action="store_true",
+        help="apply only changed rows to the existing database instead of rebuilding it",
+    )
+    mode.add_argument(
+        "--fast",
+        action="store_true",
+        help="bulk-load into a temporary file with durability off, then atomically replace the database",
+    )
+    parser.add_argument(
+        "--tz-years",
+        nargs=2,
+        type=int,
+        default=(TRANSITION_START_YEAR, TRANSITION_END_YEAR),
+        metavar=("START", "END"),
+        help=f"years covered by the timezone transition table (default: {TRANSITION_START_YEAR} {TRANSITION_END_YEAR})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="build even if the database's stored input hash matches the current inputs",
+    )
+    args = parser.parse_args()
+    start_year, end_year = args.tz_years
+    if start_year > end_year:
+        parser.error("--tz-years START must not be after END")
+    if args.incremental:
+        update_database(start_year, end_year, args.force)
+    elif args.fast:
+        build_database_fast(start_year, end_year, args.force)
+    else:
+        build_database(start_year, end_year, args.force)
 
 
 if __name__ == "__main__":
-    build_database()
+    main()
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from build_sqlite import AIRPORT_COLUMNS, FTS_TABLES, STATS_COLUMNS, content_digest
+
+
+ROOT = Path(__file__).parent
+DATA_DIR = ROOT / "data"
+DB_PATH = DATA_DIR / "globelog.sqlite"
+
+FORMAT_VERSION = 1
+HEADER = f"-- globelog-delta {FORMAT_VERSION}"
+
+# Airport columns feeding the FTS5 tables and the R*Tree; changes to the
+# other columns leave those indexes alone.
+FTS_COLUMNS = frozenset(
+    ("name", "municipality", "iata", "icao_code", "country_code", "name_folded", "municipality_folded")
+)
+GEO_COLUMNS = frozenset(("latitude", "longitude"))
+
+
+class KeyedTable(NamedTuple):
+    name: str
+    key: str
+    columns: Tuple[str, ...]
+
+
+CONTINENT = KeyedTable("continent", "code", ("code", "name"))
+COUNTRY = KeyedTable("country", "code", ("code", "name", "continent_code"))
+AIRPORT = KeyedTable("airport", "iata", AIRPORT_COLUMNS)
+COUNTRY_STATS = KeyedTable("country_stats", "country_code", ("country_code", *STATS_COLUMNS))
+CONTINENT_STATS = KeyedTable("continent_stats", "continent_code", ("continent_code", *STATS_COLUMNS))
+METADATA = KeyedTable("metadata", "key", ("key", "value"))
+
+Rows = Dict[object, tuple]
+
+
+class Changes(NamedTuple):
+    inserts: List[tuple]
+    updates: List[Tuple[tuple, tuple]]
+    deletes: List[object]
+
+    def summary(self, table: str) -> str:
+        return f"{table} +{len(self.inserts)} ~{len(self.updates)} -{len(self.deletes)}"
+
+
+class Delta(NamedTuple):
+    """A patch from the build with input hash ``base`` to the build with content digest ``target``."""
+
+    base: str
+    target: str
+    statements: List[str]
+    summary: str
+
+    def render(self) -> str:
+        lines = [
+            HEADER,
+            f"-- base-input-hash: {self.base}",
+            f"-- target-content-sha256: {self.target}",
+            f"-- changes: {self.summary}",
+        ]
+        return "\n".join(lines + [f"{statement};" for statement in self.statements]) + "\n"
+
+
+def sql_literal(value: object) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, float):
+        # repr() gives "inf"/"nan", which SQLite would read as column names.
+        if not math.isfinite(value):
+            raise ValueError(f"Cannot write the non-finite value {value!r} into a patch.")
+        return repr(value)
+    return str(int(value))
+
+
+def sql_list(values: Iterable[object]) -> str:
+    return ", ".join(sql_literal(value) for value in values)
+
+
+def read_rows(conn: sqlite3.Connection, table: KeyedTable) -> Rows:
+    return {
+        row[0]: tuple(row)
+        for row in conn.execute(f"SELECT {', '.join(table.columns)} FROM {table.name} ORDER BY {table.key}")
+    }
+
+
+def diff_rows(old: Rows, new: Rows) -> Changes:
+    return Changes(
+        [row for key, row in new.items() if key not in old],
+        [(old[key], row) for key, row in new.items() if key in old and old[key] != row],
+        [key for key in old if key not in new],
+    )
+
+
+def keyed_statements(table: KeyedTable, changes: Changes) -> Tuple[List[str], List[str]]:
+    """(upsert statements, delete statements) for a table keyed on its first column.
+
+    Updates only set the columns that changed.
+    """
+    upserts = []
+    for old, new in changes.updates:
+        assignments = ", ".join(
+            f"{column} = {sql_literal(value)}"
+            for column, before, value in zip(table.columns, old, new)
+            if before != value
+        )
+        upserts.append(f"UPDATE {table.name} SET {assignments} WHERE {table.key} = {sql_literal(new[0])}")
+    if changes.inserts:
+        values = ", ".join(f"({sql_list(row)})" for row in changes.inserts)
+        upserts.append(f"INSERT INTO {table.name}({', '.join(table.columns)}) VALUES {values}")
+    deletes = []
+    if changes.deletes:
+        deletes.append(f"DELETE FROM {table.name} WHERE {table.key} IN ({sql_list(changes.deletes)})")
+    return upserts, deletes
+
+
+def airport_statements(changes: Changes) -> List[str]:
+    """Airport upserts and deletes, keeping the FTS5 and R*Tree indexes in sync.
+
+    Rows leave an index while their old values are still in place and rejoin
+    it after being rewritten; updates that touch none of an index's columns
+    skip it.
+    """
+    changed = {
+        new[0]: {column for column, before, value in zip(AIRPORT_COLUMNS, old, new) if before != value}
+        for old, new in changes.updates
+    }
+    inserted = [row[0] for row in changes.inserts]
+    fts_updates = [code for code, columns in changed.items() if columns & FTS_COLUMNS]
+    geo_updates = [code for code, columns in changed.items() if columns & GEO_COLUMNS]
+    fts_out, fts_in = fts_updates + changes.deletes, fts_updates + inserted
+    geo_out, geo_in = geo_updates + changes.deletes, geo_updates + inserted
+
+    statements = []
+    if fts_out:
+        for table, (columns, source) in FTS_TABLES.items():
+            statements.append(
+                f"INSERT INTO {table}({table}, rowid, {columns}) "
+                f"SELECT 'delete', rowid, {source} FROM airport WHERE iata IN ({sql_list(fts_out)})"
+            )
+    if geo_out:
+        statements.append(
+            f"DELETE FROM airport_geo WHERE id IN (SELECT rowid FROM airport WHERE iata IN ({sql_list(geo_out)}))"
+        )
+    upserts, deletes = keyed_statements(AIRPORT, changes)
+    statements += deletes + upserts
+    if fts_in:
+        for table, (columns, source) in FTS_TABLES.items():
+            statements.append(
+                f"INSERT INTO {table}(rowid, {columns}) "
+                f"SELECT rowid, {source} FROM airport WHERE iata IN ({sql_list(fts_in)})"
+            )
+    if geo_in:
+        statements.append(
+            "INSERT INTO airport_geo(id, min_lat, max_lat, min_lon, max_lon) "
+            f"SELECT rowid, latitude, latitude, longitude, longitude FROM airport WHERE iata IN ({sql_list(geo_in)})"
+        )
+    return statements
+
+
+def read_timezones(conn: sqlite3.Connection) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, Rows]]:
+    zones = {
+        name: (first, last) for name, first, last in conn.execute("SELECT name, first_year, last_year FROM timezone")
+    }
+    transitions: Dict[str, Rows] = {name: {} for name in zones}
+    for name, *row in conn.execute(
+        """
+        SELECT z.name, t.utc_start, t.utc_offset, t.is_dst, t.abbreviation
+        FROM timezone_transition AS t JOIN timezone AS z ON z.id = t.timezone_id
+        ORDER BY z.name, t.utc_start
+        """
+    ):
+        transitions[name][row[0]] = tuple(row)
+    return zones, transitions
+
+
+def zone_id(name: str) -> str:
+    return f"(SELECT id FROM timezone WHERE name = {sql_literal(name)})"
+
+
+def insert_transitions(name: str, rows: Sequence[tuple], replace: bool = False) -> str:
+    values = ", ".join(f"({sql_list(row)})" for row in rows)
+    return (
+        f"INSERT {'OR REPLACE ' if replace else ''}INTO timezone_transition"
+        "(timezone_id, utc_start, utc_offset, is_dst, abbreviation) "
+        f"SELECT {zone_id(name)}, column1, column2, column3, column4 FROM (VALUES {values})"
+    )
+
+
+def timezone_statements(old: sqlite3.Connection, new: sqlite3.Connection) -> Tuple[List[str], str]:
+    """Timezone and transition changes, matched by zone name since ids differ between builds."""
+    old_zones, old_transitions = read_timezones(old)
+    new_zones, new_transitions = read_timezones(new)
+    removed = [name for name in old_zones if name not in new_zones]
+    added = [name for name in new_zones if name not in old_zones]
+    kept = [name for name in new_zones if name in old_zones]
+
+    statements = []
+    if removed:
+        statements.append(
+            "DELETE FROM timezone_transition WHERE timezone_id IN "
+            f"(SELECT id FROM timezone WHERE name IN ({sql_list(removed)}))"
+        )
+        statements.append(f"DELETE FROM timezone WHERE name IN ({sql_list(removed)})")
+    if added:
+        values = ", ".join(f"({sql_list((name, *new_zones[name]))})" for name in added)
+        statements.append(f"INSERT INTO timezone(name, first_year, last_year) VALUES {values}")
+        statements += [insert_transitions(name, list(new_transitions[name].values())) for name in added]
+    changed_zones = 0
+    for name in kept:
+        if old_zones[name] != new_zones[name]:
+            first, last = new_zones[name]
+            statements.append(
+                f"UPDATE timezone SET first_year = {first}, last_year = {last} WHERE name = {sql_literal(name)}"
+            )
+        changes = diff_rows(old_transitions[name], new_transitions[name])
+        if changes.deletes:
+            statements.append(
+                f"DELETE FROM timezone_transition WHERE timezone_id = {zone_id(name)} "
+                f"AND utc_start IN ({sql_list(changes.deletes)})"
+            )
+        upserts = changes.inserts + [row for _, row in changes.updates]
+        if upserts:
+            statements.append(insert_transitions(name, upserts, replace=True))
+        changed_zones += bool(changes.deletes or upserts or old_zones[name] != new_zones[name])
+    return statements, f"timezone +{len(added)} ~{changed_zones} -{len(removed)}"
+
+
+def schema(conn: sqlite3.Connection) -> Tuple[int, List[tuple]]:
+    (user_version,) = conn.execute("PRAGMA user_version").fetchone()
+    return user_version, conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+
+
+def create_delta(old_path: Path, new_path: Path) -> Delta:
+    """Diff two builds by primary key (airport IATA, country and continent code, zone name).
+
+    Both builds must share a schema; after a schema change clients need the
+    full database.
+    """
+    old = sqlite3.connect(f"{old_path.resolve().as_uri()}?mode=ro", uri=True)
+    new = sqlite3.connect(f"{new_path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        if schema(old) != schema(new):
+            raise ValueError(f"{old_path.name} and {new_path.name} have different schemas; ship the full database.")
+        changes = {
+            table: diff_rows(read_rows(old, table), read_rows(new, table))
+            for table in (CONTINENT, COUNTRY, AIRPORT, COUNTRY_STATS, CONTINENT_STATS, METADATA)
+        }
+        continent_upserts, continent_deletes = keyed_statements(CONTINENT, changes[CONTINENT])
+        country_upserts, country_deletes = keyed_statements(COUNTRY, changes[COUNTRY])
+        stats_upserts, stats_deletes = [], []
+        for table in (COUNTRY_STATS, CONTINENT_STATS):
+            upserts, deletes = keyed_statements(table, changes[table])
+            stats_upserts += upserts
+            stats_deletes += deletes
+        timezone_changes, timezone_summary = timezone_statements(old, new)
+        metadata_upserts, metadata_deletes = keyed_statements(METADATA, changes[METADATA])
+        # Parents are upserted before and deleted after the rows referencing them.
+        statements = (
+            continent_upserts
+            + country_upserts
+            + airport_statements(changes[AIRPORT])
+            + stats_deletes
+            + stats_upserts
+            + country_deletes
+            + continent_deletes
+            + timezone_changes
+            + metadata_deletes
+            + metadata_upserts
+        )
+        summary = "; ".join(
+            [*(changes[table].summary(table.name) for table in (CONTINENT, COUNTRY, AIRPORT)), timezone_summary]
+        )
+        return Delta(input_hash(old), content_digest(new), statements, summary)
+    finally:
+        old.close()
+        new.close()
+
+
+def input_hash(conn: sqlite3.Connection) -> Optional[str]:
+    row = conn.execute("SELECT value FROM metadata WHERE key = 'input_hash'").fetchone()
+    return row[0] if row else None
+
+
+def read_header(patch: str) -> Dict[str, str]:
+    lines = patch.splitlines()
+    if not lines or lines[0] != HEADER:
+        raise ValueError(f"Not a globelog delta (expected {HEADER!r} on the first line)")
+    header = {}
+    for line in lines[1:]:
+        if not line.startswith("-- "):
+            break
+        key, _, value = line[3:].partition(": ")
+        header[key] = value
+    return header
+
+
+def check_fts(conn: sqlite3.Connection) -> None:
+    """Raise sqlite3.DatabaseError if an FTS5 index disagrees with the airport rows."""
+    for table in FTS_TABLES:
+        conn.execute(f"INSERT INTO {table}({table}, rank) VALUES ('integrity-check', 1)")
+
+
+def apply_patch(db_path: Path, patch: str, manifest: Optional[dict] = None) -> None:
+    """Apply a delta in one transaction, committing only if the result is the target build.
+
+    The database must carry the base build's input hash, and when a target
+    ``manifest`` is given its ``content_sha256`` must be the patch's target.
+    After the statements run, the content digest and the FTS5 indexes are
+    checked, which also catches bases edited since they were built; on any
+    mismatch everything is rolled back.
+    """
+    header = read_header(patch)
+    base, target = header.get("base-input-hash"), header.get("target-content-sha256")
+    if manifest is not None and manifest.get("content_sha256") != target:
+        raise ValueError("The patch does not produce the build described by the manifest.")
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("BEGIN IMMEDIATE")
+        if input_hash(conn) != base:
+            raise ValueError(f"{db_path.name} is not the base build of this patch.")
+        # executescript() would commit the open transaction first; run statement by statement instead.
+        for statement in split_statements(patch):
+            conn.execute(statement)
+        if content_digest(conn) != target:
+            raise ValueError(f"Patched {db_path.name} does not match the target build; rolled back.")
+        check_fts(conn)
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def split_statements(patch: str) -> Iterable[str]:
+    """Yield the statements of a patch; each ends with ';' at the end of its line."""
+    buffer = ""
+    for line in patch.splitlines(keepends=True):
+        if not buffer and line.startswith("--"):
+            continue
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            yield buffer
+            buffer = ""
+    if buffer.strip():
+        raise ValueError("Truncated patch: the last statement is incomplete.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Create or apply SQL delta patches between globelog.sqlite builds.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="diff two builds into a patch")
+    create.add_argument("old", type=Path, help="the build clients have")
+    create.add_argument("new", type=Path, help="the new build")
+    create.add_argument("-o", "--output", type=Path, help="patch file (default: stdout)")
+    apply = commands.add_parser("apply", help="apply a patch to a database in place")
+    apply.add_argument("patch", type=Path)
+    apply.add_argument("--db", type=Path, default=DB_PATH, help="database to patch (default: %(default)s)")
+    apply.add_argument("--manifest", type=Path, help="the target build's manifest to verify against")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "create":
+            delta = create_delta(args.old, args.new)
+            text = delta.render()
+            if args.output is None:
+                sys.stdout.write(text)
+            else:
+                args.output.write_text(text, encoding="utf-8")
+                print(
+                    f"Wrote {args.output.name} ({len(text.encode()):,} bytes, "
+                    f"{len(delta.statements)} statements): {delta.summary}"
+                )
+            return
+
+        manifest = json.loads(args.manifest.read_text(encoding="utf-8")) if args.manifest else None
+        apply_patch(args.db, args.patch.read_text(encoding="utf-8"), manifest)
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        print(f"{args.command.capitalize()} failed: {exc}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Applied {args.patch.name} to {args.db.name}" + (f"; matches {args.manifest.name}." if manifest else "."))
+
+
+if __name__ == "__main__":
+    main()
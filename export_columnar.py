@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Sequence
+
+from globelog.columnar import FORMATS, write_columnar
+from globelog.data import COLUMNAR_DIR
+
+
+def export_columnar(output_dir: Path = COLUMNAR_DIR, formats: Sequence[str] = FORMATS) -> None:
+    for path, table in write_columnar(output_dir, formats):
+        print(f"Wrote {path.name} ({table.num_rows:,} rows, {path.stat().st_size / 1024:,.0f} KiB).")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export the curated CSVs as Parquet and Arrow IPC files with typed, dictionary-encoded columns."
+    )
+    parser.add_argument("--output-dir", type=Path, default=COLUMNAR_DIR, help="output directory (default: %(default)s)")
+    parser.add_argument(
+        "--format", choices=FORMATS, action="append", dest="formats",
+        help="only write this format; repeatable (default: both)",
+    )
+    args = parser.parse_args()
+    export_columnar(args.output_dir, args.formats or FORMATS)
+
+
+if __name__ == "__main__":
+    main()
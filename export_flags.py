@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from globelog.data import FLAGS_DIR
+from globelog.flags import FLAG_BUNDLE_PATH, write_bundle
+
+
+def export_flags(flags_dir: Path = FLAGS_DIR, output: Path = FLAG_BUNDLE_PATH) -> None:
+    count, size = write_bundle(flags_dir, output)
+    print(f"Wrote {output.name} ({count} flags, {size / 1024:,.0f} KiB) from {flags_dir.name}/.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pack the flag assets into one memory-mappable bundle file.")
+    parser.add_argument("--flags-dir", type=Path, default=FLAGS_DIR, help="flag assets (default: %(default)s)")
+    parser.add_argument("--output", type=Path, default=FLAG_BUNDLE_PATH, help="bundle path (default: %(default)s)")
+    args = parser.parse_args()
+    export_flags(args.flags_dir, args.output)
+
+
+if __name__ == "__main__":
+    main()
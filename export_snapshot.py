@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from globelog.snapshot import SNAPSHOT_PATH, write_snapshot
+
+
+ROOT = Path(__file__).parent
+DATA_DIR = ROOT / "data"
+DB_PATH = DATA_DIR / "globelog.sqlite"
+
+
+def export_snapshot(db_path: Path = DB_PATH, output: Path = SNAPSHOT_PATH) -> None:
+    size = write_snapshot(db_path, output)
+    print(f"Wrote {output.name} ({size / 1024:,.0f} KiB) from {db_path.name}.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export data/globelog.sqlite as a memory-mappable binary snapshot for client bundles."
+    )
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="database to export (default: %(default)s)")
+    parser.add_argument("--output", type=Path, default=SNAPSHOT_PATH, help="snapshot path (default: %(default)s)")
+    args = parser.parse_args()
+    export_snapshot(args.db, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from globelog.data import fold_accents
+from globelog.db import GlobeLogDB
+
+
+ROOT = Path(__file__).parent
+DATA_DIR = ROOT / "data"
+DB_PATH = DATA_DIR / "globelog.sqlite"
+
+CANDIDATE_LIMIT = 200
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+class FuzzyMatch(NamedTuple):
+    iata: str
+    name: str
+    municipality: str
+    country_code: str
+    distance: int
+    first_letter_misses: int
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-folded words of ``text``, matching the folded text in ``airport_trigram``."""
+    return TOKEN_PATTERN.findall(fold_accents(text).lower())
+
+
+def trigrams(term: str) -> List[str]:
+    return [term[i : i + 3] for i in range(len(term) - 2)]
+
+
+def default_max_distance(term: str) -> int:
+    if len(term) <= 3:
+        return 0
+    if len(term) <= 5:
+        return 1
+    return 2
+
+
+def bounded_distance(source: str, target: str, bound: int, prefix: bool = False) -> Optional[int]:
+    """Optimal-string-alignment distance, or ``None`` once it exceeds ``bound``.
+
+    With ``prefix`` set, ``source`` is compared against the closest prefix of
+    ``target`` instead, so a partially typed word still matches.
+    """
+    if not prefix and abs(len(source) - len(target)) > bound:
+        return None
+
+    previous_previous: List[int] = []
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        source_char = source[i - 1]
+        for j in range(1, len(target) + 1):
+            cost = 0 if source_char == target[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                i > 1
+                and j > 1
+                and source_char == target[j - 2]
+                and source[i - 2] == target[j - 1]
+            ):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+        if min(current) > bound:
+            return None
+        previous_previous, previous = previous, current
+
+    distance = min(previous) if prefix else previous[-1]
+    return distance if distance <= bound else None
+
+
+@lru_cache(maxsize=None)
+def _database(path: Path) -> GlobeLogDB:
+    return GlobeLogDB(path)
+
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    """This thread's read-only connection to the database, shared through ``GlobeLogDB``."""
+    return _database(path).connection()
+
+
+def quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def candidates(conn: sqlite3.Connection, terms: List[str], limit: int) -> List[tuple]:
+    """Fetch candidate airports sharing trigrams (or a short prefix) with the query."""
+    grams = sorted({gram for term in terms for gram in trigrams(term)})
+    if grams:
+        return conn.execute(
+            """
+            SELECT a.iata, a.name, IFNULL(a.municipality, ''), a.country_code
+            FROM airport_trigram AS t
+            JOIN airport AS a ON a.rowid = t.rowid
+            WHERE airport_trigram MATCH ?
+            ORDER BY t.rank
+            LIMIT ?
+            """,
+            (" OR ".join(quote(gram) for gram in grams), limit),
+        ).fetchall()
+
+    # Trigrams need three characters; shorter input falls back to token prefixes.
+    return conn.execute(
+        """
+        SELECT a.iata, a.name, IFNULL(a.municipality, ''), a.country_code
+        FROM airport_search AS s
+        JOIN airport AS a ON a.rowid = s.rowid
+        WHERE airport_search MATCH ?
+        ORDER BY s.rank
+        LIMIT ?
+        """,
+        (" OR ".join(quote(term) + "*" for term in terms), limit),
+    ).fetchall()
+
+
+def search(
+    query: str,
+    limit: int = 10,
+    max_distance: Optional[int] = None,
+    conn: sqlite3.Connection | None = None,
+) -> List[FuzzyMatch]:
+    """Typo-tolerant airport search over name, municipality and IATA code.
+
+    Candidates are generated through the ``airport_trigram`` index and then
+    ranked by bounded edit distance: every query word must be within
+    ``max_distance`` edits (by default 0-2 depending on its length) of a word
+    in the airport's name, municipality or code. The last word is matched as
+    a prefix so results stay useful while the user is typing.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+    conn = conn or connect()
+
+    matches: List[FuzzyMatch] = []
+    for iata, name, municipality, country_code in candidates(conn, terms, CANDIDATE_LIMIT):
+        words = set(tokenize(name)) | set(tokenize(municipality)) | {iata.lower()}
+        total = 0
+        misses = 0
+        for index, term in enumerate(terms):
+            bound = default_max_distance(term) if max_distance is None else max_distance
+            is_last = index == len(terms) - 1
+            best: Optional[int] = None
+            best_word = ""
+            for word in words:
+                distance = bounded_distance(term, word, bound if best is None else best - 1, prefix=is_last)
+                if distance is not None:
+                    best, best_word = distance, word
+                    if best == 0:
+                        break
+            if best is None:
+                break
+            total += best
+            misses += best_word[0] != term[0]
+        else:
+            matches.append(FuzzyMatch(iata, name, municipality, country_code, total, misses))
+
+    # Typos rarely hit the first letter, so that breaks ties between equal
+    # distances; the sort is stable, so the index's relevance order comes last.
+    matches.sort(key=lambda match: (match.distance, match.first_letter_misses))
+    return matches[:limit]
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print("Usage: python fuzzy_search.py QUERY")
+        sys.exit(1)
+    for match in search(" ".join(sys.argv[1:])):
+        print(f"  {match.iata:>3} | {match.name} | {match.municipality} | {match.country_code} | d={match.distance}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Shared data access for the GlobeLog pipeline scripts."""
+
+from globelog.data import (
+    Airport,
+    Continent,
+    Country,
+    load_airports,
+    load_continents,
+    load_countries,
+)
+from globelog.db import GlobeLogDB
+from globelog.timezones import TimezoneEntry, load_timezone_feed, load_timezone_overrides
+
+__all__ = [
+    "Airport",
+    "Continent",
+    "Country",
+    "GlobeLogDB",
+    "TimezoneEntry",
+    "load_airports",
+    "load_continents",
+    "load_countries",
+    "load_timezone_feed",
+    "load_timezone_overrides",
+]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class FileCache:
+    """Process-wide memo of parsed files.
+
+    An entry is reused until the file's mtime or size changes, so a script
+    that rewrites a CSV and then reads it back still sees the new contents.
+    Parsing happens under a lock per file, so threads loading different files
+    do not wait for each other, and a parser may itself read cached files.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Tuple[str, Path], Tuple[Tuple[int, int], object]] = {}
+        self._key_locks: Dict[Tuple[str, Path], threading.Lock] = {}
+        # Guards the two dicts above and parse_counts; never held while parsing.
+        self._lock = threading.Lock()
+        self.parse_counts: Counter = Counter()
+
+    def _lookup(self, key: Tuple[str, Path], signature: Tuple[int, int]) -> Optional[Tuple[Tuple[int, int], object]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry if entry is not None and entry[0] == signature else None
+
+    def get(self, path: Path, parse: Callable[[Path], T]) -> T:
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = (parse.__qualname__, path.resolve())
+        entry = self._lookup(key, signature)
+        if entry is not None:
+            return entry[1]  # type: ignore[return-value]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another thread may have parsed it while this one waited.
+            entry = self._lookup(key, signature)
+            if entry is not None:
+                return entry[1]  # type: ignore[return-value]
+            value = parse(path)
+            with self._lock:
+                self._entries[key] = (signature, value)
+                self.parse_counts[key] += 1
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.parse_counts.clear()
+
+
+FILE_CACHE = FileCache()
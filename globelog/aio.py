@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from globelog.data import DB_PATH, Airport, Country
+from globelog.db import GlobeLogDB, RegionStats
+
+
+T = TypeVar("T")
+
+DEFAULT_WORKERS = 4
+# Upper bound on codes per coalesced IN query; larger bursts are split.
+MAX_BATCH = 1000
+
+
+class AsyncGlobeLogDB:
+    """asyncio façade over ``GlobeLogDB`` that never blocks the event loop.
+
+    Queries run on a bounded thread pool, each worker using its own read-only
+    connection. IATA lookups are coalesced: every ``lookup``/``lookup_many``
+    issued during one event-loop iteration is answered by a single
+    ``WHERE iata IN (...)`` query, so thousands of concurrent coroutines cost
+    a handful of round trips instead of one each.
+    """
+
+    def __init__(self, path: Path = DB_PATH, max_workers: int = DEFAULT_WORKERS) -> None:
+        self._db = GlobeLogDB(path)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="globelog-db")
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_scheduled = False
+        self.batches = 0
+
+    async def __aenter__(self) -> "AsyncGlobeLogDB":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._executor.shutdown, wait=True))
+        self._db.close()
+
+    async def _run(self, function: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    # ── coalesced IATA lookups ────────────────────────────────────────────
+
+    def _enqueue(self, iata: str) -> asyncio.Future:
+        code = iata.strip().upper()
+        future = self._pending.get(code)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[code] = loop.create_future()
+            if not self._flush_scheduled:
+                # Runs after every coroutine already scheduled for this iteration.
+                self._flush_scheduled = True
+                loop.call_soon(self._flush)
+        # Shielded because the future is shared: one caller being cancelled
+        # must not cancel the same code for everyone else.
+        return asyncio.shield(future)
+
+    async def lookup(self, iata: str) -> Optional[Airport]:
+        return await self._enqueue(iata)
+
+    async def lookup_many(self, iatas: Iterable[str]) -> List[Optional[Airport]]:
+        """Airports for ``iatas`` in input order, ``None`` for unknown codes."""
+        return list(await asyncio.gather(*(self._enqueue(code) for code in iatas)))
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        pending, self._pending = list(self._pending.items()), {}
+        loop = asyncio.get_running_loop()
+        for start in range(0, len(pending), MAX_BATCH):
+            batch = pending[start:start + MAX_BATCH]
+            self.batches += 1
+            query = loop.run_in_executor(self._executor, self._db.airports_by_iata, [code for code, _ in batch])
+            query.add_done_callback(partial(_resolve, batch))
+
+    # ── plain queries ────────────────────────────────────────────────────
+
+    async def airport_by_iata(self, iata: str) -> Optional[Airport]:
+        return await self.lookup(iata)
+
+    async def airport_by_icao(self, icao: str) -> Optional[Airport]:
+        return await self._run(self._db.airport_by_icao, icao)
+
+    async def airports_in_country(self, country_code: str) -> List[Airport]:
+        return await self._run(self._db.airports_in_country, country_code)
+
+    async def airports_in_timezone(self, timezone: str) -> List[Airport]:
+        return await self._run(self._db.airports_in_timezone, timezone)
+
+    async def country_by_code(self, code: str) -> Optional[Country]:
+        return await self._run(self._db.country_by_code, code)
+
+    async def country_stats(self, code: str) -> Optional[RegionStats]:
+        return await self._run(self._db.country_stats, code)
+
+    async def continent_stats(self, code: str) -> Optional[RegionStats]:
+        return await self._run(self._db.continent_stats, code)
+
+    async def search(self, query: str, limit: int = 10) -> List[Airport]:
+        return await self._run(self._db.search, query, limit)
+
+
+def _resolve(batch: Sequence[Tuple[str, asyncio.Future]], query: asyncio.Future) -> None:
+    if query.cancelled():
+        error: Optional[BaseException] = asyncio.CancelledError()
+    else:
+        error = query.exception()
+    found = {} if error else query.result()
+    for code, future in batch:
+        if future.done():
+            continue
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(found.get(code))
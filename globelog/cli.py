@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from globelog.enrich import CHUNK_ROWS, enrich_file
+from globelog.pipeline import Pipeline, print_result, print_timings
+from globelog.validation import print_report, validate_all
+
+
+def run_pipeline(args: argparse.Namespace) -> int:
+    start = time.perf_counter()
+    results = Pipeline(force=args.force, workers=args.workers).run(report=print_result)
+    print_timings(results, time.perf_counter() - start)
+    return 0 if all(result.ok for result in results) else 1
+
+
+def run_validate_all(args: argparse.Namespace) -> int:
+    report = validate_all(threads=args.threads, processes=args.processes, profile=args.profile)
+    if args.json == "-":
+        print(report.to_json())
+    else:
+        print_report(report)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as handle:
+                handle.write(report.to_json())
+    return report.exit_code
+
+
+def run_enrich(args: argparse.Namespace) -> int:
+    # Keep stdout clean when the enriched rows are written to it.
+    report = sys.stderr if str(args.output) == "-" else sys.stdout
+    try:
+        stats = enrich_file(
+            args.input,
+            args.output,
+            args.format,
+            origin=args.origin,
+            destination=args.destination,
+            workers=args.workers,
+            chunk_rows=args.chunk_rows,
+            progress=report if args.progress else None,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"Enrich failed: {exc}", file=sys.stderr)
+        return 1
+    print(
+        f"Enriched {stats.rows:,} rows in {stats.seconds:.2f} s ({stats.rows_per_second:,.0f} rows/s); "
+        f"{stats.unresolved:,} with an unknown airport code.",
+        file=report,
+    )
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="globelog", description="GlobeLog asset pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the whole pipeline, skipping stages whose inputs are unchanged")
+    run.add_argument("--force", action="store_true", help="re-run every stage even if it looks fresh")
+    run.add_argument("--workers", type=int, default=4, help="maximum number of stages run concurrently")
+    run.set_defaults(handler=run_pipeline)
+
+    validate = commands.add_parser("validate-all", help="run every validator concurrently and report together")
+    validate.add_argument("--json", metavar="PATH", help="also write the report as JSON ('-' prints only JSON)")
+    validate.add_argument("--threads", type=int, default=2, help="threads for I/O-bound validators")
+    validate.add_argument("--processes", type=int, default=None, help="processes for CPU-bound validators")
+    validate.add_argument(
+        "--profile", action="store_true", help="profile each validator's phases and report hotspots and peak memory"
+    )
+    validate.set_defaults(handler=run_validate_all)
+
+    enrich = commands.add_parser(
+        "enrich", help="add airport names, countries, continents, timezones and distances to a flight log"
+    )
+    enrich.add_argument("input", type=Path, help="CSV (with header) or JSON Lines file; '-' reads stdin")
+    enrich.add_argument("output", type=Path, help="enriched file in the same format; '-' writes stdout")
+    enrich.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file suffix (.jsonl/.ndjson, else CSV)")
+    enrich.add_argument("--origin", default="origin", help="origin IATA column or key (default: %(default)s)")
+    enrich.add_argument(
+        "--destination", default="destination", help="destination IATA column or key (default: %(default)s)"
+    )
+    enrich.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    enrich.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per chunk sent to a worker (default: %(default)s)")
+    enrich.add_argument("--progress", action="store_true", help="print rows/sec every few seconds")
+    enrich.set_defaults(handler=run_enrich)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
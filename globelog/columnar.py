@@ -0,0 +1,207 @@
+"""Arrow IPC and Parquet copies of the curated CSVs for analytics readers.
+
+Needs pyarrow, which the rest of the package does not, so it is not imported
+by ``globelog`` itself: ``from globelog.columnar import read_table``.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError as exc:  # pragma: no cover - depends on the environment
+    raise ImportError("globelog.columnar needs pyarrow: pip install pyarrow") from exc
+
+from globelog.data import (
+    COLUMNAR_DIR,
+    CURATED_AIRPORTS,
+    CURATED_CONTINENTS,
+    CURATED_COUNTRIES,
+    Airport,
+    Continent,
+    Country,
+    load_airports,
+    load_continents,
+    load_countries,
+)
+
+
+DATASETS = ("continents", "countries", "airports")
+FORMATS = ("parquet", "arrow")
+
+PARQUET_COMPRESSION = "zstd"
+# Rows per Parquet row group and per Arrow record batch; each row group
+# carries its own min/max/null-count statistics.
+ROW_GROUP_SIZE = 1 << 16
+
+# Category columns are dictionary-encoded against their sorted distinct values.
+CONTINENT_TYPE = pa.dictionary(pa.int8(), pa.string())
+COUNTRY_TYPE = pa.dictionary(pa.int16(), pa.string())
+TIMEZONE_TYPE = pa.dictionary(pa.int16(), pa.string())
+
+CONTINENT_SCHEMA = pa.schema([
+    pa.field("code", pa.string(), nullable=False),
+    pa.field("name", pa.string(), nullable=False),
+])
+COUNTRY_SCHEMA = pa.schema([
+    pa.field("code", pa.string(), nullable=False),
+    pa.field("name", pa.string(), nullable=False),
+    pa.field("continent", CONTINENT_TYPE, nullable=False),
+])
+# Empty municipality, timezone, ICAO and GPS codes are stored as nulls.
+AIRPORT_SCHEMA = pa.schema([
+    pa.field("iata", pa.string(), nullable=False),
+    pa.field("name", pa.string(), nullable=False),
+    pa.field("latitude_deg", pa.float64(), nullable=False),
+    pa.field("longitude_deg", pa.float64(), nullable=False),
+    pa.field("continent", CONTINENT_TYPE, nullable=False),
+    pa.field("iso_country", COUNTRY_TYPE, nullable=False),
+    pa.field("municipality", pa.string()),
+    pa.field("timezone", TIMEZONE_TYPE),
+    pa.field("icao_code", pa.string()),
+    pa.field("gps_code", pa.string()),
+])
+
+
+def _categories(values: Sequence[str], type: pa.DictionaryType, empty_as_null: bool = False) -> pa.DictionaryArray:
+    categories = sorted({value for value in values if value or not empty_as_null})
+    ids = {value: index for index, value in enumerate(categories)}
+    indices = pa.array([ids.get(value) for value in values], type=type.index_type)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(categories, type=type.value_type))
+
+
+def _text(values: Sequence[str], empty_as_null: bool = False) -> pa.Array:
+    return pa.array([value or None for value in values] if empty_as_null else values, type=pa.string())
+
+
+def continents_table(continents: Iterable[Continent]) -> pa.Table:
+    continents = list(continents)
+    return pa.Table.from_arrays(
+        [_text([c.code for c in continents]), _text([c.name for c in continents])],
+        schema=CONTINENT_SCHEMA,
+    )
+
+
+def countries_table(countries: Iterable[Country]) -> pa.Table:
+    countries = list(countries)
+    return pa.Table.from_arrays(
+        [
+            _text([c.code for c in countries]),
+            _text([c.name for c in countries]),
+            _categories([c.continent for c in countries], CONTINENT_TYPE),
+        ],
+        schema=COUNTRY_SCHEMA,
+    )
+
+
+def airports_table(airports: Iterable[Airport]) -> pa.Table:
+    airports = list(airports)
+    return pa.Table.from_arrays(
+        [
+            _text([a.iata for a in airports]),
+            _text([a.name for a in airports]),
+            pa.array([a.latitude_deg for a in airports], type=pa.float64()),
+            pa.array([a.longitude_deg for a in airports], type=pa.float64()),
+            _categories([a.continent for a in airports], CONTINENT_TYPE),
+            _categories([a.iso_country for a in airports], COUNTRY_TYPE),
+            _text([a.municipality for a in airports], empty_as_null=True),
+            _categories([a.timezone for a in airports], TIMEZONE_TYPE, empty_as_null=True),
+            _text([a.icao_code for a in airports], empty_as_null=True),
+            _text([a.gps_code for a in airports], empty_as_null=True),
+        ],
+        schema=AIRPORT_SCHEMA,
+    )
+
+
+def curated_tables(
+    continents_path: Path = CURATED_CONTINENTS,
+    countries_path: Path = CURATED_COUNTRIES,
+    airports_path: Path = CURATED_AIRPORTS,
+) -> Dict[str, pa.Table]:
+    """The curated CSVs as typed Arrow tables, keyed by dataset name, in file order."""
+    return {
+        "continents": continents_table(load_continents(continents_path).values()),
+        "countries": countries_table(load_countries(countries_path).values()),
+        "airports": airports_table(load_airports(airports_path).values()),
+    }
+
+
+def _write_atomically(path: Path, write: Callable[[str], None]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write(str(temp_path))
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def write_parquet(table: pa.Table, path: Path) -> None:
+    """zstd-compressed Parquet with column statistics, one row group per ``ROW_GROUP_SIZE`` rows."""
+    _write_atomically(path, lambda target: pq.write_table(
+        table,
+        target,
+        compression=PARQUET_COMPRESSION,
+        row_group_size=ROW_GROUP_SIZE,
+        write_statistics=True,
+    ))
+
+
+def write_arrow(table: pa.Table, path: Path) -> None:
+    """Uncompressed Arrow IPC file (Feather v2), so readers can memory-map it without copying."""
+
+    def write(target: str) -> None:
+        with pa.OSFile(target, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=ROW_GROUP_SIZE)
+
+    _write_atomically(path, write)
+
+
+WRITERS = {"parquet": write_parquet, "arrow": write_arrow}
+
+
+def export_path(dataset: str, format: str = "arrow", directory: Path = COLUMNAR_DIR) -> Path:
+    return directory / f"{dataset}.{format}"
+
+
+def write_columnar(
+    directory: Path = COLUMNAR_DIR,
+    formats: Sequence[str] = FORMATS,
+    tables: Optional[Dict[str, pa.Table]] = None,
+) -> List[Tuple[Path, pa.Table]]:
+    """Write each curated table in each of ``formats`` to ``directory``; returns (path, table) pairs."""
+    tables = curated_tables() if tables is None else tables
+    written = []
+    for dataset, table in tables.items():
+        for format in formats:
+            path = export_path(dataset, format, directory)
+            WRITERS[format](table, path)
+            written.append((path, table))
+    return written
+
+
+def read_table(path: Path, columns: Optional[Sequence[str]] = None) -> pa.Table:
+    """Load ``columns`` (default: all) of an exported ``.parquet`` or ``.arrow`` file.
+
+    Arrow files are memory-mapped: the returned columns point into the map,
+    so unselected columns are never read. Parquet only decodes the selected
+    columns.
+    """
+    if path.suffix == ".arrow":
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table if columns is None else table.select(list(columns))
+    return pq.read_table(path, columns=None if columns is None else list(columns), memory_map=True)
+
+
+def read_airports(
+    columns: Optional[Sequence[str]] = None,
+    format: str = "arrow",
+    directory: Path = COLUMNAR_DIR,
+) -> pa.Table:
+    return read_table(export_path("airports", format, directory), columns)
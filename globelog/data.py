@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import csv
+import unicodedata
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, NamedTuple
+
+from globelog._cache import FILE_CACHE
+
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data"
+FLAGS_DIR = ROOT / "flags"
+CURATED_CONTINENTS = DATA_DIR / "curated_continents.csv"
+CURATED_COUNTRIES = DATA_DIR / "curated_countries.csv"
+CURATED_AIRPORTS = DATA_DIR / "curated_airports.csv"
+AIRPORT_TIMEZONES_JSON = DATA_DIR / "airport-timezones.json"
+TIMEZONE_OVERRIDES_PATH = DATA_DIR / "corrections" / "timezone_overrides.json"
+DB_PATH = DATA_DIR / "globelog.sqlite"
+COLUMNAR_DIR = DATA_DIR / "columnar"
+
+
+class Continent(NamedTuple):
+    code: str
+    name: str
+
+
+class Country(NamedTuple):
+    code: str
+    name: str
+    continent: str
+
+
+class Airport(NamedTuple):
+    iata: str
+    name: str
+    latitude_deg: float
+    longitude_deg: float
+    continent: str
+    iso_country: str
+    municipality: str
+    timezone: str
+    icao_code: str
+    gps_code: str
+
+
+def coerce_float(value: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def fold_accents(text: str) -> str:
+    """``text`` decomposed (NFKD) with the combining marks dropped: "São Paulo" -> "Sao Paulo"."""
+    return "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+
+
+def read_rows(path: Path) -> Iterator[Dict[str, str]]:
+    with path.open("r", newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            yield {k: (v.strip() if isinstance(v, str) else "") for k, v in row.items()}
+
+
+def _parse_continents(path: Path) -> Mapping[str, Continent]:
+    continents = {
+        row["code"]: Continent(row["code"], row.get("name", ""))
+        for row in read_rows(path)
+        if row.get("code")
+    }
+    return MappingProxyType(continents)
+
+
+def _parse_countries(path: Path) -> Mapping[str, Country]:
+    countries = {
+        row["code"]: Country(row["code"], row.get("name", ""), row.get("continent", ""))
+        for row in read_rows(path)
+        if row.get("code")
+    }
+    return MappingProxyType(countries)
+
+
+def _parse_airports(path: Path) -> Mapping[str, Airport]:
+    airports = {
+        row["iata"]: Airport(
+            row["iata"],
+            row.get("name", ""),
+            coerce_float(row.get("latitude_deg", "")),
+            coerce_float(row.get("longitude_deg", "")),
+            row.get("continent", ""),
+            row.get("iso_country", ""),
+            row.get("municipality", ""),
+            row.get("timezone", ""),
+            row.get("icao_code", ""),
+            row.get("gps_code", ""),
+        )
+        for row in read_rows(path)
+        if row.get("iata")
+    }
+    return MappingProxyType(airports)
+
+
+def load_continents(path: Path = CURATED_CONTINENTS) -> Mapping[str, Continent]:
+    """Curated continents keyed by code, in file order. Parsed once per file version."""
+    return FILE_CACHE.get(path, _parse_continents)
+
+
+def load_countries(path: Path = CURATED_COUNTRIES) -> Mapping[str, Country]:
+    """Curated countries keyed by ISO code, in file order. Parsed once per file version."""
+    return FILE_CACHE.get(path, _parse_countries)
+
+
+def load_airports(path: Path = CURATED_AIRPORTS) -> Mapping[str, Airport]:
+    """Curated airports keyed by IATA code, in file order. Parsed once per file version."""
+    return FILE_CACHE.get(path, _parse_airports)
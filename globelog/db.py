@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from globelog.data import DB_PATH, Airport, Country
+
+
+MMAP_SIZE = 256 * 1024 * 1024
+STATEMENT_CACHE_SIZE = 64
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Selects airport columns in ``Airport`` field order, with NULLs as "" like the curated CSV.
+AIRPORT_SELECT = """
+    SELECT a.iata, a.name, a.latitude, a.longitude, a.continent_code, a.country_code,
+           IFNULL(a.municipality, ''), IFNULL(a.timezone, ''), IFNULL(a.icao_code, ''), IFNULL(a.gps_code, '')
+    FROM airport AS a
+"""
+BY_IATA_SQL = AIRPORT_SELECT + "WHERE a.iata = ?"
+# One prepared statement serves every batch size: the codes arrive as a JSON array.
+BY_IATA_MANY_SQL = AIRPORT_SELECT + "WHERE a.iata IN (SELECT value FROM json_each(?))"
+BY_ICAO_SQL = AIRPORT_SELECT + "WHERE a.icao_code = ? ORDER BY a.iata"
+IN_COUNTRY_SQL = AIRPORT_SELECT + "WHERE a.country_code = ? ORDER BY a.iata"
+IN_TIMEZONE_SQL = AIRPORT_SELECT + "WHERE a.timezone = ? ORDER BY a.iata"
+COUNTRY_SQL = "SELECT code, name, continent_code FROM country WHERE code = ?"
+STATS_SELECT = """
+    SELECT {key}, airport_count, has_airports, min_latitude, max_latitude, min_longitude, max_longitude,
+           centroid_latitude, centroid_longitude, timezones
+    FROM {table} WHERE {key} = ?
+"""
+COUNTRY_STATS_SQL = STATS_SELECT.format(table="country_stats", key="country_code")
+CONTINENT_STATS_SQL = STATS_SELECT.format(table="continent_stats", key="continent_code")
+SEARCH_SQL = (
+    AIRPORT_SELECT
+    + """
+    JOIN airport_search AS s ON s.rowid = a.rowid
+    WHERE airport_search MATCH ?
+    ORDER BY s.rank
+    LIMIT ?
+    """
+)
+
+
+class RegionStats(NamedTuple):
+    """A country's or continent's row of ``country_stats`` / ``continent_stats``.
+
+    Coordinates are ``None`` for regions without airports.
+    """
+
+    code: str
+    airport_count: int
+    has_airports: bool
+    min_latitude: Optional[float]
+    max_latitude: Optional[float]
+    min_longitude: Optional[float]
+    max_longitude: Optional[float]
+    centroid_latitude: Optional[float]
+    centroid_longitude: Optional[float]
+    timezones: Tuple[str, ...]
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "RegionStats":
+        return cls(row[0], row[1], bool(row[2]), *row[3:9], tuple(json.loads(row[9])))
+
+
+def match_expression(query: str) -> str:
+    """FTS5 query matching every word of ``query``, the last one as a prefix."""
+    terms = TOKEN_PATTERN.findall(query.lower())
+    quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+    if quoted:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class _ThreadConnection:
+    """One thread's connection; closed when the thread's locals are cleared at exit."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def __del__(self) -> None:
+        self.conn.close()
+
+
+class GlobeLogDB:
+    """Read-only query service over ``globelog.sqlite`` for long-running servers.
+
+    The file is opened with ``mode=ro&immutable=1``, so SQLite skips locking
+    and change detection, and with a memory map so reads do not copy pages.
+    Each thread gets its own connection on first use, closed again when the
+    thread exits, so thread-per-request servers do not accumulate them. The
+    queries are fixed
+    SQL strings, so every call reuses a prepared statement from that
+    connection's statement cache. Because of ``immutable``, a rebuilt
+    database is only seen by a new ``GlobeLogDB``.
+    """
+
+    def __init__(self, path: Path = DB_PATH, mmap_size: int = MMAP_SIZE) -> None:
+        if not path.exists():
+            raise FileNotFoundError("Database not found. Run build_sqlite.py first.")
+        self.path = path
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        # Only the thread-local slot holds a connection strongly; this set lets close() find them.
+        self._connections: "weakref.WeakSet[_ThreadConnection]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            conn = sqlite3.connect(
+                f"{self.path.resolve().as_uri()}?mode=ro&immutable=1",
+                uri=True,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                check_same_thread=False,
+            )
+            conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            holder = self._local.holder = _ThreadConnection(conn)
+            with self._lock:
+                self._connections.add(holder)
+        return holder.conn
+
+    def open_connections(self) -> int:
+        """Connections currently open, one per live thread that has queried."""
+        with self._lock:
+            return len(self._connections)
+
+    def close(self) -> None:
+        """Close every thread's connection; threads reconnect on their next call.
+
+        Call it once no thread is querying any more (e.g. at shutdown): a
+        thread in the middle of a query would have its connection closed
+        under it.
+        """
+        with self._lock:
+            holders, self._connections = list(self._connections), weakref.WeakSet()
+            self._local = threading.local()
+        for holder in holders:
+            holder.conn.close()
+
+    def __enter__(self) -> "GlobeLogDB":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _airports(self, sql: str, params: tuple) -> List[Airport]:
+        return [Airport._make(row) for row in self.connection().execute(sql, params)]
+
+    def airport_by_iata(self, iata: str) -> Optional[Airport]:
+        row = self.connection().execute(BY_IATA_SQL, (iata.strip().upper(),)).fetchone()
+        return Airport._make(row) if row else None
+
+    def airports_by_iata(self, codes: Iterable[str]) -> Dict[str, Airport]:
+        """Airports for many IATA codes in one query, keyed by code; unknown codes are left out."""
+        codes = json.dumps(sorted({code.strip().upper() for code in codes}))
+        return {row[0]: Airport._make(row) for row in self.connection().execute(BY_IATA_MANY_SQL, (codes,))}
+
+    def airport_by_icao(self, icao: str) -> Optional[Airport]:
+        row = self.connection().execute(BY_ICAO_SQL, (icao.strip().upper(),)).fetchone()
+        return Airport._make(row) if row else None
+
+    def airports_in_country(self, country_code: str) -> List[Airport]:
+        return self._airports(IN_COUNTRY_SQL, (country_code.strip().upper(),))
+
+    def airports_in_timezone(self, timezone: str) -> List[Airport]:
+        return self._airports(IN_TIMEZONE_SQL, (timezone.strip(),))
+
+    def country_by_code(self, code: str) -> Optional[Country]:
+        row = self.connection().execute(COUNTRY_SQL, (code.strip().upper(),)).fetchone()
+        return Country._make(row) if row else None
+
+    def country_stats(self, code: str) -> Optional[RegionStats]:
+        """Airport count, bounding box, centroid and timezones of a country, read from ``country_stats``."""
+        row = self.connection().execute(COUNTRY_STATS_SQL, (code.strip().upper(),)).fetchone()
+        return RegionStats.from_row(row) if row else None
+
+    def continent_stats(self, code: str) -> Optional[RegionStats]:
+        """Like ``country_stats()``, for a continent code (``EU``, ``NA``, ...)."""
+        row = self.connection().execute(CONTINENT_STATS_SQL, (code.strip().upper(),)).fetchone()
+        return RegionStats.from_row(row) if row else None
+
+    def search(self, query: str, limit: int = 10) -> List[Airport]:
+        """Full-text search over name, municipality, IATA/ICAO and country code, best match first."""
+        expression = match_expression(query)
+        if not expression:
+            return []
+        return self._airports(SEARCH_SQL, (expression, limit))
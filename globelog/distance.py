@@ -0,0 +1,162 @@
+"""Vectorised great-circle distances between curated airports (needs NumPy)."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from globelog.data import DATA_DIR
+from globelog.table import IATA_SLOTS, MISSING, AirportTable, Codes, encode_iata
+
+
+EARTH_RADIUS_KM = 6371.0088
+MATRIX_CHUNK_ROWS = 512
+MATRIX_PATH = DATA_DIR / ".cache" / "distance_matrix.npy"
+
+Pairs = Union["np.ndarray", Sequence[Tuple[str, str]]]
+
+
+@lru_cache(maxsize=1)
+def default_table() -> AirportTable:
+    return AirportTable.from_csv()
+
+
+def unit_vectors(latitude: "np.ndarray", longitude: "np.ndarray") -> "np.ndarray":
+    """(n, 3) points on the unit sphere; NaN coordinates give NaN rows."""
+    lat = np.radians(latitude)
+    lon = np.radians(longitude)
+    cos_lat = np.cos(lat)
+    return np.stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)), axis=-1)
+
+
+def chord_to_km(chord: "np.ndarray") -> "np.ndarray":
+    """Great-circle distance for straight-line distances between unit vectors."""
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+def km_to_chord(km: "np.ndarray") -> "np.ndarray":
+    """Straight-line distance between unit vectors a great-circle distance apart (inverse of ``chord_to_km``)."""
+    return 2.0 * np.sin(np.clip(km, 0.0, np.pi * EARTH_RADIUS_KM) / (2.0 * EARTH_RADIUS_KM))
+
+
+def distance(iata_a: str, iata_b: str, table: Optional[AirportTable] = None) -> float:
+    """Great-circle distance in km between two airports; KeyError for an unknown code."""
+    table = table or default_table()
+    rows = table.index([iata_a, iata_b])
+    for code, row in zip((iata_a, iata_b), rows):
+        if row == MISSING:
+            raise KeyError(code)
+    return float(distances(np.array([[iata_a, iata_b]]), table)[0])
+
+
+def distances(pairs: Pairs, table: Optional[AirportTable] = None) -> "np.ndarray":
+    """Distances in km for an (n, 2) array (or sequence) of code pairs; NaN where a code is unknown."""
+    table = table or default_table()
+    pairs = np.asarray(pairs)
+    if pairs.size == 0:
+        return np.empty(0)
+    # One spare NaN row at the end absorbs unknown codes (index MISSING == -1).
+    points = np.vstack((unit_vectors(table.latitude, table.longitude), np.full((1, 3), np.nan)))
+    a = points[table.index(pairs[:, 0])]
+    b = points[table.index(pairs[:, 1])]
+    # The difference of the vectors, not 2 - 2·dot, keeps short legs accurate.
+    return chord_to_km(np.sqrt(np.einsum("ij,ij->i", a - b, a - b)))
+
+
+def distance_matrix(
+    codes: Optional[Codes] = None,
+    table: Optional[AirportTable] = None,
+    dtype=np.float64,
+    chunk_rows: int = MATRIX_CHUNK_ROWS,
+    out: Optional["np.ndarray"] = None,
+) -> "np.ndarray":
+    """All-pairs distances in km for ``codes`` (default: every airport), in input order.
+
+    Rows are computed ``chunk_rows`` at a time, so scratch memory stays at a
+    few (chunk_rows × n) float64 blocks however large the matrix is. Pass
+    ``out`` (e.g. a ``np.memmap``) to write the result straight to disk.
+    """
+    table = table or default_table()
+    if codes is None:
+        latitude, longitude = table.latitude, table.longitude
+    else:
+        columns = table.lookup(codes)
+        latitude, longitude = columns.latitude, columns.longitude
+    points = unit_vectors(latitude, longitude)
+    count = len(points)
+    if out is None:
+        out = np.empty((count, count), dtype=dtype)
+    for start in range(0, count, chunk_rows):
+        block = points[start:start + chunk_rows]
+        # |a - b|² = 2 - 2·a·b for unit vectors; one matrix product per chunk.
+        squared = np.maximum(2.0 - 2.0 * (block @ points.T), 0.0)
+        out[start:start + len(block)] = chord_to_km(np.sqrt(squared))
+    return out
+
+
+class DistanceMatrix:
+    """A precomputed distance matrix on disk, memory-mapped rather than read at load."""
+
+    def __init__(self, path: Path = MATRIX_PATH) -> None:
+        self.path = path
+        self.codes = np.load(codes_path(path))
+        self.matrix = np.load(path, mmap_mode="r")
+        if self.matrix.shape != (len(self.codes), len(self.codes)):
+            raise ValueError(f"{path.name} does not match its code list; rebuild it with save_matrix().")
+        self._slots = np.full(IATA_SLOTS + 1, MISSING, dtype=np.int32)
+        self._slots[encode_iata(self.codes)] = np.arange(len(self.codes), dtype=np.int32)
+
+    def index(self, codes: Codes) -> "np.ndarray":
+        # The spare last slot answers encode_iata's MISSING (-1).
+        return self._slots[encode_iata(codes)]
+
+    def distance(self, iata_a: str, iata_b: str) -> float:
+        a, b = self.index([iata_a, iata_b])
+        for code, row in ((iata_a, a), (iata_b, b)):
+            if row == MISSING:
+                raise KeyError(code)
+        return float(self.matrix[a, b])
+
+    def distances(self, pairs: Pairs) -> "np.ndarray":
+        """Like ``distances()``, read from the matrix; NaN for codes outside it."""
+        pairs = np.asarray(pairs)
+        if pairs.size == 0:
+            return np.empty(0, dtype=self.matrix.dtype)
+        a = self.index(pairs[:, 0])
+        b = self.index(pairs[:, 1])
+        found = (a != MISSING) & (b != MISSING)
+        values = np.full(len(pairs), np.nan, dtype=self.matrix.dtype)
+        values[found] = self.matrix[a[found], b[found]]
+        return values
+
+
+def codes_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.codes.npy")
+
+
+def save_matrix(
+    codes: Optional[Codes] = None,
+    path: Path = MATRIX_PATH,
+    table: Optional[AirportTable] = None,
+    dtype=np.float32,
+) -> DistanceMatrix:
+    """Precompute the matrix for ``codes`` (default: every airport) into ``path``.
+
+    The curated data does not keep OurAirports' airport type, so the subset
+    (e.g. hub airports) is whatever codes the caller passes.
+    """
+    table = table or default_table()
+    codes = table.iata if codes is None else np.asarray(codes, dtype="U3")
+    rows = table.index(codes)
+    if np.any(rows == MISSING):
+        raise KeyError(", ".join(codes[rows == MISSING][:5]))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(len(codes), len(codes)))
+    distance_matrix(codes, table, out=out)
+    out.flush()
+    del out
+    np.save(codes_path(path), np.char.upper(codes))
+    return DistanceMatrix(path)
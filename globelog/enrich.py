@@ -0,0 +1,322 @@
+"""Streaming enrichment of flight-log files with airport details and leg distances.
+
+Input is CSV (with a header) or JSON Lines, one flight per row, with origin
+and destination IATA codes; every other field is passed through unchanged.
+Each row gains, for both ends, the airport name, country code, continent
+code and IANA timezone, plus the great-circle ``distance_km``. Unknown codes
+leave their fields empty (``null`` in JSON Lines). Input that already has
+any of the output fields is rejected with ValueError rather than written
+with duplicate keys or columns.
+
+The input is read in chunks of whole rows, chunks are enriched on a process
+pool against an in-memory index of the curated airports, and results are
+written in input order as they complete. At most ``2 * workers`` chunks are
+in flight, so memory use does not grow with the file.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from globelog.data import CURATED_AIRPORTS, load_airports
+
+
+EARTH_RADIUS_KM = 6371.0088
+CHUNK_ROWS = 20_000
+FORMATS = ("csv", "jsonl")
+AIRPORT_FIELDS = ("name", "country", "continent", "timezone")
+# Seconds between progress lines with ``progress=True``.
+PROGRESS_INTERVAL = 5.0
+
+
+class EnrichOptions(NamedTuple):
+    format: str
+    origin: str = "origin"
+    destination: str = "destination"
+    # CSV only: the input header, which fixes the code columns' positions.
+    header: Tuple[str, ...] = ()
+
+
+class ChunkResult(NamedTuple):
+    text: str
+    rows: int
+    unresolved: int
+
+
+class EnrichStats(NamedTuple):
+    rows: int
+    unresolved: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class _Airport(NamedTuple):
+    # The airport's enrichment fields, pre-serialised: CSV cells, and JSON members per side.
+    csv: str
+    json_origin: str
+    json_destination: str
+    point: Tuple[float, float, float]
+
+
+def output_fields() -> Tuple[str, ...]:
+    return tuple(f"{side}_{field}" for side in ("origin", "destination") for field in AIRPORT_FIELDS) + ("distance_km",)
+
+
+def _json_members(side: str, values: Tuple[Optional[str], ...]) -> str:
+    return ", ".join(
+        f"{json.dumps(f'{side}_{field}')}: {json.dumps(value, ensure_ascii=False)}"
+        for field, value in zip(AIRPORT_FIELDS, values)
+    )
+
+
+def _csv_cells(values: Tuple[str, ...]) -> str:
+    output = io.StringIO()
+    csv.writer(output, lineterminator="").writerow(values)
+    return output.getvalue()
+
+
+def build_index(airports_path: Path = CURATED_AIRPORTS) -> Dict[str, _Airport]:
+    """IATA code → the enrichment fields and unit vector of each curated airport."""
+    index = {}
+    for airport in load_airports(airports_path).values():
+        lat, lon = math.radians(airport.latitude_deg), math.radians(airport.longitude_deg)
+        values = (airport.name, airport.iso_country, airport.continent, airport.timezone)
+        index[airport.iata] = _Airport(
+            _csv_cells(values),
+            _json_members("origin", values),
+            _json_members("destination", values),
+            (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)),
+        )
+    return index
+
+
+_OUTPUT_KEYS = frozenset(output_fields())
+_INDEX: Dict[str, _Airport] = {}
+_OPTIONS = EnrichOptions("csv")
+_UNKNOWN = _Airport(
+    "," * (len(AIRPORT_FIELDS) - 1),
+    _json_members("origin", (None,) * len(AIRPORT_FIELDS)),
+    _json_members("destination", (None,) * len(AIRPORT_FIELDS)),
+    (0.0, 0.0, 0.0),
+)
+
+
+def _init_worker(airports_path: Path, options: EnrichOptions) -> None:
+    global _INDEX, _OPTIONS
+    _INDEX, _OPTIONS = build_index(airports_path), options
+    _distance_km.cache_clear()
+
+
+@lru_cache(maxsize=1 << 16)
+def _distance_km(origin: str, destination: str) -> float:
+    a, b = _INDEX[origin].point, _INDEX[destination].point
+    chord = math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+    return round(2.0 * EARTH_RADIUS_KM * math.asin(min(chord / 2.0, 1.0)), 1)
+
+
+def _resolve(origin: object, destination: object) -> Tuple[_Airport, _Airport, Optional[float]]:
+    origin = origin.strip().upper() if isinstance(origin, str) else ""
+    destination = destination.strip().upper() if isinstance(destination, str) else ""
+    origin_airport, destination_airport = _INDEX.get(origin), _INDEX.get(destination)
+    if origin_airport is None or destination_airport is None:
+        return origin_airport or _UNKNOWN, destination_airport or _UNKNOWN, None
+    return origin_airport, destination_airport, _distance_km(origin, destination)
+
+
+def enrich_chunk(text: str) -> ChunkResult:
+    """Enrich one chunk of whole rows (no CSV header) with the worker's index and options.
+
+    Input rows are copied through as they are, with the enrichment
+    appended, so they are never re-serialised.
+    """
+    return (_enrich_csv if _OPTIONS.format == "csv" else _enrich_jsonl)(text)
+
+
+def _enrich_csv(text: str) -> ChunkResult:
+    origin_column = _OPTIONS.header.index(_OPTIONS.origin)
+    destination_column = _OPTIONS.header.index(_OPTIONS.destination)
+    # Split on newlines only: splitlines() would also break at characters such as U+2028 inside fields.
+    lines = text.split("\n")
+    if not lines[-1]:
+        lines.pop()
+    reader = csv.reader(lines)
+    output: List[str] = []
+    consumed = rows = unresolved = 0
+    for row in reader:
+        # A quoted field can span lines; line_num says where this record ends.
+        raw = lines[consumed] if reader.line_num == consumed + 1 else "\n".join(lines[consumed:reader.line_num])
+        consumed = reader.line_num
+        if raw.endswith("\r"):
+            raw = raw[:-1]
+        if not row:
+            continue
+        origin, destination, distance = _resolve(
+            row[origin_column] if origin_column < len(row) else "",
+            row[destination_column] if destination_column < len(row) else "",
+        )
+        if distance is None:
+            unresolved += 1
+            distance = ""
+        output.append(f"{raw},{origin.csv},{destination.csv},{distance}\r\n")
+        rows += 1
+    return ChunkResult("".join(output), rows, unresolved)
+
+
+def _enrich_jsonl(text: str) -> ChunkResult:
+    output: List[str] = []
+    unresolved = 0
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError(f"Expected a JSON object per line, got {line[:80]!r}")
+        if not _OUTPUT_KEYS.isdisjoint(record):
+            # Splicing would duplicate the key, and readers disagree on which value wins.
+            clash = ", ".join(sorted(_OUTPUT_KEYS.intersection(record)))
+            raise ValueError(f"The input already has enrichment fields ({clash}) in {line[:80]!r}")
+        origin, destination, distance = _resolve(record.get(_OPTIONS.origin), record.get(_OPTIONS.destination))
+        if distance is None:
+            unresolved += 1
+        # Splice the members in before the closing brace.
+        separator = ", " if record else ""
+        output.append(
+            f"{line[:-1]}{separator}{origin.json_origin}, {destination.json_destination}, "
+            f"\"distance_km\": {'null' if distance is None else distance}}}\n"
+        )
+    return ChunkResult("".join(output), len(output), unresolved)
+
+
+def read_chunks(handle: IO[str], format: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """Yield the input as text chunks of about ``chunk_rows`` whole rows.
+
+    CSV chunks are only cut where the double quotes seen so far balance, so a
+    quoted field spanning several lines stays in one chunk.
+    """
+    lines: List[str] = []
+    quoted = False
+    for line in handle:
+        lines.append(line)
+        if format == "csv" and line.count('"') % 2:
+            quoted = not quoted
+        if len(lines) >= chunk_rows and not quoted:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def detect_format(path: Path) -> str:
+    return "jsonl" if path.suffix.lower() in (".jsonl", ".ndjson") else "csv"
+
+
+def enrich_stream(
+    source: IO[str],
+    output: IO[str],
+    format: str = "csv",
+    origin: str = "origin",
+    destination: str = "destination",
+    workers: Optional[int] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    airports_path: Path = CURATED_AIRPORTS,
+    progress: Optional[IO[str]] = None,
+) -> EnrichStats:
+    """Enrich ``source`` into ``output``; returns the row counts and wall time.
+
+    ``workers`` defaults to the CPU count; with one worker the chunks are
+    enriched in this process. ``progress``, if given, receives a rows/sec
+    line every few seconds.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    start = time.perf_counter()
+    header: Tuple[str, ...] = ()
+    if format == "csv":
+        first = source.readline()
+        header = tuple(next(csv.reader([first]), ()))
+        for column in (origin, destination):
+            if column not in header:
+                raise ValueError(f"The input has no {column!r} column (columns: {', '.join(header) or 'none'}).")
+        clash = sorted(_OUTPUT_KEYS.intersection(header))
+        if clash:
+            raise ValueError(f"The input already has enrichment columns: {', '.join(clash)}.")
+        csv.writer(output).writerow((*header, *output_fields()))
+    options = EnrichOptions(format, origin, destination, header)
+
+    rows = unresolved = 0
+    last_report = start
+
+    def write(result: ChunkResult) -> None:
+        nonlocal rows, unresolved, last_report
+        output.write(result.text)
+        rows += result.rows
+        unresolved += result.unresolved
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            print(f"  {rows:,} rows, {rows / (now - start):,.0f} rows/s", file=progress, flush=True)
+
+    chunks = read_chunks(source, format, chunk_rows)
+    workers = workers or multiprocessing.cpu_count()
+    if workers == 1:
+        _init_worker(airports_path, options)
+        for chunk in chunks:
+            write(enrich_chunk(chunk))
+    else:
+        pending: Deque[Future] = deque()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(airports_path, options),
+        ) as pool:
+            for chunk in chunks:
+                pending.append(pool.submit(enrich_chunk, chunk))
+                # Waiting on the oldest chunk keeps output in order and bounds the chunks held in memory.
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    return EnrichStats(rows, unresolved, time.perf_counter() - start)
+
+
+def enrich_file(
+    input_path: Path,
+    output_path: Path,
+    format: Optional[str] = None,
+    **options,
+) -> EnrichStats:
+    """Enrich a CSV or JSON Lines file (format from the suffix unless given); ``-`` means stdin/stdout."""
+    format = format or detect_format(output_path if str(input_path) == "-" else input_path)
+    source = sys.stdin if str(input_path) == "-" else input_path.open("r", newline="", encoding="utf-8-sig")
+    try:
+        if str(output_path) == "-":
+            return enrich_stream(source, sys.stdout, format, **options)
+        # Readers of the output never see a half-written file.
+        temp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+        try:
+            with temp_path.open("w", newline="", encoding="utf-8") as output:
+                stats = enrich_stream(source, output, format, **options)
+            os.replace(temp_path, output_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return stats
+    finally:
+        if source is not sys.stdin:
+            source.close()
@@ -0,0 +1,165 @@
+"""All flag assets packed into one memory-mappable bundle file.
+
+The file is little-endian::
+
+    header   b"GLOBFLAG", format version (u32), entry count (u32)
+    index    per flag, sorted by code: ISO code (2 bytes), format (4 bytes,
+             e.g. b"pdf\\0"), 2 pad bytes, offset (u64), length (u64), SHA-256 (32 bytes)
+    data     the asset bytes, each starting on an 8-byte boundary
+
+Opening a bundle reads the header and index only; ``FlagBundle.get()``
+returns a zero-copy slice of the mapping, so serving a flag never opens a
+file. The index carries each asset's hash, so bundles can be checked
+against the country list without touching the asset bytes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from globelog.data import DATA_DIR, FLAGS_DIR
+
+
+FLAG_BUNDLE_PATH = DATA_DIR / "flags.bundle"
+FLAG_EXTENSIONS = {".pdf", ".svg", ".png"}
+MAGIC = b"GLOBFLAG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII")
+ENTRY = struct.Struct("<2s4s2xQQ32s")
+ALIGNMENT = 8
+
+
+class FlagEntry(NamedTuple):
+    code: str
+    format: str
+    offset: int
+    length: int
+    sha256: str
+
+
+def flag_files(directory: Path = FLAGS_DIR) -> Dict[str, Path]:
+    """Flag assets by uppercase ISO code; ValueError if a code has more than one file."""
+    files: Dict[str, Path] = {}
+    for path in sorted(directory.iterdir()):
+        if not path.is_file() or path.suffix.lower() not in FLAG_EXTENSIONS:
+            continue
+        code = path.stem.upper()
+        if code in files:
+            raise ValueError(f"Duplicate flag files for {code}: {files[code].name}, {path.name}")
+        files[code] = path
+    return files
+
+
+def write_bundle(directory: Path = FLAGS_DIR, path: Path = FLAG_BUNDLE_PATH) -> Tuple[int, int]:
+    """Pack every flag in ``directory`` into ``path`` (atomically replaced); returns (flags, bytes)."""
+    files = flag_files(directory)
+    for code in files:
+        if len(code) != 2 or not code.isascii():
+            raise ValueError(f"Flag {files[code].name} is not named by a two-letter ISO code.")
+
+    assets = [(code, files[code].suffix.lower()[1:], files[code].read_bytes()) for code in sorted(files)]
+    index: List[bytes] = []
+    offset = _aligned(HEADER.size + ENTRY.size * len(assets))
+    for code, format, data in assets:
+        digest = hashlib.sha256(data).digest()
+        index.append(ENTRY.pack(code.encode("ascii"), format.encode("ascii"), offset, len(data), digest))
+        offset = _aligned(offset + len(data))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with temp_path.open("wb") as handle:
+        handle.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(assets)))
+        handle.write(b"".join(index))
+        for _, _, data in assets:
+            handle.write(b"\0" * (_aligned(handle.tell()) - handle.tell()))
+            handle.write(data)
+    os.replace(temp_path, path)
+    return len(assets), path.stat().st_size
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def read_index(path: Path = FLAG_BUNDLE_PATH) -> Tuple[List[FlagEntry], int]:
+    """The index entries and file size of a bundle, read without mapping the asset data."""
+    with path.open("rb") as handle:
+        header = handle.read(HEADER.size)
+        magic, version, count = HEADER.unpack(header) if len(header) == HEADER.size else (b"", 0, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path.name} is not a version {FORMAT_VERSION} GlobeLog flag bundle.")
+        index = handle.read(ENTRY.size * count)
+        size = os.fstat(handle.fileno()).st_size
+    if len(index) != ENTRY.size * count:
+        raise ValueError(f"{path.name} is truncated inside its index.")
+    return [_entry(*fields) for fields in ENTRY.iter_unpack(index)], size
+
+
+def _entry(code: bytes, format: bytes, offset: int, length: int, digest: bytes) -> FlagEntry:
+    return FlagEntry(code.decode("ascii"), format.rstrip(b"\0").decode("ascii"), offset, length, digest.hex())
+
+
+class FlagBundle:
+    """Read-only access to the flags in a memory-mapped bundle, by ISO code."""
+
+    def __init__(self, path: Path = FLAG_BUNDLE_PATH) -> None:
+        self.path = path
+        with path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, version, count = HEADER.unpack_from(self._view) if len(self._view) >= HEADER.size else (b"", 0, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or len(self._view) < HEADER.size + ENTRY.size * count:
+            self.close()
+            raise ValueError(f"{path.name} is not a version {FORMAT_VERSION} GlobeLog flag bundle.")
+        self._entries: Dict[str, FlagEntry] = {}
+        for index in range(count):
+            entry = _entry(*ENTRY.unpack_from(self._view, HEADER.size + index * ENTRY.size))
+            self._entries[entry.code] = entry
+
+    def close(self) -> None:
+        # Slices handed out by get() keep the mapping open until they are released.
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self) -> "FlagBundle":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, code: object) -> bool:
+        return isinstance(code, str) and code.strip().upper() in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def entry(self, code: str) -> Optional[FlagEntry]:
+        return self._entries.get(code.strip().upper())
+
+    def get(self, code: str) -> Optional[memoryview]:
+        """The flag's bytes as a zero-copy view of the mapping, or ``None`` for unknown codes."""
+        entry = self.entry(code)
+        return None if entry is None else self._view[entry.offset:entry.offset + entry.length]
+
+    def read(self, code: str) -> Optional[bytes]:
+        data = self.get(code)
+        return None if data is None else bytes(data)
+
+    def verify(self) -> List[str]:
+        """Codes whose bytes no longer match the hash in the index."""
+        return [
+            code
+            for code, entry in self._entries.items()
+            if hashlib.sha256(self._view[entry.offset:entry.offset + entry.length]).hexdigest() != entry.sha256
+        ]
@@ -0,0 +1,345 @@
+"""Batched reverse geocoding of coordinates to the nearest curated airport (needs NumPy).
+
+The dataset has no country borders, so a point's country and continent are
+those of its nearest airport (the continent comes from the curated country
+list). Distances are great-circle.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from globelog.data import CURATED_AIRPORTS, CURATED_COUNTRIES, DATA_DIR, load_airports, load_countries
+from globelog.distance import chord_to_km, unit_vectors
+from globelog.timezones import file_digest
+
+
+GEOCODER_CACHE = DATA_DIR / ".cache" / "reverse_geocoder.npz"
+CACHE_FORMAT_VERSION = 1
+# Points per KD-tree leaf; leaves hold between half this and this many.
+LEAF_SIZE = 16
+# Queries per vectorised chunk, bounding scratch memory to a few tens of MiB.
+QUERY_CHUNK = 1 << 18
+# Queries sharing a home leaf are refined this many at a time (see KDTree.query).
+BATCH_ROWS = 1024
+# Pads short leaves; far outside the unit sphere, so it is never the nearest point.
+FAR_AWAY = 1e3
+
+
+class ReverseGeocoded(NamedTuple):
+    """Per-point results aligned with the input; invalid coordinates get "" codes, row -1 and NaN km."""
+
+    iata: "np.ndarray"
+    country_code: "np.ndarray"
+    continent_code: "np.ndarray"
+    distance_km: "np.ndarray"
+    row: "np.ndarray"
+
+
+class KDTree:
+    """A static KD-tree over unit vectors, queried a whole batch at a time.
+
+    Nodes are parallel arrays: ``left``/``right`` children and
+    ``split_dim``/``split`` for the descent, with ``node_leaf`` giving the
+    leaf number of leaf nodes (-1 for inner nodes). Leaf ``k`` owns row ``k``
+    of ``leaf_points`` (its point indexes, padded with ``len(points)``) and
+    of the bounding boxes ``leaf_lower``/``leaf_upper``.
+    """
+
+    ARRAYS = ("points", "left", "right", "split_dim", "split", "node_leaf", "leaf_points", "leaf_lower", "leaf_upper")
+
+    def __init__(
+        self,
+        points: "np.ndarray",
+        left: "np.ndarray",
+        right: "np.ndarray",
+        split_dim: "np.ndarray",
+        split: "np.ndarray",
+        node_leaf: "np.ndarray",
+        leaf_points: "np.ndarray",
+        leaf_lower: "np.ndarray",
+        leaf_upper: "np.ndarray",
+    ) -> None:
+        self.points = points
+        self.left = left
+        self.right = right
+        self.split_dim = split_dim
+        self.split = split
+        self.node_leaf = node_leaf
+        self.leaf_points = leaf_points
+        self.leaf_lower = leaf_lower
+        self.leaf_upper = leaf_upper
+        self._padded = np.vstack((points, np.full((1, 3), FAR_AWAY)))
+
+    @classmethod
+    def build(cls, points: "np.ndarray", leaf_size: int = LEAF_SIZE) -> "KDTree":
+        """Median splits on the axis of widest spread until nodes hold at most ``leaf_size`` points."""
+        points = np.ascontiguousarray(points, dtype=np.float64)
+        left: List[int] = []
+        right: List[int] = []
+        split_dim: List[int] = []
+        split: List[float] = []
+        node_leaf: List[int] = []
+        leaves: List["np.ndarray"] = []
+
+        def add(members: "np.ndarray") -> int:
+            node = len(left)
+            left.append(-1)
+            right.append(-1)
+            if len(members) <= leaf_size:
+                split_dim.append(0)
+                split.append(0.0)
+                node_leaf.append(len(leaves))
+                leaves.append(members)
+                return node
+            box = points[members]
+            dim = int(np.argmax(box.max(axis=0) - box.min(axis=0)))
+            members = members[np.argsort(points[members, dim], kind="stable")]
+            half = len(members) // 2
+            split_dim.append(dim)
+            split.append(float(points[members[half - 1], dim]))
+            node_leaf.append(-1)
+            left[node] = add(members[:half])
+            right[node] = add(members[half:])
+            return node
+
+        add(np.arange(len(points)))
+        leaf_points = np.full((len(leaves), leaf_size), len(points), dtype=np.int32)
+        for index, members in enumerate(leaves):
+            leaf_points[index, : len(members)] = members
+        return cls(
+            points,
+            np.array(left, dtype=np.int32),
+            np.array(right, dtype=np.int32),
+            np.array(split_dim, dtype=np.int8),
+            np.array(split, dtype=np.float64),
+            np.array(node_leaf, dtype=np.int32),
+            leaf_points,
+            np.array([points[members].min(axis=0) for members in leaves]),
+            np.array([points[members].max(axis=0) for members in leaves]),
+        )
+
+    def home_leaves(self, queries: "np.ndarray") -> "np.ndarray":
+        """The leaf each query descends to."""
+        nodes = np.zeros(len(queries), dtype=np.int32)
+        inner = self.node_leaf[nodes] < 0
+        while inner.any():
+            active = nodes[inner]
+            go_left = queries[inner, self.split_dim[active]] <= self.split[active]
+            nodes[inner] = np.where(go_left, self.left[active], self.right[active])
+            inner = self.node_leaf[nodes] < 0
+        return self.node_leaf[nodes]
+
+    def query(self, queries: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """Exact nearest point index and Euclidean distance for each row of ``queries`` (unit vectors).
+
+        Each query's home leaf gives an upper bound on its nearest distance;
+        only leaves and points closer than that can hold a nearer point.
+        Queries are sorted by home leaf and then by that bound, and refined
+        ``BATCH_ROWS`` at a time: one pruning pass per batch against the
+        batch's bounding box and largest bound, then one matrix product
+        against the surviving points.
+        """
+        home = self.home_leaves(queries)
+        members = self.leaf_points[home]
+        offsets = self._padded[members] - queries[:, None, :]
+        squared = np.einsum("ijk,ijk->ij", offsets, offsets)
+        nearest = np.argmin(squared, axis=1)
+        picked = np.arange(len(queries))
+        best, best_squared = members[picked, nearest], squared[picked, nearest]
+
+        order = np.lexsort((best_squared, home))
+        sorted_home = home[order]
+        bounds = np.append(np.flatnonzero(np.diff(sorted_home, prepend=-1)), len(queries))
+        for group_start, group_end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            for start in range(group_start, group_end, BATCH_ROWS):
+                rows = order[start : min(start + BATCH_ROWS, group_end)]
+                self._refine(queries, rows, sorted_home[group_start], best, best_squared)
+
+        offsets = queries - self.points[best]
+        return best, np.sqrt(np.einsum("ij,ij->i", offsets, offsets))
+
+    def pairs_within(self, radius: float) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """Every ordered pair ``(i, j)``, ``i != j``, of points at most ``radius`` apart, and their distance.
+
+        Pairs are found leaf by leaf against the leaves whose bounding boxes
+        come within ``radius``, so distant parts of the tree are never compared.
+        """
+        first: List["np.ndarray"] = []
+        second: List["np.ndarray"] = []
+        distance: List["np.ndarray"] = []
+        limit = radius * radius
+        for leaf, members in enumerate(self.leaf_points):
+            gap = np.maximum(self.leaf_lower - self.leaf_upper[leaf], 0.0) + np.maximum(
+                self.leaf_lower[leaf] - self.leaf_upper, 0.0
+            )
+            near = self.leaf_points[np.einsum("ij,ij->i", gap, gap) <= limit].ravel()
+            members = members[members < len(self.points)]
+            near = near[near < len(self.points)]
+            offsets = self.points[members][:, None, :] - self.points[near][None, :, :]
+            squared = np.einsum("ijk,ijk->ij", offsets, offsets)
+            rows, columns = np.nonzero(squared <= limit)
+            keep = members[rows] != near[columns]
+            first.append(members[rows[keep]])
+            second.append(near[columns[keep]])
+            distance.append(np.sqrt(squared[rows[keep], columns[keep]]))
+        return np.concatenate(first), np.concatenate(second), np.concatenate(distance)
+
+    def _refine(
+        self,
+        queries: "np.ndarray",
+        rows: "np.ndarray",
+        home: int,
+        best: "np.ndarray",
+        best_squared: "np.ndarray",
+    ) -> None:
+        batch = queries[rows]
+        radius = best_squared[rows].max()
+        low, high = batch.min(axis=0), batch.max(axis=0)
+        gap = np.maximum(self.leaf_lower - high, 0.0) + np.maximum(low - self.leaf_upper, 0.0)
+        leaves = np.flatnonzero(np.einsum("ij,ij->i", gap, gap) < radius)
+        leaves = leaves[leaves != home]
+        candidates = self.leaf_points[leaves].ravel()
+        candidates = candidates[candidates < len(self.points)]
+        points = self.points[candidates]
+        gap = np.maximum(points - high, 0.0) + np.maximum(low - points, 0.0)
+        keep = np.einsum("ij,ij->i", gap, gap) < radius
+        if not keep.any():
+            return
+        candidates, points = candidates[keep], points[keep]
+        # |q - p|² = 2 - 2 q·p for unit vectors, so the nearest point has the largest dot product.
+        dots = batch @ points.T
+        nearest = np.argmax(dots, axis=1)
+        squared = 2.0 - 2.0 * dots[np.arange(len(rows)), nearest]
+        better = squared < best_squared[rows]
+        best[rows[better]] = candidates[nearest[better]]
+        best_squared[rows[better]] = squared[better]
+
+
+class ReverseGeocoder:
+    """Nearest-airport lookup for batches of coordinates over a ``KDTree`` of unit vectors."""
+
+    def __init__(self, tree: KDTree, iata: "np.ndarray", country: "np.ndarray", continent: "np.ndarray") -> None:
+        self.tree = tree
+        self.iata = iata
+        self.country = country
+        self.continent = continent
+
+    def __len__(self) -> int:
+        return len(self.iata)
+
+    @classmethod
+    def from_csv(cls, airports_path: Path = CURATED_AIRPORTS, countries_path: Path = CURATED_COUNTRIES) -> "ReverseGeocoder":
+        airports = list(load_airports(airports_path).values())
+        countries = load_countries(countries_path)
+        latitude = np.fromiter((airport.latitude_deg for airport in airports), np.float64, len(airports))
+        longitude = np.fromiter((airport.longitude_deg for airport in airports), np.float64, len(airports))
+        continents = [
+            countries[airport.iso_country].continent if airport.iso_country in countries else airport.continent
+            for airport in airports
+        ]
+        return cls(
+            KDTree.build(unit_vectors(latitude, longitude)),
+            np.array([airport.iata for airport in airports], dtype="U3"),
+            np.array([airport.iso_country for airport in airports], dtype="U2"),
+            np.array(continents, dtype="U2"),
+        )
+
+    def save(self, path: Path = GEOCODER_CACHE, source_digest: str = "") -> None:
+        """Write the tree and label columns to an ``.npz`` file atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        arrays = {name: getattr(self.tree, name) for name in KDTree.ARRAYS}
+        np.savez(
+            temp_path,
+            version=np.int64(CACHE_FORMAT_VERSION),
+            source_digest=np.array(source_digest),
+            iata=self.iata,
+            country=self.country,
+            continent=self.continent,
+            **arrays,
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path = GEOCODER_CACHE, source_digest: Optional[str] = None) -> "ReverseGeocoder":
+        """Read a saved geocoder; ValueError if it is stale (``source_digest`` differs) or another format."""
+        with np.load(path) as saved:
+            if int(saved["version"]) != CACHE_FORMAT_VERSION:
+                raise ValueError(f"{path.name} has an unsupported format version.")
+            if source_digest is not None and str(saved["source_digest"]) != source_digest:
+                raise ValueError(f"{path.name} was built from other data.")
+            tree = KDTree(*(saved[name] for name in KDTree.ARRAYS))
+            return cls(tree, saved["iata"], saved["country"], saved["continent"])
+
+    def nearest(self, latitude: "np.ndarray", longitude: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """Row of the nearest airport and its distance in km; row -1 and NaN for non-finite coordinates."""
+        latitude = np.asarray(latitude, dtype=np.float64).ravel()
+        longitude = np.asarray(longitude, dtype=np.float64).ravel()
+        if latitude.shape != longitude.shape:
+            raise ValueError("latitudes and longitudes must have the same length")
+        rows = np.full(len(latitude), -1, dtype=np.int32)
+        km = np.full(len(latitude), np.nan)
+        valid = np.flatnonzero(np.isfinite(latitude) & np.isfinite(longitude))
+        for start in range(0, len(valid), QUERY_CHUNK):
+            chunk = valid[start : start + QUERY_CHUNK]
+            found, chord = self.tree.query(unit_vectors(latitude[chunk], longitude[chunk]))
+            rows[chunk] = found
+            km[chunk] = chord_to_km(chord)
+        return rows, km
+
+    def reverse_geocode(self, latitude: "np.ndarray", longitude: "np.ndarray") -> ReverseGeocoded:
+        rows, km = self.nearest(latitude, longitude)
+        found = rows >= 0
+        safe = np.where(found, rows, 0)
+        return ReverseGeocoded(
+            np.where(found, self.iata[safe], ""),
+            np.where(found, self.country[safe], ""),
+            np.where(found, self.continent[safe], ""),
+            km,
+            rows,
+        )
+
+
+def source_digest(airports_path: Path = CURATED_AIRPORTS, countries_path: Path = CURATED_COUNTRIES) -> str:
+    digest = hashlib.sha256(f"leaf {LEAF_SIZE}\n".encode())
+    for path in (airports_path, countries_path):
+        digest.update(f"{file_digest(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def load_geocoder(
+    airports_path: Path = CURATED_AIRPORTS,
+    countries_path: Path = CURATED_COUNTRIES,
+    cache_path: Path = GEOCODER_CACHE,
+) -> ReverseGeocoder:
+    """The geocoder from ``cache_path`` if it was built from the current CSVs, else built and cached."""
+    digest = source_digest(airports_path, countries_path)
+    try:
+        return ReverseGeocoder.load(cache_path, digest)
+    except (OSError, ValueError, KeyError):
+        pass
+    geocoder = ReverseGeocoder.from_csv(airports_path, countries_path)
+    try:
+        geocoder.save(cache_path, digest)
+    except OSError:
+        pass  # A read-only checkout just rebuilds next time.
+    return geocoder
+
+
+@lru_cache(maxsize=1)
+def default_geocoder() -> ReverseGeocoder:
+    return load_geocoder()
+
+
+def reverse_geocode(
+    latitudes: "np.ndarray", longitudes: "np.ndarray", geocoder: Optional[ReverseGeocoder] = None
+) -> ReverseGeocoded:
+    """Nearest airport IATA, its country and continent, and the distance in km for each point."""
+    return (geocoder or default_geocoder()).reverse_geocode(latitudes, longitudes)
@@ -0,0 +1,243 @@
+"""Vectorised UTC → local time conversion at airports (needs NumPy).
+
+Offsets come from the ``timezone`` / ``timezone_transition`` tables that
+``build_sqlite.py`` precomputes with zoneinfo, so converting a batch of
+events is one array lookup per event instead of a zoneinfo call per row:
+``from globelog.localtime import to_local``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from globelog.data import DB_PATH
+from globelog.table import MISSING, AirportTable, Codes
+from globelog.timezones import TRANSITION_END_YEAR, TRANSITION_START_YEAR, zone_transitions
+
+
+# Each zone owns a KEY_SPAN-wide band of the combined (zone, time) sort key;
+# 2**40 seconds is about 34,800 years, centred on the epoch.
+KEY_SPAN = 1 << 40
+KEY_ORIGIN = KEY_SPAN // 2
+# Width of the time buckets in the direct-address index: 2**21 s, about 24 days.
+BUCKET_SHIFT = 21
+
+Timestamps = Union["np.ndarray", Sequence[float]]
+
+
+class LocalTimes(NamedTuple):
+    """Per-event conversion results, aligned with the input.
+
+    ``local`` is the wall-clock time as datetime64 (NaT where the airport or
+    its timezone is unknown, or the time is beyond what datetime can
+    represent); ``utc_offset`` is in seconds (0 where unknown).
+    """
+
+    local: "np.ndarray"
+    utc_offset: "np.ndarray"
+    is_dst: "np.ndarray"
+    found: "np.ndarray"
+
+
+class TransitionTable:
+    """UTC offset transitions of every airport timezone as flat NumPy arrays.
+
+    Transitions are sorted by zone, then by ``utc_start``. Lookups go through
+    a direct-address index: for every zone and every 2**BUCKET_SHIFT-second
+    bucket of the covered range it holds the transition in force at the
+    bucket start. A batch of (zone, timestamp) pairs is then resolved with
+    one gather plus ``steps`` vectorised "has the next transition started?"
+    corrections, where ``steps`` is the most transitions any bucket holds
+    (usually 1), instead of a binary search per event. Each zone covers 1
+    January of its first year to the end of its last year (UTC);
+    ``convert()`` resolves events outside that range with zoneinfo instead.
+    Without ``years``, a zone covers everything from its first transition on.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        zones: "np.ndarray",
+        utc_start: "np.ndarray",
+        utc_offset: "np.ndarray",
+        is_dst: "np.ndarray",
+        abbreviations: Sequence[str],
+        years: Optional[Sequence[Tuple[int, int]]] = None,
+    ) -> None:
+        self.names = tuple(names)
+        self.zones = np.asarray(zones, dtype=np.int16)
+        self.utc_start = np.asarray(utc_start, dtype=np.int64)
+        self.utc_offset = np.asarray(utc_offset, dtype=np.int32)
+        self.is_dst = np.asarray(is_dst, dtype=bool)
+        self.abbreviations = np.array(abbreviations, dtype=object)
+        keys = self.zones.astype(np.int64) * KEY_SPAN + (self.utc_start + KEY_ORIGIN)
+        if np.any(np.diff(keys) <= 0):
+            raise ValueError("Transitions must be sorted by zone, then utc_start, without duplicates.")
+        self._index: Dict[str, int] = {name: zone for zone, name in enumerate(self.names)}
+
+        self.origin = int(self.utc_start.min()) if len(self.utc_start) else 0
+        span = int(self.utc_start.max()) - self.origin if len(self.utc_start) else 0
+        # The last bucket starts after the last transition, so none fall beyond it.
+        self.buckets = (span >> BUCKET_SHIFT) + 2
+        bucket_starts = self.origin + (np.arange(self.buckets, dtype=np.int64) << BUCKET_SHIFT)
+        grid = np.arange(len(self.names), dtype=np.int64)[:, None] * KEY_SPAN + (bucket_starts + KEY_ORIGIN)
+        rows = np.searchsorted(keys, grid, side="right") - 1
+        # A bucket before a zone's first transition would land in the previous zone.
+        rows = np.maximum(rows, np.searchsorted(self.zones, np.arange(len(self.names)))[:, None])
+        self.bucket_rows = rows.astype(np.int32).ravel()
+        self.steps = int(np.diff(rows, axis=1).max()) if rows.size else 0
+        last_of_zone = np.append(self.zones[1:] != self.zones[:-1], True)
+        self.next_start = np.where(last_of_zone, np.iinfo(np.int64).max, np.roll(self.utc_start, -1))
+        if years is None:
+            self.range_start = self.utc_start[np.searchsorted(self.zones, np.arange(len(self.names)))]
+            self.range_end = np.full(len(self.names), np.iinfo(np.int64).max)
+        else:
+            self.range_start = np.array([_year_start(first) for first, _ in years], dtype=np.int64)
+            self.range_end = np.array([_year_start(last + 1) for _, last in years], dtype=np.int64)
+
+    @classmethod
+    def from_sqlite(cls, path: Path = DB_PATH) -> "TransitionTable":
+        conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            names = conn.execute("SELECT id, name, first_year, last_year FROM timezone ORDER BY id").fetchall()
+            rows = conn.execute(
+                """
+                SELECT timezone_id, utc_start, utc_offset, is_dst, abbreviation
+                FROM timezone_transition ORDER BY timezone_id, utc_start
+                """
+            ).fetchall()
+        finally:
+            conn.close()
+        dense = {zone_id: zone for zone, (zone_id, *_) in enumerate(names)}
+        zone_ids, utc_start, utc_offset, is_dst, abbreviations = zip(*rows) if rows else ((),) * 5
+        return cls(
+            [name for _, name, _, _ in names],
+            np.fromiter((dense[zone_id] for zone_id in zone_ids), np.int16, len(zone_ids)),
+            utc_start,
+            utc_offset,
+            is_dst,
+            abbreviations,
+            [(first, last) for _, _, first, last in names],
+        )
+
+    @classmethod
+    def compute(
+        cls,
+        names: Sequence[str],
+        start_year: int = TRANSITION_START_YEAR,
+        end_year: int = TRANSITION_END_YEAR,
+    ) -> "TransitionTable":
+        """Build the table straight from zoneinfo, without a database."""
+        columns = []
+        for zone, name in enumerate(names):
+            columns.extend((zone, *transition) for transition in zone_transitions(name, start_year, end_year))
+        zones, utc_start, utc_offset, is_dst, abbreviations = zip(*columns) if columns else ((),) * 5
+        return cls(names, zones, utc_start, utc_offset, is_dst, abbreviations, [(start_year, end_year)] * len(names))
+
+    def __len__(self) -> int:
+        return len(self.utc_start)
+
+    def zone_index(self, names: Sequence[str]) -> "np.ndarray":
+        """Dense zone numbers for IANA ``names``; ``MISSING`` for zones not in the table."""
+        return np.fromiter((self._index.get(name, MISSING) for name in names), np.int16, len(names))
+
+    def transition_rows(self, zones: "np.ndarray", seconds: "np.ndarray") -> "np.ndarray":
+        """Index of the transition in force for each (zone, POSIX second); zones must be valid."""
+        buckets = np.clip((seconds - self.origin) >> BUCKET_SHIFT, 0, self.buckets - 1)
+        rows = self.bucket_rows[zones.astype(np.intp) * self.buckets + buckets]
+        for _ in range(self.steps):
+            rows += self.next_start[rows] <= seconds
+        return rows
+
+    def convert(self, zones: "np.ndarray", timestamps: Timestamps) -> LocalTimes:
+        """Local times for UTC ``timestamps`` (POSIX seconds or datetime64) in dense ``zones``.
+
+        Events outside a zone's covered range go through zoneinfo one by one.
+        """
+        times = np.asarray(timestamps)
+        if times.dtype.kind != "M":
+            times = times.astype("datetime64[s]") if times.dtype.kind in "iu" else _float_seconds(times)
+        seconds = times.astype("datetime64[s]").astype(np.int64)
+        found = (zones != MISSING) & ~np.isnat(times)
+        valid_zones = np.where(found, zones, 0)
+        rows = self.transition_rows(valid_zones, seconds)
+        utc_offset = self.utc_offset[rows]
+        is_dst = self.is_dst[rows]
+        outside = found & ((seconds < self.range_start[valid_zones]) | (seconds >= self.range_end[valid_zones]))
+        for event in np.flatnonzero(outside).tolist():
+            state = _zoneinfo_state(self.names[zones[event]], int(seconds[event]))
+            if state is None:
+                found[event] = False
+            else:
+                utc_offset[event], is_dst[event] = state
+        utc_offset[~found] = 0
+        local = times + utc_offset.astype("timedelta64[s]")
+        local[~found] = np.datetime64("NaT")
+        return LocalTimes(local, utc_offset, is_dst & found, found)
+
+
+def _year_start(year: int) -> int:
+    return int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def _zoneinfo_state(name: str, timestamp: int) -> Optional[Tuple[int, bool]]:
+    """(UTC offset in seconds, is DST) from zoneinfo; ``None`` beyond what datetime can represent."""
+    try:
+        local = datetime.fromtimestamp(timestamp, _zone(name))
+    except (OverflowError, OSError, ValueError):
+        return None
+    return int(local.utcoffset().total_seconds()), bool(local.dst())
+
+
+def _float_seconds(times: "np.ndarray") -> "np.ndarray":
+    """Float POSIX seconds as datetime64[ms]; NaN becomes NaT."""
+    millis = np.round(times.astype(np.float64) * 1000.0)
+    finite = np.isfinite(millis)
+    result = np.where(finite, millis, 0).astype(np.int64).astype("datetime64[ms]")
+    result[~finite] = np.datetime64("NaT")
+    return result
+
+
+@lru_cache(maxsize=1)
+def default_tables() -> Tuple[AirportTable, TransitionTable]:
+    """Airport and transition tables read from the same ``globelog.sqlite``."""
+    return AirportTable.from_sqlite(), TransitionTable.from_sqlite()
+
+
+def airport_zones(codes: Codes, table: AirportTable, transitions: TransitionTable) -> "np.ndarray":
+    """Dense transition-table zone numbers for IATA ``codes``; ``MISSING`` where unknown."""
+    zones = np.append(transitions.zone_index(table.timezones), np.int16(MISSING))
+    # Padding both lookups with a trailing MISSING lets unknown codes (row -1)
+    # and airports without a timezone (category -1) fall through to MISSING.
+    categories = np.append(table.timezone, np.int16(MISSING))
+    return zones[categories[table.index(codes)]]
+
+
+def to_local(
+    iata_codes: Codes,
+    utc_timestamps: Timestamps,
+    table: Optional[AirportTable] = None,
+    transitions: Optional[TransitionTable] = None,
+) -> LocalTimes:
+    """Convert UTC ``utc_timestamps`` (POSIX seconds or datetime64) to local time at each airport.
+
+    Both arguments are aligned arrays (or sequences) of equal length. The
+    default tables are read once from ``globelog.sqlite`` and reused.
+    """
+    if table is None or transitions is None:
+        default_table, default_transitions = default_tables()
+        table = table or default_table
+        transitions = transitions or default_transitions
+    return transitions.convert(airport_zones(iata_codes, table, transitions), utc_timestamps)
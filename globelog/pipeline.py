@@ -0,0 +1,381 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from globelog.data import (
+    AIRPORT_TIMEZONES_JSON,
+    COLUMNAR_DIR,
+    CURATED_AIRPORTS,
+    CURATED_CONTINENTS,
+    CURATED_COUNTRIES,
+    DATA_DIR,
+    DB_PATH,
+    FLAGS_DIR,
+    ROOT,
+    TIMEZONE_OVERRIDES_PATH,
+)
+from globelog.flags import FLAG_BUNDLE_PATH
+from globelog.snapshot import SNAPSHOT_PATH
+
+
+STATE_PATH = DATA_DIR / ".cache" / "pipeline.json"
+DB_MANIFEST = DATA_DIR / "globelog.manifest.json"
+CORRECTIONS_DIR = DATA_DIR / "corrections"
+# The shared loaders: stages that parse the data through them are stale when they change.
+LOADER_MODULES = tuple(ROOT / "globelog" / name for name in ("data.py", "timezones.py", "_cache.py"))
+
+
+class StageSkipped(Exception):
+    """Raised by a stage that cannot run here (e.g. an optional dependency is missing)."""
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[], Optional[int]]
+    inputs: Tuple[Path, ...]
+    outputs: Tuple[Path, ...] = ()
+    after: Tuple[str, ...] = ()
+
+
+class StageResult(NamedTuple):
+    name: str
+    status: str
+    seconds: float
+    output: str = ""
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status in {"ran", "fresh", "kept", "skipped"}
+
+
+def script(name: str):
+    """Import one of the top-level pipeline scripts as a module."""
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    return importlib.import_module(name)
+
+
+def _process_countries() -> None:
+    script("process_countries").main()
+
+
+def _process_airports() -> None:
+    script("process_airports").main()
+
+
+def _validate_datasets() -> int:
+    return script("validate_datasets").validate()
+
+
+def _validate_flags() -> int:
+    module = script("validate_flags")
+    try:
+        return module.validate_flags()
+    except module.FlagValidationError as exc:
+        print(f"Validation failed: {exc}")
+        return 1
+
+
+def _export_flags() -> None:
+    script("export_flags").export_flags()
+
+
+def _validate_flag_bundle() -> int:
+    module = script("validate_flag_bundle")
+    try:
+        return module.validate_flag_bundle()
+    except module.FlagBundleValidationError as exc:
+        print(f"Validation failed: {exc}")
+        return 1
+
+
+def _verify_timezones() -> int:
+    return script("verify_timezones").verify_timezones()
+
+
+def _build_sqlite() -> None:
+    script("build_sqlite").build_database()
+
+
+def _verify_sqlite() -> int:
+    return script("verify_sqlite").verify_database()
+
+
+def _export_snapshot() -> None:
+    script("export_snapshot").export_snapshot()
+
+
+def _export_columnar() -> None:
+    try:
+        module = script("export_columnar")
+    except ImportError as exc:
+        # pyarrow is optional; the CSV, SQLite and snapshot outputs do not need it.
+        raise StageSkipped(str(exc)) from exc
+    module.export_columnar()
+
+
+STAGES: Tuple[Stage, ...] = (
+    Stage(
+        "process_countries",
+        _process_countries,
+        inputs=(DATA_DIR / "countries.csv", CORRECTIONS_DIR / "country_name_notes.json", ROOT / "process_countries.py"),
+        outputs=(CURATED_COUNTRIES, CURATED_CONTINENTS),
+    ),
+    Stage(
+        "process_airports",
+        _process_airports,
+        inputs=(
+            DATA_DIR / "airports.csv", AIRPORT_TIMEZONES_JSON, TIMEZONE_OVERRIDES_PATH, ROOT / "process_airports.py",
+            *LOADER_MODULES,
+        ),
+        outputs=(CURATED_AIRPORTS,),
+    ),
+    Stage(
+        "validate_datasets",
+        _validate_datasets,
+        inputs=(CURATED_COUNTRIES, CURATED_AIRPORTS, ROOT / "validate_datasets.py", *LOADER_MODULES),
+        after=("process_countries", "process_airports"),
+    ),
+    Stage(
+        "validate_flags",
+        _validate_flags,
+        inputs=(CURATED_COUNTRIES, FLAGS_DIR, ROOT / "validate_flags.py", *LOADER_MODULES),
+        after=("process_countries",),
+    ),
+    Stage(
+        "export_flags",
+        _export_flags,
+        inputs=(FLAGS_DIR, ROOT / "export_flags.py", ROOT / "globelog" / "flags.py"),
+        outputs=(FLAG_BUNDLE_PATH,),
+        # validate_flags renames assets to uppercase codes; pack the result.
+        after=("validate_flags",),
+    ),
+    Stage(
+        "validate_flag_bundle",
+        _validate_flag_bundle,
+        inputs=(FLAG_BUNDLE_PATH, CURATED_COUNTRIES, ROOT / "validate_flag_bundle.py"),
+        after=("export_flags",),
+    ),
+    Stage(
+        "verify_timezones",
+        _verify_timezones,
+        inputs=(
+            CURATED_AIRPORTS, AIRPORT_TIMEZONES_JSON, TIMEZONE_OVERRIDES_PATH, ROOT / "verify_timezones.py",
+            *LOADER_MODULES,
+        ),
+        after=("process_airports",),
+    ),
+    Stage(
+        "build_sqlite",
+        _build_sqlite,
+        inputs=(
+            CURATED_CONTINENTS, CURATED_COUNTRIES, CURATED_AIRPORTS,
+            CORRECTIONS_DIR / "country_name_notes.json", TIMEZONE_OVERRIDES_PATH, ROOT / "build_sqlite.py",
+            *LOADER_MODULES,
+        ),
+        outputs=(DB_PATH, DB_MANIFEST),
+        after=("process_countries", "process_airports"),
+    ),
+    Stage(
+        "verify_sqlite",
+        _verify_sqlite,
+        inputs=(DB_PATH, CURATED_COUNTRIES, CURATED_AIRPORTS, ROOT / "verify_sqlite.py", *LOADER_MODULES),
+        after=("build_sqlite",),
+    ),
+    Stage(
+        "export_snapshot",
+        _export_snapshot,
+        inputs=(DB_PATH, ROOT / "export_snapshot.py", ROOT / "globelog" / "snapshot.py"),
+        outputs=(SNAPSHOT_PATH,),
+        after=("build_sqlite",),
+    ),
+    Stage(
+        "export_columnar",
+        _export_columnar,
+        inputs=(
+            CURATED_CONTINENTS, CURATED_COUNTRIES, CURATED_AIRPORTS,
+            ROOT / "export_columnar.py", ROOT / "globelog" / "columnar.py", *LOADER_MODULES,
+        ),
+        outputs=tuple(COLUMNAR_DIR / f"{dataset}.{format}" for dataset in ("continents", "countries", "airports")
+                      for format in ("parquet", "arrow")),
+        after=("process_countries", "process_airports"),
+    ),
+)
+
+
+def fingerprint(path: Path) -> Optional[str]:
+    """Content hash of a file, or of a directory's file names and contents."""
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    files = sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path]
+    for file in files:
+        digest.update(file.name.encode("utf-8") + b"\0")
+        with file.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprints(paths: Sequence[Path]) -> Dict[str, Optional[str]]:
+    return {str(path.relative_to(ROOT)): fingerprint(path) for path in paths}
+
+
+def load_state(path: Path = STATE_PATH) -> Dict[str, dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: Dict[str, dict], path: Path = STATE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    temp_path.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+class _ThreadRoutedStdout(io.TextIOBase):
+    """Sends each worker thread's prints to its own buffer so concurrent stages don't interleave."""
+
+    def __init__(self, fallback) -> None:
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def capture(self) -> io.StringIO:
+        buffer = io.StringIO()
+        self._local.buffer = buffer
+        return buffer
+
+    def release(self) -> None:
+        self._local.buffer = None
+
+    def write(self, text: str) -> int:
+        target = getattr(self._local, "buffer", None) or self._fallback
+        return target.write(text)
+
+    def flush(self) -> None:
+        self._fallback.flush()
+
+
+class Pipeline:
+    """Runs the pipeline scripts as a DAG inside one process.
+
+    Independent stages run concurrently on a thread pool. A stage is skipped
+    when the content hashes of its inputs (and existing outputs) match the
+    last successful run. Stages share parsed CSVs through the memoised
+    ``globelog.data`` loaders, so each curated file is parsed once per run.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage] = STAGES,
+        state_path: Path = STATE_PATH,
+        force: bool = False,
+        workers: int = 4,
+    ) -> None:
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.force = force
+        self.workers = workers
+        self.state = load_state(state_path)
+        self._state_lock = threading.Lock()
+
+    def is_fresh(self, stage: Stage, inputs: Dict[str, Optional[str]]) -> bool:
+        recorded = self.state.get(stage.name)
+        if self.force or not recorded:
+            return False
+        outputs = fingerprints(stage.outputs)
+        # A missing output is never fresh, whatever was recorded for it.
+        if any(digest is None for digest in outputs.values()):
+            return False
+        return recorded.get("inputs") == inputs and recorded.get("outputs") == outputs
+
+    def run_stage(self, stage: Stage, stdout: _ThreadRoutedStdout) -> StageResult:
+        start = time.perf_counter()
+        inputs = fingerprints(stage.inputs)
+        if self.is_fresh(stage, inputs):
+            return StageResult(stage.name, "fresh", time.perf_counter() - start)
+
+        missing = [path for path, digest in inputs.items() if digest is None]
+        if missing:
+            if stage.outputs and all(path.exists() for path in stage.outputs):
+                # e.g. the raw OurAirports dump is not checked in; keep the curated output.
+                return StageResult(stage.name, "kept", time.perf_counter() - start, error=f"missing {', '.join(missing)}")
+            return StageResult(stage.name, "failed", time.perf_counter() - start, error=f"missing {', '.join(missing)}")
+
+        buffer = stdout.capture()
+        try:
+            code = stage.run() or 0
+        except StageSkipped as exc:
+            # Not recorded, so the stage runs again once it can.
+            with self._state_lock:
+                self.state.pop(stage.name, None)
+            return StageResult(stage.name, "skipped", time.perf_counter() - start, buffer.getvalue(), str(exc))
+        except Exception as exc:  # noqa: BLE001 - reported per stage
+            return StageResult(stage.name, "failed", time.perf_counter() - start, buffer.getvalue(), repr(exc))
+        finally:
+            stdout.release()
+
+        if code:
+            return StageResult(stage.name, "failed", time.perf_counter() - start, buffer.getvalue(), f"exit code {code}")
+        with self._state_lock:
+            self.state[stage.name] = {"inputs": inputs, "outputs": fingerprints(stage.outputs)}
+        return StageResult(stage.name, "ran", time.perf_counter() - start, buffer.getvalue())
+
+    def run(self, report: Callable[[StageResult], None] = lambda result: None) -> List[StageResult]:
+        results: Dict[str, StageResult] = {}
+        pending = dict(self.stages)
+        running: Dict[Future, str] = {}
+        stdout = _ThreadRoutedStdout(sys.stdout)
+        original_stdout, sys.stdout = sys.stdout, stdout
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                while pending or running:
+                    for name, stage in list(pending.items()):
+                        upstream = [results.get(dep) for dep in stage.after if dep in self.stages]
+                        if any(result is not None and not result.ok for result in upstream):
+                            results[name] = StageResult(name, "blocked", 0.0)
+                            report(results[name])
+                            del pending[name]
+                        elif all(result is not None for result in upstream):
+                            running[pool.submit(self.run_stage, stage, stdout)] = name
+                            del pending[name]
+                    if not running:
+                        if pending:
+                            raise ValueError(f"Unsatisfiable stage dependencies: {', '.join(pending)}")
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        results[running.pop(future)] = result
+                        report(result)
+        finally:
+            sys.stdout = original_stdout
+            save_state(self.state, self.state_path)
+        return [results[name] for name in self.stages]
+
+
+def print_result(result: StageResult) -> None:
+    print(f"── {result.name}: {result.status} ({result.seconds:.2f} s){' - ' + result.error if result.error else ''}")
+    if result.output:
+        print(result.output.rstrip())
+
+
+def print_timings(results: Sequence[StageResult], wall_seconds: float) -> None:
+    print()
+    print("Stage timings:")
+    for result in results:
+        print(f"  {result.name:<20} {result.status:<8} {result.seconds:>8.2f} s")
+    print(f"  {'wall clock':<20} {'':<8} {wall_seconds:>8.2f} s")
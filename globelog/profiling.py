@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+HOTSPOT_LIMIT = 15
+
+# cProfile allows one active profiler at a time (Python 3.12+ raises otherwise)
+# and tracemalloc's peak is process-wide, so profiled phases run one at a time,
+# in any thread of the process.
+_profile_lock = threading.Lock()
+
+
+class PhaseTimer:
+    """Times named phases of a run, optionally under cProfile and tracemalloc.
+
+    Without ``profile`` this only records wall-clock durations, cheap enough
+    to leave on in CI. With it, every phase also runs under one shared
+    profiler and the peak traced memory of each phase is recorded. Profiled
+    phases hold a process-wide lock, so concurrent profiled runs (e.g.
+    ``validate-all --profile``) take turns; peaks still include allocations
+    by unprofiled threads running meanwhile.
+    """
+
+    def __init__(self, profile: bool = False) -> None:
+        self.profile = profile
+        self.durations: Dict[str, float] = {}
+        self.peak_memory: Dict[str, int] = {}
+        self._profiler: Optional[cProfile.Profile] = cProfile.Profile() if profile else None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.profile:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+            return
+        with _profile_lock:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._profiler.enable()
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start
+                self._profiler.disable()
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_memory[name] = max(self.peak_memory.get(name, 0), peak)
+                if started:
+                    tracemalloc.stop()
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations.values())
+
+    def hotspots(self, limit: int = HOTSPOT_LIMIT) -> List[str]:
+        if self._profiler is None:
+            return []
+        stats = pstats.Stats(self._profiler).stats
+        lines: List[str] = []
+        # Each entry is (primitive calls, total calls, self time, cumulative time, callers).
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in sorted(
+            stats.items(), key=lambda item: item[1][3], reverse=True
+        )[:limit]:
+            lines.append(f"{cumtime:8.4f}s cum {tottime:8.4f}s self {calls:>8} calls  {function} ({filename}:{line})")
+        return lines
+
+    def profile_report(self) -> Dict[str, object]:
+        if not self.profile:
+            return {}
+        return {
+            "peak_memory_bytes": dict(self.peak_memory),
+            "hotspots": self.hotspots(),
+        }
@@ -0,0 +1,266 @@
+"""Multi-leg routing over a range-limited airport graph (needs NumPy).
+
+Airports are joined by an edge when they are at most ``max_leg_km`` apart
+along the great circle. There is no schedule or route data: the graph says
+which hops an aircraft with that range could fly, not which ones are
+served. Edges are found with the reverse geocoder's KD-tree rather than by
+comparing every pair, and stored in compressed sparse row (CSR) form: row
+``i``'s neighbours are ``indices[indptr[i]:indptr[i + 1]]``, nearest first,
+with their distances in ``weights``. Built graphs are cached in
+``data/.cache/`` per range, keyed on the curated airports CSV.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from globelog.data import CURATED_AIRPORTS, DATA_DIR, load_airports
+from globelog.distance import chord_to_km, km_to_chord, unit_vectors
+from globelog.geocode import KDTree
+from globelog.timezones import file_digest
+
+
+CACHE_DIR = DATA_DIR / ".cache"
+CACHE_FORMAT_VERSION = 1
+# Graphs are built for at least this range; queries with shorter legs filter its edges.
+DEFAULT_MAX_LEG_KM = 2000.0
+# With minimise="hops" every leg costs this much on top of its length, so a
+# route with fewer hops always wins and distance only breaks ties.
+HOP_COST_KM = 1e6
+
+
+class Route(NamedTuple):
+    stops: Tuple[str, ...]
+    legs_km: Tuple[float, ...]
+
+    @property
+    def hops(self) -> int:
+        return len(self.legs_km)
+
+    @property
+    def total_km(self) -> float:
+        return sum(self.legs_km)
+
+
+def graph_cache_path(max_leg_km: float) -> Path:
+    return CACHE_DIR / f"route_graph_{max_leg_km:g}km.npz"
+
+
+def source_digest(max_leg_km: float, airports_path: Path = CURATED_AIRPORTS) -> str:
+    return hashlib.sha256(f"{max_leg_km!r}\n{file_digest(airports_path)}\n".encode()).hexdigest()
+
+
+class RouteGraph:
+    """Airports and the legs of at most ``max_leg_km`` between them, as a CSR graph."""
+
+    ARRAYS = ("iata", "points", "indptr", "indices", "weights")
+
+    def __init__(
+        self,
+        iata: "np.ndarray",
+        points: "np.ndarray",
+        max_leg_km: float,
+        indptr: "np.ndarray",
+        indices: "np.ndarray",
+        weights: "np.ndarray",
+    ) -> None:
+        self.iata = iata
+        self.points = points
+        self.max_leg_km = max_leg_km
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self._rows = {code: row for row, code in enumerate(iata.tolist())}
+
+    def __len__(self) -> int:
+        return len(self.iata)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def build(cls, max_leg_km: float = DEFAULT_MAX_LEG_KM, airports_path: Path = CURATED_AIRPORTS) -> "RouteGraph":
+        airports = list(load_airports(airports_path).values())
+        latitude = np.fromiter((airport.latitude_deg for airport in airports), np.float64, len(airports))
+        longitude = np.fromiter((airport.longitude_deg for airport in airports), np.float64, len(airports))
+        points = unit_vectors(latitude, longitude)
+        first, second, chord = KDTree.build(points).pairs_within(float(km_to_chord(max_leg_km)))
+        # Sort by source, then distance, so each row lists its nearest neighbours first.
+        km = chord_to_km(chord)
+        order = np.lexsort((km, first))
+        indptr = np.zeros(len(airports) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(first, minlength=len(airports)), out=indptr[1:])
+        return cls(
+            np.array([airport.iata for airport in airports], dtype="U3"),
+            points,
+            max_leg_km,
+            indptr,
+            second[order].astype(np.int32),
+            km[order].astype(np.float32),
+        )
+
+    def save(self, path: Path, source_digest: str = "") -> None:
+        """Write the graph to an ``.npz`` file atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+        np.savez(
+            temp_path,
+            version=np.int64(CACHE_FORMAT_VERSION),
+            source_digest=np.array(source_digest),
+            max_leg_km=np.float64(self.max_leg_km),
+            **{name: getattr(self, name) for name in self.ARRAYS},
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, source_digest: Optional[str] = None) -> "RouteGraph":
+        """Read a saved graph; ValueError if it is stale (``source_digest`` differs) or another format."""
+        with np.load(path) as saved:
+            if int(saved["version"]) != CACHE_FORMAT_VERSION:
+                raise ValueError(f"{path.name} has an unsupported format version.")
+            if source_digest is not None and str(saved["source_digest"]) != source_digest:
+                raise ValueError(f"{path.name} was built from other data.")
+            iata, points, indptr, indices, weights = (saved[name] for name in cls.ARRAYS)
+            return cls(iata, points, float(saved["max_leg_km"]), indptr, indices, weights)
+
+    def row(self, code: str) -> int:
+        try:
+            return self._rows[code.strip().upper()]
+        except KeyError:
+            raise KeyError(f"Unknown airport {code!r}") from None
+
+    def _limit(self, max_leg_km: Optional[float]) -> float:
+        if max_leg_km is None:
+            return self.max_leg_km
+        if max_leg_km > self.max_leg_km:
+            raise ValueError(f"This graph only has legs up to {self.max_leg_km:g} km; load one built for {max_leg_km:g} km.")
+        return max_leg_km
+
+    def _edges(self, row: int, limit: float) -> Tuple["np.ndarray", "np.ndarray"]:
+        start, end = self.indptr[row], self.indptr[row + 1]
+        weights = self.weights[start:end]
+        # Rows are sorted by distance, so the legs within ``limit`` are a prefix.
+        end = start + np.searchsorted(weights, limit, side="right")
+        return self.indices[start:end], self.weights[start:end]
+
+    def neighbours(self, code: str, k: Optional[int] = None, max_leg_km: Optional[float] = None) -> List[Tuple[str, float]]:
+        """The ``k`` nearest airports (all, by default) reachable in one leg, with their distance in km."""
+        indices, weights = self._edges(self.row(code), self._limit(max_leg_km))
+        return list(zip(self.iata[indices[:k]].tolist(), weights[:k].astype(np.float64).tolist()))
+
+    def reachable(self, code: str, max_hops: int, max_leg_km: Optional[float] = None) -> Dict[str, int]:
+        """Airports reachable in at most ``max_hops`` legs, with the fewest hops needed (origin included as 0)."""
+        limit = self._limit(max_leg_km)
+        hops = np.full(len(self), -1, dtype=np.int32)
+        frontier = np.array([self.row(code)])
+        hops[frontier] = 0
+        usable = self.weights <= limit
+        for hop in range(1, max_hops + 1):
+            starts, ends = self.indptr[frontier], self.indptr[frontier + 1]
+            counts = ends - starts
+            # The edge positions of every frontier row, concatenated.
+            edges = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            found = self.indices[edges[usable[edges]]]
+            frontier = np.unique(found[hops[found] < 0])
+            if not len(frontier):
+                break
+            hops[frontier] = hop
+        rows = np.flatnonzero(hops >= 0)
+        return dict(zip(self.iata[rows].tolist(), hops[rows].tolist()))
+
+    def shortest_path(
+        self,
+        origin: str,
+        destination: str,
+        max_leg_km: Optional[float] = None,
+        minimise: str = "distance",
+    ) -> Optional[Route]:
+        """The best route with every leg at most ``max_leg_km``, or ``None`` if there is none.
+
+        ``minimise="distance"`` finds the shortest total distance;
+        ``minimise="hops"`` the fewest legs, then the shortest among those.
+        A* search: the great-circle distance to the destination (and, for
+        hops, the legs it needs at ``max_leg_km`` each) never overestimates
+        the remaining cost, so the first time the destination is settled its
+        route is optimal.
+        """
+        if minimise not in ("distance", "hops"):
+            raise ValueError("minimise must be 'distance' or 'hops'")
+        limit = self._limit(max_leg_km)
+        source, target = self.row(origin), self.row(destination)
+        remaining = chord_to_km(np.linalg.norm(self.points - self.points[target], axis=1))
+        hop_cost = 0.0
+        if minimise == "hops":
+            hop_cost = HOP_COST_KM
+            remaining = remaining + HOP_COST_KM * np.ceil(remaining / limit * (1 - 1e-12))
+
+        cost = np.full(len(self), np.inf)
+        parent = np.full(len(self), -1, dtype=np.int64)
+        settled = np.zeros(len(self), dtype=bool)
+        cost[source] = 0.0
+        heap = [(remaining[source], source)]
+        while heap:
+            _, row = heapq.heappop(heap)
+            if settled[row]:
+                continue
+            if row == target:
+                return self._route(parent, target)
+            settled[row] = True
+            indices, weights = self._edges(row, limit)
+            candidate = cost[row] + hop_cost + weights
+            better = candidate < cost[indices]
+            indices, candidate = indices[better], candidate[better]
+            cost[indices] = candidate
+            parent[indices] = row
+            for item in zip((candidate + remaining[indices]).tolist(), indices.tolist()):
+                heapq.heappush(heap, item)
+        return None
+
+    def _route(self, parent: "np.ndarray", target: int) -> Route:
+        rows = [target]
+        while parent[rows[-1]] >= 0:
+            rows.append(int(parent[rows[-1]]))
+        rows.reverse()
+        legs = chord_to_km(np.linalg.norm(self.points[rows[1:]] - self.points[rows[:-1]], axis=1))
+        return Route(tuple(self.iata[rows].tolist()), tuple(legs.tolist()))
+
+
+def load_graph(
+    max_leg_km: float = DEFAULT_MAX_LEG_KM,
+    airports_path: Path = CURATED_AIRPORTS,
+    cache_path: Optional[Path] = None,
+) -> RouteGraph:
+    """The graph from the cache if it was built from the current CSV, else built and cached."""
+    cache_path = cache_path or graph_cache_path(max_leg_km)
+    digest = source_digest(max_leg_km, airports_path)
+    try:
+        return RouteGraph.load(cache_path, digest)
+    except (OSError, ValueError, KeyError):
+        pass
+    graph = RouteGraph.build(max_leg_km, airports_path)
+    try:
+        graph.save(cache_path, digest)
+    except OSError:
+        pass  # A read-only checkout just rebuilds next time.
+    return graph
+
+
+@lru_cache(maxsize=4)
+def default_graph(max_leg_km: float = DEFAULT_MAX_LEG_KM) -> RouteGraph:
+    return load_graph(max_leg_km)
+
+
+def shortest_path(
+    origin: str, destination: str, max_leg_km: float = DEFAULT_MAX_LEG_KM, minimise: str = "distance"
+) -> Optional[Route]:
+    """Best route between two airports with legs of at most ``max_leg_km``, using the cached graph."""
+    graph = default_graph(max(float(max_leg_km), DEFAULT_MAX_LEG_KM))
+    return graph.shortest_path(origin, destination, max_leg_km, minimise)
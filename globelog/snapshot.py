@@ -0,0 +1,363 @@
+"""Memory-mapped binary snapshot of ``globelog.sqlite`` for client bundles.
+
+The file is little-endian and every section starts on an 8-byte boundary::
+
+    header     b"GLOBELOG", format version (u32), section count (u32)
+    directory  per section: name (8 bytes), offset (u64), item count (u32), item size (u32)
+    sections   fixed-width column blocks, sorted indexes and the string table
+
+Airports are stored in IATA order, so the ``iata`` column doubles as the
+sorted IATA index. Text is stored once in a UTF-8 ``strings`` blob and
+referenced by u32 string id (id 0 is the empty string). Countries,
+continents and timezones are referenced by u16 row. Opening a snapshot
+reads the header and directory only; every lookup reads straight from the
+mapped pages, with no parsing or loading step.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from globelog.data import DATA_DIR, DB_PATH, Airport, Country
+
+
+SNAPSHOT_PATH = DATA_DIR / "globelog.snapshot"
+MAGIC = b"GLOBELOG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII")
+ENTRY = struct.Struct("<8sQII")
+ALIGNMENT = 8
+NO_TIMEZONE = 0xFFFF
+
+
+# Section name → item format; "Ns" sections are fixed-width byte strings.
+SECTIONS = {
+    "iata": "3s",
+    "name": "I",
+    "city": "I",
+    "lat": "d",
+    "lon": "d",
+    "cont": "H",
+    "ctry": "H",
+    "tz": "H",
+    "icao": "I",
+    "gps": "I",
+    "icao_key": "4s",
+    "icao_row": "I",
+    "ctry_key": "2s",
+    "ctry_nam": "I",
+    "ctry_con": "H",
+    "cont_key": "2s",
+    "cont_nam": "I",
+    "tz_name": "I",
+    "by_ctry": "I",
+    "ctry_off": "I",
+    "by_tz": "I",
+    "tz_off": "I",
+    "str_off": "I",
+    "strings": "B",
+}
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {"": 0}
+        self.blob = bytearray()
+        self.offsets = [0, 0]
+
+    def add(self, value: Optional[str]) -> int:
+        value = value or ""
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.offsets) - 1
+            self.blob += value.encode("utf-8")
+            self.offsets.append(len(self.blob))
+        return string_id
+
+
+def _fixed(values: Iterable[str], width: int, what: str) -> bytes:
+    encoded = [value.encode("ascii") for value in values]
+    for value in encoded:
+        if len(value) != width:
+            raise ValueError(f"{what} {value!r} is not {width} ASCII characters.")
+    return b"".join(encoded)
+
+
+def _postings(keys: Sequence[int], groups: int) -> Tuple[List[int], List[int]]:
+    """Rows grouped by key (in row order within a group) plus each group's start offset."""
+    rows = sorted(range(len(keys)), key=lambda row: keys[row])
+    offsets = [0] * (groups + 1)
+    for key in keys:
+        if key < groups:
+            offsets[key + 1] += 1
+    for group in range(groups):
+        offsets[group + 1] += offsets[group]
+    return [row for row in rows if keys[row] < groups], offsets
+
+
+def build_sections(conn: sqlite3.Connection) -> Dict[str, bytes]:
+    """Encode the continent, country and airport tables as snapshot sections."""
+    strings = _StringTable()
+    continents = conn.execute("SELECT code, name FROM continent ORDER BY code").fetchall()
+    countries = conn.execute("SELECT code, name, continent_code FROM country ORDER BY code").fetchall()
+    airports = conn.execute(
+        """
+        SELECT iata, name, municipality, latitude, longitude, continent_code, country_code,
+               timezone, icao_code, gps_code
+        FROM airport ORDER BY iata
+        """
+    ).fetchall()
+    timezones = sorted({row[7] for row in airports if row[7]})
+    continent_rows = {code: row for row, (code, _) in enumerate(continents)}
+    country_rows = {code: row for row, (code, _, _) in enumerate(countries)}
+    timezone_rows = {name: row for row, name in enumerate(timezones)}
+
+    def pack(name: str, values: Iterable) -> bytes:
+        values = list(values)
+        return struct.pack(f"<{len(values)}{SECTIONS[name]}", *values)
+
+    airport_countries = [country_rows[row[6]] for row in airports]
+    airport_timezones = [timezone_rows.get(row[7], NO_TIMEZONE) for row in airports]
+    by_country, country_offsets = _postings(airport_countries, len(countries))
+    by_timezone, timezone_offsets = _postings(airport_timezones, len(timezones))
+    icao = sorted((code, row) for row, code in enumerate(row[8] for row in airports) if code)
+
+    sections = {
+        "iata": _fixed((row[0] for row in airports), 3, "IATA code"),
+        "name": pack("name", (strings.add(row[1]) for row in airports)),
+        "city": pack("city", (strings.add(row[2]) for row in airports)),
+        "lat": pack("lat", (row[3] for row in airports)),
+        "lon": pack("lon", (row[4] for row in airports)),
+        "cont": pack("cont", (continent_rows[row[5]] for row in airports)),
+        "ctry": pack("ctry", airport_countries),
+        "tz": pack("tz", airport_timezones),
+        "icao": pack("icao", (strings.add(row[8]) for row in airports)),
+        "gps": pack("gps", (strings.add(row[9]) for row in airports)),
+        "icao_key": _fixed((code for code, _ in icao), 4, "ICAO code"),
+        "icao_row": pack("icao_row", (row for _, row in icao)),
+        "ctry_key": _fixed((code for code, _, _ in countries), 2, "Country code"),
+        "ctry_nam": pack("ctry_nam", (strings.add(name) for _, name, _ in countries)),
+        "ctry_con": pack("ctry_con", (continent_rows[continent] for _, _, continent in countries)),
+        "cont_key": _fixed((code for code, _ in continents), 2, "Continent code"),
+        "cont_nam": pack("cont_nam", (strings.add(name) for _, name in continents)),
+        "tz_name": pack("tz_name", (strings.add(name) for name in timezones)),
+        "by_ctry": pack("by_ctry", by_country),
+        "ctry_off": pack("ctry_off", country_offsets),
+        "by_tz": pack("by_tz", by_timezone),
+        "tz_off": pack("tz_off", timezone_offsets),
+    }
+    sections["str_off"] = pack("str_off", strings.offsets)
+    sections["strings"] = bytes(strings.blob)
+    return sections
+
+
+def write_snapshot(db_path: Path = DB_PATH, path: Path = SNAPSHOT_PATH) -> int:
+    """Export ``db_path`` to ``path`` (atomically replaced); returns the file size in bytes."""
+    if not db_path.exists():
+        raise FileNotFoundError("Database not found. Run build_sqlite.py first.")
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        sections = build_sections(conn)
+    finally:
+        conn.close()
+
+    directory = []
+    offset = _aligned(HEADER.size + ENTRY.size * len(sections))
+    for name, data in sections.items():
+        size = struct.calcsize(f"<{SECTIONS[name]}")
+        directory.append(ENTRY.pack(name.encode("ascii"), offset, len(data) // size, size))
+        offset = _aligned(offset + len(data))
+
+    temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with temp_path.open("wb") as handle:
+        handle.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+        handle.write(b"".join(directory))
+        for data in sections.values():
+            handle.write(b"\0" * (_aligned(handle.tell()) - handle.tell()))
+            handle.write(data)
+    os.replace(temp_path, path)
+    return path.stat().st_size
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class _Codes(Sequence[bytes]):
+    """A sorted fixed-width code section, binary-searched in place."""
+
+    def __init__(self, data: mmap.mmap, offset: int, count: int, width: int) -> None:
+        self.data = data
+        self.offset = offset
+        self.count = count
+        self.width = width
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> bytes:  # type: ignore[override]
+        start = self.offset + index * self.width
+        return self.data[start:start + self.width]
+
+    def find(self, code: str) -> Optional[int]:
+        """Row of ``code`` (case-insensitive, surrounding spaces ignored), or ``None``."""
+        key = code.strip().upper().encode("ascii", "replace")
+        data, offset, width = self.data, self.offset, self.width
+        low, high = 0, self.count
+        # Slicing the mmap yields bytes directly, cheaper than bisect over __getitem__.
+        while low < high:
+            middle = (low + high) // 2
+            start = offset + middle * width
+            if data[start:start + width] < key:
+                low = middle + 1
+            else:
+                high = middle
+        start = offset + low * width
+        return low if low < self.count and data[start:start + width] == key else None
+
+
+class _Strings(Sequence[str]):
+    """A string-id section decoded item by item, for ``bisect`` over sorted text."""
+
+    def __init__(self, snapshot: "Snapshot", ids: memoryview) -> None:
+        self.snapshot = snapshot
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> str:  # type: ignore[override]
+        return self.snapshot._string(self.ids[index])
+
+
+class Snapshot:
+    """Read-only airport lookups over a memory-mapped snapshot file.
+
+    Mirrors ``GlobeLogDB`` (``airport_by_iata``, ``airports_by_iata``,
+    ``airport_by_icao``, ``airports_in_country``, ``airports_in_timezone``,
+    ``country_by_code``) and returns the same records. Full-text search stays
+    in SQLite. Columns are ``memoryview`` casts over the mapping, so only
+    the pages a lookup touches are ever read.
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_PATH) -> None:
+        if sys.byteorder != "little":
+            raise RuntimeError("Snapshots are little-endian; this reader needs a little-endian host.")
+        self.path = path
+        with path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._views: List[memoryview] = [self._view]
+        magic, version, count = HEADER.unpack_from(self._view) if len(self._view) >= HEADER.size else (b"", 0, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path.name} is not a version {FORMAT_VERSION} GlobeLog snapshot.")
+        columns: Dict[str, memoryview] = {}
+        codes: Dict[str, _Codes] = {}
+        for index in range(count):
+            name, offset, items, size = ENTRY.unpack_from(self._view, HEADER.size + index * ENTRY.size)
+            name = name.rstrip(b"\0").decode("ascii")
+            item = SECTIONS.get(name)
+            if item is None:
+                continue
+            if item.endswith("s"):
+                codes[name] = _Codes(self._mmap, offset, items, size)
+            else:
+                columns[name] = self._view[offset:offset + items * size].cast(item)
+                self._views.append(columns[name])
+            if name == "strings":
+                self._strings_offset = offset
+
+        self._iata, self._icao = codes["iata"], codes["icao_key"]
+        self._countries, self._continents = codes["ctry_key"], codes["cont_key"]
+        self._name, self._city = columns["name"], columns["city"]
+        self._latitude, self._longitude = columns["lat"], columns["lon"]
+        self._continent, self._country, self._timezone = columns["cont"], columns["ctry"], columns["tz"]
+        self._icao_code, self._gps_code, self._icao_row = columns["icao"], columns["gps"], columns["icao_row"]
+        self._country_name, self._country_continent = columns["ctry_nam"], columns["ctry_con"]
+        self._timezone_names = _Strings(self, columns["tz_name"])
+        self._by_country, self._country_offsets = columns["by_ctry"], columns["ctry_off"]
+        self._by_timezone, self._timezone_offsets = columns["by_tz"], columns["tz_off"]
+        self._string_offsets = columns["str_off"]
+
+    def close(self) -> None:
+        # Every view must be released before the mapping can be closed.
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._iata)
+
+    def _string(self, string_id: int) -> str:
+        offsets, base = self._string_offsets, self._strings_offset
+        return self._mmap[base + offsets[string_id]:base + offsets[string_id + 1]].decode("utf-8")
+
+    def _timezone_string(self, row: int) -> str:
+        return "" if row == NO_TIMEZONE else self._timezone_names[row]
+
+    def _airport(self, row: int) -> Airport:
+        return Airport(
+            self._iata[row].decode("ascii"),
+            self._string(self._name[row]),
+            self._latitude[row],
+            self._longitude[row],
+            self._continents[self._continent[row]].decode("ascii"),
+            self._countries[self._country[row]].decode("ascii"),
+            self._string(self._city[row]),
+            self._timezone_string(self._timezone[row]),
+            self._string(self._icao_code[row]),
+            self._string(self._gps_code[row]),
+        )
+
+    def airport_by_iata(self, iata: str) -> Optional[Airport]:
+        row = self._iata.find(iata)
+        return None if row is None else self._airport(row)
+
+    def airports_by_iata(self, codes: Iterable[str]) -> Dict[str, Airport]:
+        """Airports for many IATA codes, keyed by code; unknown codes are left out."""
+        found = (self.airport_by_iata(code) for code in {code.strip().upper() for code in codes})
+        return {airport.iata: airport for airport in found if airport}
+
+    def airport_by_icao(self, icao: str) -> Optional[Airport]:
+        row = self._icao.find(icao)
+        return None if row is None else self._airport(self._icao_row[row])
+
+    def airports_in_country(self, country_code: str) -> List[Airport]:
+        country = self._countries.find(country_code)
+        if country is None:
+            return []
+        start, end = self._country_offsets[country], self._country_offsets[country + 1]
+        return [self._airport(row) for row in self._by_country[start:end]]
+
+    def airports_in_timezone(self, timezone: str) -> List[Airport]:
+        timezone = timezone.strip()
+        zone = bisect_left(self._timezone_names, timezone)
+        if zone == len(self._timezone_names) or self._timezone_names[zone] != timezone:
+            return []
+        start, end = self._timezone_offsets[zone], self._timezone_offsets[zone + 1]
+        return [self._airport(row) for row in self._by_timezone[start:end]]
+
+    def country_by_code(self, code: str) -> Optional[Country]:
+        row = self._countries.find(code)
+        if row is None:
+            return None
+        return Country(
+            self._countries[row].decode("ascii"),
+            self._string(self._country_name[row]),
+            self._continents[self._country_continent[row]].decode("ascii"),
+        )
@@ -0,0 +1,173 @@
+"""Column-oriented, in-memory airport table for vectorised IATA lookups.
+
+Needs NumPy, which the rest of the package does not, so it is not imported
+by ``globelog`` itself: ``from globelog.table import AirportTable``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - depends on the environment
+    raise ImportError("globelog.table needs NumPy: pip install numpy") from exc
+
+from globelog.data import CURATED_AIRPORTS, DB_PATH, Airport, load_airports
+
+
+ALPHABET = 26
+IATA_SLOTS = ALPHABET ** 3
+MISSING = -1
+
+Codes = Union["np.ndarray", Sequence[str]]
+
+
+class AirportColumns(NamedTuple):
+    """Column slices for a batch of looked-up codes, aligned with the input.
+
+    Rows for unknown codes have ``found == False``, NaN coordinates and
+    ``MISSING`` (-1) category ids.
+    """
+
+    rows: "np.ndarray"
+    found: "np.ndarray"
+    latitude: "np.ndarray"
+    longitude: "np.ndarray"
+    country: "np.ndarray"
+    continent: "np.ndarray"
+    timezone: "np.ndarray"
+
+
+def encode_iata(codes: Codes) -> "np.ndarray":
+    """Map 3-letter codes to 0..26³-1 (case-insensitive); anything else to ``MISSING``."""
+    array = np.asarray(codes)
+    if array.dtype.kind not in "US":
+        array = array.astype(str)
+    if array.dtype.kind == "S":
+        letters = np.frombuffer(array.astype("S3").tobytes(), dtype=np.uint8).astype(np.uint32)
+        valid = array.dtype.itemsize <= 3 or np.char.str_len(array) == 3
+    else:
+        letters = np.frombuffer(np.ascontiguousarray(array, dtype="U3").tobytes(), dtype=np.uint32)
+        valid = array.dtype.itemsize <= 12 or np.char.str_len(array) == 3
+    # Setting bit 5 folds A-Z onto a-z and maps no other character into a-z;
+    # after subtracting "a", anything that is not a letter wraps to >= 26.
+    letters = (letters.reshape(-1, 3) | np.uint32(0x20)) - np.uint32(ord("a"))
+    first, second, third = letters[:, 0], letters[:, 1], letters[:, 2]
+    valid = (first < ALPHABET) & (second < ALPHABET) & (third < ALPHABET) & np.ravel(valid)
+    encoded = ((first * ALPHABET + second) * ALPHABET + third).astype(np.int32)
+    encoded[~valid] = MISSING
+    return encoded.reshape(array.shape)
+
+
+def categorize(values: Sequence[str]) -> Tuple[Tuple[str, ...], "np.ndarray"]:
+    """Small-int category ids for ``values`` plus the id → string table (in first-seen order)."""
+    ids: Dict[str, int] = {}
+    codes = np.fromiter((ids.setdefault(sys.intern(value), len(ids)) for value in values), np.int16, len(values))
+    return tuple(ids), codes
+
+
+class AirportTable:
+    """Airports as parallel NumPy columns with a direct-address IATA index.
+
+    Coordinates are float64 columns; country, continent and timezone are
+    int16 ids into small string tables (``countries``, ``continents``,
+    ``timezones``). Every possible 3-letter code owns one slot of a 26³-entry
+    int32 array holding its row, so an IATA lookup is a perfect hash with no
+    collisions or probing, and ``lookup`` resolves whole arrays of codes with
+    a handful of vectorised operations.
+    """
+
+    def __init__(self, airports: Sequence[Airport]) -> None:
+        self.iata = np.array([airport.iata for airport in airports], dtype="U3")
+        self.name = np.array([airport.name for airport in airports], dtype=object)
+        self.municipality = np.array([airport.municipality for airport in airports], dtype=object)
+        self.icao_code = np.array([airport.icao_code for airport in airports], dtype=object)
+        self.gps_code = np.array([airport.gps_code for airport in airports], dtype=object)
+        self.latitude = np.fromiter((airport.latitude_deg for airport in airports), np.float64, len(airports))
+        self.longitude = np.fromiter((airport.longitude_deg for airport in airports), np.float64, len(airports))
+        self.countries, self.country = categorize([airport.iso_country for airport in airports])
+        self.continents, self.continent = categorize([airport.continent for airport in airports])
+        self.timezones, self.timezone = categorize([airport.timezone for airport in airports])
+
+        slots = encode_iata(self.iata)
+        if np.any(slots == MISSING):
+            bad = ", ".join(self.iata[slots == MISSING][:5])
+            raise ValueError(f"Not 3-letter IATA codes: {bad}")
+        # One spare slot at the end, so encode_iata's MISSING (-1) maps to MISSING.
+        self.slots = np.full(IATA_SLOTS + 1, MISSING, dtype=np.int32)
+        self.slots[slots] = np.arange(len(airports), dtype=np.int32)
+
+    @classmethod
+    def from_csv(cls, path: Path = CURATED_AIRPORTS) -> "AirportTable":
+        return cls(list(load_airports(path).values()))
+
+    @classmethod
+    def from_sqlite(cls, path: Path = DB_PATH) -> "AirportTable":
+        conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                """
+                SELECT iata, name, latitude, longitude, continent_code, country_code,
+                       IFNULL(municipality, ''), IFNULL(timezone, ''), IFNULL(icao_code, ''), IFNULL(gps_code, '')
+                FROM airport ORDER BY rowid
+                """
+            ).fetchall()
+        finally:
+            conn.close()
+        return cls([Airport._make(row) for row in rows])
+
+    def __len__(self) -> int:
+        return len(self.iata)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (object columns count their pointers only)."""
+        columns = (
+            self.iata, self.name, self.municipality, self.icao_code, self.gps_code,
+            self.latitude, self.longitude, self.country, self.continent, self.timezone, self.slots,
+        )
+        return sum(column.nbytes for column in columns)
+
+    def index(self, codes: Codes) -> "np.ndarray":
+        """Row numbers for ``codes``; ``MISSING`` where a code is unknown or malformed."""
+        return self.slots[encode_iata(codes)]
+
+    def lookup(self, codes: Codes) -> AirportColumns:
+        rows = self.index(codes)
+        found = rows != MISSING
+        safe = np.where(found, rows, 0)
+        return AirportColumns(
+            rows,
+            found,
+            np.where(found, self.latitude[safe], np.nan),
+            np.where(found, self.longitude[safe], np.nan),
+            np.where(found, self.country[safe], MISSING),
+            np.where(found, self.continent[safe], MISSING),
+            np.where(found, self.timezone[safe], MISSING),
+        )
+
+    def decode(self, categories: Sequence[str], ids: "np.ndarray") -> "np.ndarray":
+        """Strings for category ``ids`` (e.g. ``table.decode(table.countries, cols.country)``); "" for MISSING."""
+        labels = np.array(list(categories) + [""], dtype=object)
+        return labels[np.where(ids == MISSING, len(categories), ids)]
+
+    def get(self, iata: str) -> Optional[Airport]:
+        (row,) = self.index([iata])
+        if row == MISSING:
+            return None
+        return Airport(
+            str(self.iata[row]),
+            self.name[row],
+            float(self.latitude[row]),
+            float(self.longitude[row]),
+            self.continents[self.continent[row]],
+            self.countries[self.country[row]],
+            self.municipality[row],
+            self.timezones[self.timezone[row]],
+            self.icao_code[row],
+            self.gps_code[row],
+        )
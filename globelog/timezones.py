@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, TextIO, Tuple
+from zoneinfo import TZPATH, ZoneInfo, ZoneInfoNotFoundError
+
+from globelog._cache import FILE_CACHE
+from globelog.data import AIRPORT_TIMEZONES_JSON, DATA_DIR, TIMEZONE_OVERRIDES_PATH
+
+
+CACHE_DIR = DATA_DIR / ".cache"
+
+CACHE_FORMAT_VERSION = 1
+READ_CHUNK_SIZE = 1 << 16
+
+# Default year range covered by the precomputed offset transitions.
+TRANSITION_START_YEAR = 2000
+TRANSITION_END_YEAR = 2040
+# Zones' UTC offsets are sampled this often. The shortest state between two
+# changes in 2000-2040 lasts 6.75 days (America/Cambridge_Bay in 2000).
+TRANSITION_SCAN_STEP = 6 * 24 * 3600
+# Every this many samples the full state (offset, DST flag, abbreviation) is
+# compared too, catching the rare changes that keep the offset.
+TRANSITION_CHECK_EVERY = 16
+TRANSITIONS_CACHE = CACHE_DIR / "timezone_transitions.pickle"
+
+
+class TimezoneEntry(NamedTuple):
+    timezone: str
+    country_code: str
+
+
+class Transition(NamedTuple):
+    """A zone's UTC offset (seconds) and abbreviation from ``utc_start`` (POSIX seconds) onwards."""
+
+    utc_start: int
+    utc_offset: int
+    is_dst: bool
+    abbreviation: str
+
+
+def iter_json_array(handle: TextIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[object]:
+    """Yield the elements of a top-level JSON array without loading the whole document."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    exhausted = False
+
+    while True:
+        # Skip whitespace and separators; refill when the buffer runs dry.
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position >= len(buffer):
+            if exhausted:
+                raise ValueError("Unexpected end of JSON array")
+            buffer, position = handle.read(chunk_size), 0
+            exhausted = not buffer
+            continue
+
+        if not started:
+            if buffer[position] != "[":
+                raise ValueError("Expected a JSON array")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The element straddles the chunk boundary; read more and retry.
+            if exhausted:
+                raise
+            more = handle.read(chunk_size)
+            exhausted = not more
+            buffer, position = buffer[position:] + more, 0
+            continue
+        if end == len(buffer) and not exhausted:
+            # A bare number or literal may continue in the next chunk.
+            more = handle.read(chunk_size)
+            exhausted = not more
+            buffer, position = buffer[position:] + more, 0
+            continue
+        yield value
+        position = end
+
+
+def parse_timezone_feed(path: Path) -> Dict[str, TimezoneEntry]:
+    """Stream the feed into a deduplicated code → (timezone, country code) table.
+
+    The feed repeats many codes; the first entry carrying a timezone wins.
+    """
+    table: Dict[str, TimezoneEntry] = {}
+    with path.open("r", encoding="utf-8") as handle:
+        for entry in iter_json_array(handle):
+            if not isinstance(entry, dict):
+                continue
+            code = (entry.get("code") or "").strip().upper()
+            if not code or code in table:
+                continue
+            tz = (entry.get("timezone") or "").strip()
+            if tz:
+                table[code] = TimezoneEntry(
+                    sys.intern(tz), sys.intern((entry.get("countryCode") or "").strip())
+                )
+    return table
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path_for(path: Path) -> Path:
+    return CACHE_DIR / f"{path.stem}.pickle"
+
+
+def _load_cached_feed(path: Path) -> Mapping[str, TimezoneEntry]:
+    return MappingProxyType(load_feed_sidecar(path))
+
+
+def load_feed_sidecar(path: Path) -> Dict[str, TimezoneEntry]:
+    """Parse the feed, or reuse the pickled sidecar if the source hash matches.
+
+    The parsed table is pickled next to the data (``data/.cache``) together
+    with the SHA-256 of the source file.
+    """
+    digest = file_digest(path)
+    cache_path = cache_path_for(path)
+    if cache_path.exists():
+        try:
+            with cache_path.open("rb") as handle:
+                cached = pickle.load(handle)
+            if cached.get("version") == CACHE_FORMAT_VERSION and cached.get("source_sha256") == digest:
+                return {code: TimezoneEntry(*entry) for code, entry in cached["table"].items()}
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+            pass
+
+    table = parse_timezone_feed(path)
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "source_sha256": digest,
+        "table": {code: tuple(entry) for code, entry in table.items()},
+    }
+    write_cache(cache_path, payload)
+    return table
+
+
+def write_cache(cache_path: Path, payload: dict) -> None:
+    """Atomically pickle ``payload``; a read-only checkout just recomputes next time."""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with temp_path.open("wb") as handle:
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        pass
+
+
+def load_timezone_feed(path: Path = AIRPORT_TIMEZONES_JSON) -> Mapping[str, TimezoneEntry]:
+    """Deduplicated code → (timezone, country code) table for the timezone feed.
+
+    Memoised in-process per file version, and across runs via the sidecar.
+    """
+    return FILE_CACHE.get(path, _load_cached_feed)
+
+
+def _parse_overrides(path: Path) -> Mapping[str, TimezoneEntry]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON in {path}: {exc}") from exc
+
+    overrides: Dict[str, TimezoneEntry] = {}
+    for code, value in data.items():
+        code = (code or "").strip().upper()
+        if not code:
+            continue
+        if isinstance(value, dict):
+            tz = (value.get("timezone") or "").strip()
+            country = (value.get("countryCode") or "").strip()
+        else:
+            tz = (value or "").strip()
+            country = ""
+        if tz:
+            overrides[code] = TimezoneEntry(tz, country)
+    return MappingProxyType(overrides)
+
+
+def load_timezone_overrides(path: Path = TIMEZONE_OVERRIDES_PATH) -> Mapping[str, TimezoneEntry]:
+    """Manual timezone fixes keyed by IATA code; ``country_code`` may be empty."""
+    if not path.exists():
+        return MappingProxyType({})
+    return FILE_CACHE.get(path, _parse_overrides)
+
+
+ZoneState = Tuple[timedelta, Optional[timedelta], Optional[str]]
+
+
+def zone_transitions(
+    name: str,
+    start_year: int = TRANSITION_START_YEAR,
+    end_year: int = TRANSITION_END_YEAR,
+) -> List[Transition]:
+    """UTC offset changes of IANA zone ``name`` from 1 January ``start_year`` to the end of ``end_year`` (UTC).
+
+    The first entry is the state in force at the start of the range. zoneinfo
+    does not expose its transition list, so changes are found by sampling the
+    offset every ``TRANSITION_SCAN_STEP`` seconds and bisecting each change
+    down to the second.
+    """
+    zone = ZoneInfo(name)
+    fromtimestamp = datetime.fromtimestamp
+
+    def state(timestamp: int) -> ZoneState:
+        local = fromtimestamp(timestamp, zone)
+        return local.utcoffset(), local.dst(), local.tzname()
+
+    def offset(timestamp: int) -> timedelta:
+        return fromtimestamp(timestamp, zone).utcoffset()
+
+    def first_change(low: int, high: int, probe: Callable[[int], object], value: object) -> int:
+        """First second in (low, high] where ``probe`` no longer returns ``value``."""
+        while high - low > 1:
+            middle = (low + high) // 2
+            if probe(middle) == value:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    start = int(datetime(start_year, 1, 1, tzinfo=timezone.utc).timestamp())
+    end = int(datetime(end_year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+    current = state(start)
+    transitions = [_transition(start, current)]
+    # ``confirmed`` is the last time the full state was known to equal ``current``.
+    previous = confirmed = start
+    samples = list(range(start + TRANSITION_SCAN_STEP, end, TRANSITION_SCAN_STEP)) + [end]
+    for count, sample in enumerate(samples, 1):
+        # Hot loop over ~2,500 samples per zone: the offset probe is inlined.
+        if fromtimestamp(sample, zone).utcoffset() != current[0]:
+            change = first_change(previous, sample, offset, current[0])
+        elif count % TRANSITION_CHECK_EVERY == 0 or sample == end:
+            if state(sample) == current:
+                previous = confirmed = sample
+                continue
+            change = first_change(confirmed, sample, state, current)
+        else:
+            previous = sample
+            continue
+        current = state(change)
+        transitions.append(_transition(change, current))
+        previous = confirmed = sample if state(sample) == current else change
+    return transitions
+
+
+def _transition(timestamp: int, state: ZoneState) -> Transition:
+    utc_offset, dst, abbreviation = state
+    return Transition(timestamp, int(utc_offset.total_seconds()), bool(dst), abbreviation or "")
+
+
+def zone_source_digest(name: str) -> Optional[str]:
+    """SHA-256 of the TZif file zoneinfo reads for ``name``, when it comes from ``TZPATH``."""
+    for root in TZPATH:
+        path = Path(root) / name
+        if path.is_file():
+            return file_digest(path)
+    return None
+
+
+def load_zone_transitions(
+    names: Iterable[str],
+    start_year: int = TRANSITION_START_YEAR,
+    end_year: int = TRANSITION_END_YEAR,
+) -> Dict[str, List[Transition]]:
+    """``zone_transitions()`` for each of ``names``, leaving out zones zoneinfo does not know.
+
+    Results are pickled to ``data/.cache`` keyed on the zone, the year range
+    and the SHA-256 of the zone's TZif file, so rebuilding against the same
+    tz database skips the scan. Zones loaded from the ``tzdata`` package
+    instead of ``TZPATH`` are always recomputed.
+    """
+    cached: Dict[Tuple[str, int, int], Tuple[str, List[tuple]]] = {}
+    try:
+        with TRANSITIONS_CACHE.open("rb") as handle:
+            payload = pickle.load(handle)
+        if payload.get("version") == CACHE_FORMAT_VERSION:
+            cached = payload["zones"]
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError, TypeError):
+        pass
+
+    transitions: Dict[str, List[Transition]] = {}
+    changed = False
+    for name in names:
+        key = (name, start_year, end_year)
+        digest = zone_source_digest(name)
+        entry = cached.get(key)
+        if digest and entry and entry[0] == digest:
+            transitions[name] = [Transition(*transition) for transition in entry[1]]
+            continue
+        try:
+            transitions[name] = zone_transitions(name, start_year, end_year)
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+        if digest:
+            cached[key] = (digest, [tuple(transition) for transition in transitions[name]])
+            changed = True
+    if changed:
+        write_cache(TRANSITIONS_CACHE, {"version": CACHE_FORMAT_VERSION, "zones": cached})
+    return transitions
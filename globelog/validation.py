@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from globelog.pipeline import script
+from globelog.profiling import PhaseTimer
+
+
+class ValidationResult(NamedTuple):
+    """Structured outcome of one validator.
+
+    Holds the headline counts, the full finding lists (the prose reports
+    truncate some of them), per-phase durations and the number of input rows
+    examined. ``profile`` is only filled in when the check ran with profiling.
+    ``phases`` and ``profile`` are ``None`` unless the result was built by
+    ``timed()``, e.g. when a check failed before timing anything.
+    """
+
+    name: str
+    ok: bool
+    counts: Dict[str, int]
+    findings: Dict[str, List[str]]
+    error: str = ""
+    seconds: float = 0.0
+    rows: int = 0
+    phases: Optional[Dict[str, float]] = None
+    profile: Optional[Dict[str, object]] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @classmethod
+    def timed(cls, timer: PhaseTimer, *args, **kwargs) -> "ValidationResult":
+        """Build a result carrying the phase durations and profile gathered by ``timer``."""
+        return cls(
+            *args,
+            seconds=timer.total,
+            phases=dict(timer.durations),
+            profile=timer.profile_report(),
+            **kwargs,
+        )
+
+    def to_dict(self) -> dict:
+        result = self._asdict()
+        result["phases"] = self.phases or {}
+        result["profile"] = self.profile or {}
+        result["rows_per_second"] = self.rows_per_second
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+
+# (script module, check function, pool). Flag scanning and SQLite reads are
+# I/O-bound and run on threads; the CSV/feed comparisons are CPU-bound and
+# get their own processes.
+VALIDATORS: Tuple[Tuple[str, str, str], ...] = (
+    ("validate_flags", "check_flags", "thread"),
+    ("verify_sqlite", "check_database", "thread"),
+    ("validate_datasets", "check_datasets", "process"),
+    ("verify_timezones", "check_timezones", "process"),
+)
+
+
+def run_check(module: str, function: str, profile: bool = False) -> ValidationResult:
+    """Run one validator, turning precondition failures into a failed result."""
+    start = time.perf_counter()
+    try:
+        result = getattr(script(module), function)(profile=profile)
+    except Exception as exc:  # noqa: BLE001 - reported in the combined report
+        return ValidationResult(module, False, {}, {}, error=str(exc), seconds=time.perf_counter() - start)
+    # Prefer the check's own phase total so rows/sec excludes import time.
+    return result._replace(seconds=result.seconds or time.perf_counter() - start)
+
+
+class ValidationReport(NamedTuple):
+    results: List[ValidationResult]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    @property
+    def exit_code(self) -> int:
+        return 0 if self.ok else 1
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "exit_code": self.exit_code,
+            "seconds": self.seconds,
+            "results": [result.to_dict() for result in self.results],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+
+def validate_all(
+    validators: Sequence[Tuple[str, str, str]] = VALIDATORS,
+    threads: int = 2,
+    processes: int | None = None,
+    profile: bool = False,
+) -> ValidationReport:
+    """Run every validator concurrently and collect their results in declaration order."""
+    start = time.perf_counter()
+    # Spawn rather than fork: the thread pool may hold locks (imports, the file
+    # cache) at the moment a forked child would copy them.
+    with ThreadPoolExecutor(max_workers=threads) as thread_pool, ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    ) as process_pool:
+        futures: List[Future] = [
+            (thread_pool if kind == "thread" else process_pool).submit(run_check, module, function, profile)
+            for module, function, kind in validators
+        ]
+        results = [future.result() for future in futures]
+    return ValidationReport(results, time.perf_counter() - start)
+
+
+def print_report(report: ValidationReport, limit: int = 10) -> None:
+    for result in report.results:
+        status = "ok" if result.ok else "FAILED"
+        counts = ", ".join(f"{key}={value}" for key, value in result.counts.items())
+        rate = f", {result.rows_per_second:,.0f} rows/s" if result.rows else ""
+        print(f"{result.name}: {status} ({result.seconds:.2f} s{rate}){' – ' + counts if counts else ''}")
+        if result.error:
+            print(f"  error: {result.error}")
+        for key, values in result.findings.items():
+            if not values:
+                continue
+            shown = ", ".join(values[:limit])
+            more = f" … (+{len(values) - limit} more)" if len(values) > limit else ""
+            print(f"  {key} ({len(values)}): {shown}{more}")
+        if result.profile:
+            print_profile(result, indent="  ")
+    print(f"{'All validators passed' if report.ok else 'Validation failed'} in {report.seconds:.2f} s.")
+
+
+def print_profile(result: ValidationResult, indent: str = "") -> None:
+    """Print phase durations, peak traced memory per phase and the top hotspots."""
+    peaks = result.profile.get("peak_memory_bytes", {}) if result.profile else {}
+    print(f"{indent}Phases:")
+    for phase, seconds in (result.phases or {}).items():
+        peak = f", peak {peaks[phase] / (1 << 20):.1f} MiB" if phase in peaks else ""
+        print(f"{indent}  {phase:<12} {seconds:8.3f} s{peak}")
+    if result.rows:
+        print(f"{indent}  {result.rows} rows, {result.rows_per_second:,.0f} rows/s")
+    hotspots = result.profile.get("hotspots", []) if result.profile else []
+    if hotspots:
+        print(f"{indent}Hotspots (cumulative):")
+        for line in hotspots:
+            print(f"{indent}  {line}")
+
+
+def run_validator(
+    description: str,
+    check: Callable[..., ValidationResult],
+    report: Callable[[ValidationResult], None],
+    argv: Optional[List[str]] = None,
+) -> int:
+    """Shared command line for the validator scripts.
+
+    By default prints the script's prose ``report``; ``--json`` writes the
+    full structured result and ``--profile`` adds phase timings, peak memory
+    and hotspots. Either way the exit code is 1 when the check failed.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--json", metavar="PATH", help="also write the result as JSON ('-' prints only JSON)")
+    parser.add_argument(
+        "--profile", action="store_true", help="run the hot phases under cProfile/tracemalloc and report hotspots"
+    )
+    args = parser.parse_args(argv)
+
+    result = check(profile=args.profile)
+    if args.json == "-":
+        print(result.to_json())
+        return 0 if result.ok else 1
+
+    report(result)
+    if args.profile:
+        print_profile(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            handle.write(result.to_json())
+    return 0 if result.ok else 1
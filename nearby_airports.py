@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import List, NamedTuple, Tuple
+
+from globelog.db import GlobeLogDB
+
+
+ROOT = Path(__file__).parent
+DATA_DIR = ROOT / "data"
+DB_PATH = DATA_DIR / "globelog.sqlite"
+
+EARTH_RADIUS_KM = 6371.0088
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+INITIAL_SEARCH_RADIUS_KM = 100.0
+
+Box = Tuple[float, float, float, float]
+
+
+class NearbyAirport(NamedTuple):
+    iata: str
+    name: str
+    country_code: str
+    latitude: float
+    longitude: float
+    distance_km: float
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_boxes(lat: float, lon: float, km: float) -> List[Box]:
+    """Return (min_lat, max_lat, min_lon, max_lon) boxes covering a radius.
+
+    The box is split in two when it crosses the antimeridian, and widened to
+    every longitude when the circle reaches a pole.
+    """
+    angular = km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    min_lat = lat - dlat
+    max_lat = lat + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0 or angular >= math.pi / 2:
+        return [(max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0)]
+
+    dlon = math.degrees(math.asin(min(1.0, math.sin(angular) / math.cos(math.radians(lat)))))
+    min_lon = lon - dlon
+    max_lon = lon + dlon
+    if min_lon < -180.0:
+        return [(min_lat, max_lat, min_lon + 360.0, 180.0), (min_lat, max_lat, -180.0, max_lon)]
+    if max_lon > 180.0:
+        return [(min_lat, max_lat, min_lon, 180.0), (min_lat, max_lat, -180.0, max_lon - 360.0)]
+    return [(min_lat, max_lat, min_lon, max_lon)]
+
+
+@lru_cache(maxsize=None)
+def _database(path: Path) -> GlobeLogDB:
+    return GlobeLogDB(path)
+
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    """This thread's read-only connection to the database, shared through ``GlobeLogDB``."""
+    return _database(path).connection()
+
+
+def _box_count(conn: sqlite3.Connection, lat: float, lon: float, km: float) -> int:
+    total = 0
+    for min_lat, max_lat, min_lon, max_lon in bounding_boxes(lat, lon, km):
+        (count,) = conn.execute(
+            """
+            SELECT count(*) FROM airport_geo
+            WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?
+            """,
+            (min_lat, max_lat, min_lon, max_lon),
+        ).fetchone()
+        total += count
+    return total
+
+
+def _box_candidates(
+    conn: sqlite3.Connection, lat: float, lon: float, km: float
+) -> List[NearbyAirport]:
+    """Every airport inside the bounding boxes of a radius, with distances."""
+    candidates: List[NearbyAirport] = []
+    for min_lat, max_lat, min_lon, max_lon in bounding_boxes(lat, lon, km):
+        rows = conn.execute(
+            """
+            SELECT a.iata, a.name, a.country_code, a.latitude, a.longitude
+            FROM airport_geo AS g
+            JOIN airport AS a ON a.rowid = g.id
+            WHERE g.max_lat >= ? AND g.min_lat <= ?
+              AND g.max_lon >= ? AND g.min_lon <= ?
+            """,
+            (min_lat, max_lat, min_lon, max_lon),
+        )
+        for iata, name, country_code, a_lat, a_lon in rows:
+            distance = haversine_km(lat, lon, a_lat, a_lon)
+            candidates.append(NearbyAirport(iata, name, country_code, a_lat, a_lon, distance))
+    return candidates
+
+
+def within_radius(
+    lat: float,
+    lon: float,
+    km: float,
+    conn: sqlite3.Connection | None = None,
+) -> List[NearbyAirport]:
+    """Airports within ``km`` of a point, closest first.
+
+    Candidates come from the ``airport_geo`` R*Tree; exact great-circle
+    distance is only computed for airports inside the bounding box.
+    """
+    conn = conn or connect()
+    results = [airport for airport in _box_candidates(conn, lat, lon, km) if airport.distance_km <= km]
+    results.sort(key=lambda airport: (airport.distance_km, airport.iata))
+    return results
+
+
+def nearest(
+    lat: float,
+    lon: float,
+    k: int = 1,
+    conn: sqlite3.Connection | None = None,
+) -> List[NearbyAirport]:
+    """The ``k`` airports closest to a point, closest first.
+
+    Grows a bounding box (counting R*Tree entries only) until it holds at
+    least ``k`` airports. The k-th closest of those bounds the answer, so only
+    a radius search of that size is needed, and none at all when the bound
+    fits inside the box.
+    """
+    if k <= 0:
+        return []
+    conn = conn or connect()
+    radius = INITIAL_SEARCH_RADIUS_KM
+    while radius < HALF_CIRCUMFERENCE_KM and _box_count(conn, lat, lon, radius) < k:
+        radius = min(radius * 2, HALF_CIRCUMFERENCE_KM)
+
+    candidates = _box_candidates(conn, lat, lon, radius)
+    candidates.sort(key=lambda airport: (airport.distance_km, airport.iata))
+    if len(candidates) < k:
+        return candidates
+    bound = candidates[k - 1].distance_km
+    if bound > radius:
+        return within_radius(lat, lon, bound, conn)[:k]
+    return candidates[:k]
+
+
+def main() -> None:
+    if len(sys.argv) < 3:
+        print("Usage: python nearby_airports.py LAT LON [K]")
+        sys.exit(1)
+    lat, lon = float(sys.argv[1]), float(sys.argv[2])
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    for airport in nearest(lat, lon, k):
+        print(
+            f"  {airport.iata:>3} | {airport.name} | {airport.country_code} | "
+            f"{airport.distance_km:.1f} km"
+        )
+
+
+if __name__ == "__main__":
+    main()
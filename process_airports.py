@@ -1,18 +1,23 @@
 from __future__ import annotations
 
 import csv
-import json
+import heapq
+import tempfile
 from collections import Counter
+from itertools import chain, islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from globelog.timezones import load_timezone_feed, load_timezone_overrides
 
 DATA_DIR = Path(__file__).parent / "data"
 INPUT_AIRPORTS_CSV = DATA_DIR / "airports.csv"
 OUTPUT_CURATED_AIRPORTS_CSV = DATA_DIR / "curated_airports.csv"
 AIRPORT_TIMEZONES_JSON = DATA_DIR / "airport-timezones.json"
-TIMEZONE_OVERRIDES_PATH = DATA_DIR / "corrections" / "timezone_overrides.json"
 
 ALLOWED_TYPES = {"medium_airport", "large_airport"}
+# Kept rows sorted in memory before spilling sorted runs to disk.
+SORT_RUN_SIZE = 200_000
 OUTPUT_FIELDNAMES = [
     "iata",
     "name",
@@ -26,29 +31,7 @@ OUTPUT_FIELDNAMES = [
     "gps_code",
 ]
 
-def load_timezone_overrides() -> Dict[str, str]:
-    if not TIMEZONE_OVERRIDES_PATH.exists():
-        return {}
-    try:
-        data = json.loads(TIMEZONE_OVERRIDES_PATH.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
-        raise ValueError(f"Invalid JSON in {TIMEZONE_OVERRIDES_PATH}: {exc}") from exc
-
-    overrides: Dict[str, str] = {}
-    for code, value in data.items():
-        code = (code or "").strip().upper()
-        if not code:
-            continue
-        if isinstance(value, dict):
-            tz = (value.get("timezone") or "").strip()
-        else:
-            tz = (value or "").strip()
-        if tz:
-            overrides[code] = tz
-    return overrides
-
-
-def load_airports(path: Path) -> Iterable[Dict[str, str]]:
+def load_airports(path: Path) -> Iterator[Dict[str, str]]:
     with path.open(mode="r", newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -57,123 +40,187 @@ def load_airports(path: Path) -> Iterable[Dict[str, str]]:
 
 def load_timezones(path: Path) -> Dict[str, str]:
     timezones: Dict[str, str] = {}
-    if not path.exists():
-        return load_timezone_overrides()
-
-    data = json.loads(path.read_text(encoding="utf-8"))
-    for entry in data:
-        code = (entry.get("code") or "").strip().upper()
-        if not code or code in timezones:
-            continue
-        tz = (entry.get("timezone") or "").strip()
-        if tz:
-            timezones[code] = tz
+    if path.exists():
+        timezones = {code: entry.timezone for code, entry in load_timezone_feed(path).items()}
 
     # Apply overrides last so they win
-    timezones.update(load_timezone_overrides())
+    timezones.update((code, entry.timezone) for code, entry in load_timezone_overrides().items())
     return timezones
 
 
+class CurationStats:
+    """Counts accumulated while rows stream through the curation stages."""
+
+    __slots__ = (
+        "read",
+        "kept",
+        "type_counts",
+        "country_counts",
+        "missing_iata",
+        "missing_timezone",
+        "missing_municipality",
+    )
+
+    def __init__(self) -> None:
+        self.read = 0
+        self.kept = 0
+        self.type_counts: Counter = Counter()
+        self.country_counts: Counter = Counter()
+        self.missing_iata = 0
+        self.missing_timezone = 0
+        self.missing_municipality = 0
+
+
 def filter_airports(
     rows: Iterable[Dict[str, str]],
     timezones: Dict[str, str],
-) -> Tuple[List[Dict[str, str]], Counter, int, int, int]:
-    filtered: List[Dict[str, str]] = []
-    type_counts: Counter = Counter()
-    missing_iata = 0
-    missing_timezone = 0
-    missing_municipality = 0
+    stats: CurationStats,
+) -> Iterator[Tuple[str, ...]]:
+    """Yield kept airports as compact tuples in ``OUTPUT_FIELDNAMES`` order.
 
+    Raw rows are dropped as soon as they are inspected, so memory stays flat
+    regardless of the size of the source dump.
+    """
     for row in rows:
+        stats.read += 1
         airport_type = row.get("type", "").strip()
         if airport_type not in ALLOWED_TYPES:
             continue
 
         iata_code = row.get("iata_code", "").strip()
         if not iata_code:
-            missing_iata += 1
+            stats.missing_iata += 1
             continue
 
         municipality = (row.get("municipality") or "").strip()
         if not municipality:
-            missing_municipality += 1
+            stats.missing_municipality += 1
 
         timezone = timezones.get(iata_code, "")
         if not timezone:
-            missing_timezone += 1
-
-        type_counts[airport_type] += 1
-        filtered.append(
-            {
-                "iata": iata_code,
-                "name": row.get("name", "").strip(),
-                "latitude_deg": row.get("latitude_deg", "").strip(),
-                "longitude_deg": row.get("longitude_deg", "").strip(),
-                "continent": row.get("continent", "").strip(),
-                "iso_country": row.get("iso_country", "").strip(),
-                "municipality": municipality,
-                "timezone": timezone,
-                "icao_code": row.get("icao_code", "").strip(),
-                "gps_code": row.get("gps_code", "").strip(),
-            }
+            stats.missing_timezone += 1
+
+        iso_country = row.get("iso_country", "").strip()
+        stats.kept += 1
+        stats.type_counts[airport_type] += 1
+        stats.country_counts[iso_country] += 1
+        yield (
+            iata_code,
+            row.get("name", "").strip(),
+            row.get("latitude_deg", "").strip(),
+            row.get("longitude_deg", "").strip(),
+            row.get("continent", "").strip(),
+            iso_country,
+            municipality,
+            timezone,
+            row.get("icao_code", "").strip(),
+            row.get("gps_code", "").strip(),
         )
 
-    filtered.sort(key=lambda airport: (airport["iata"], airport["name"]))
-    return filtered, type_counts, missing_iata, missing_timezone, missing_municipality
+
+def _sort_key(airport: Tuple[str, ...]) -> Tuple[str, str]:
+    return airport[0], airport[1]
+
+
+def _write_run(rows: List[Tuple[str, ...]]) -> Path:
+    handle = tempfile.NamedTemporaryFile(
+        mode="w", newline="", encoding="utf-8", suffix=".csv", delete=False
+    )
+    with handle:
+        csv.writer(handle).writerows(rows)
+    return Path(handle.name)
 
 
-def write_curated_airports(path: Path, airports: List[Dict[str, str]]) -> None:
+def _read_run(path: Path) -> Iterator[Tuple[str, ...]]:
+    try:
+        with path.open(mode="r", newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                yield tuple(row)
+    finally:
+        path.unlink()
+
+
+def sort_airports(
+    rows: Iterable[Tuple[str, ...]], run_size: int = SORT_RUN_SIZE
+) -> Iterator[Tuple[str, ...]]:
+    """Sort kept airports by (iata, name).
+
+    Small feeds are sorted in memory. Once more than ``run_size`` rows are
+    kept, sorted runs are spilled to temporary files and merged, so memory is
+    bounded by the run size rather than the feed.
+    """
+    runs: List[Path] = []
+    buffer: List[Tuple[str, ...]] = []
+    try:
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= run_size:
+                buffer.sort(key=_sort_key)
+                runs.append(_write_run(buffer))
+                buffer = []
+        buffer.sort(key=_sort_key)
+    except BaseException:
+        for run in runs:
+            run.unlink()
+        raise
+
+    if not runs:
+        yield from buffer
+        return
+    yield from heapq.merge(*(_read_run(run) for run in runs), buffer, key=_sort_key)
+
+
+def write_curated_airports(path: Path, airports: Iterable[Tuple[str, ...]]) -> None:
     with path.open(mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDNAMES)
-        writer.writeheader()
+        writer = csv.writer(f)
+        writer.writerow(OUTPUT_FIELDNAMES)
         writer.writerows(airports)
 
 
-def summarize(
-    airports: List[Dict[str, str]],
-    type_counts: Counter,
-    missing_iata: int,
-    missing_timezone: int,
-    missing_municipality: int,
-) -> str:
+def summarize(stats: CurationStats) -> str:
     """Create a human-friendly summary of the curated airports."""
-    countries = Counter(airport["iso_country"] for airport in airports)
     top_countries = ", ".join(
-        f"{country}:{count}" for country, count in countries.most_common(5)
+        f"{country}:{count}" for country, count in stats.country_counts.most_common(5)
     ) or "n/a"
-    medium_count = type_counts.get("medium_airport", 0)
-    large_count = type_counts.get("large_airport", 0)
+    medium_count = stats.type_counts.get("medium_airport", 0)
+    large_count = stats.type_counts.get("large_airport", 0)
     return (
-        f"Kept {len(airports)} airports (medium: {medium_count}, large: {large_count}). "
-        f"Skipped {missing_iata} medium/large airports without IATA codes. "
-        f"Missing timezones for {missing_timezone} airports. "
-        f"Missing municipalities for {missing_municipality} airports. "
+        f"Kept {stats.kept} airports (medium: {medium_count}, large: {large_count}). "
+        f"Skipped {stats.missing_iata} medium/large airports without IATA codes. "
+        f"Missing timezones for {stats.missing_timezone} airports. "
+        f"Missing municipalities for {stats.missing_municipality} airports. "
         f"Top countries by count: {top_countries}."
     )
 
 
+def curate_airports(
+    input_path: Path, output_path: Path, timezones: Dict[str, str]
+) -> Tuple[CurationStats, List[Tuple[str, ...]]]:
+    """Stream ``input_path`` through filter → sort → write; return stats and the first rows."""
+    stats = CurationStats()
+    airports = sort_airports(filter_airports(load_airports(input_path), timezones, stats))
+    sample = list(islice(airports, 5))
+    write_curated_airports(output_path, chain(sample, airports))
+    return stats, sample
+
+
 def main() -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    all_rows = list(load_airports(INPUT_AIRPORTS_CSV))
     timezones = load_timezones(AIRPORT_TIMEZONES_JSON)
-    filtered, type_counts, missing_iata, missing_timezone, missing_municipality = filter_airports(
-        all_rows, timezones
-    )
-    write_curated_airports(OUTPUT_CURATED_AIRPORTS_CSV, filtered)
+    stats, sample = curate_airports(INPUT_AIRPORTS_CSV, OUTPUT_CURATED_AIRPORTS_CSV, timezones)
 
     print(
-        f"Read {len(all_rows)} airports from {INPUT_AIRPORTS_CSV.name}. "
-        f"Wrote {len(filtered)} → {OUTPUT_CURATED_AIRPORTS_CSV.name}."
+        f"Read {stats.read} airports from {INPUT_AIRPORTS_CSV.name}. "
+        f"Wrote {stats.kept} → {OUTPUT_CURATED_AIRPORTS_CSV.name}."
     )
-    if filtered:
-        print(summarize(filtered, type_counts, missing_iata, missing_timezone, missing_municipality))
-        sample = filtered[:5]
+    if stats.kept:
+        print(summarize(stats))
         print("Sample (first 5):")
-        for airport in sample:
+        for iata, name, latitude, longitude, continent, iso_country, *_ in sample:
             print(
-                f"  {airport['iata']:>3} | {airport['name']} | {airport['iso_country']} | "
-                f"{airport['continent']} | {airport['latitude_deg']}, {airport['longitude_deg']}"
+                f"  {iata:>3} | {name} | {iso_country} | "
+                f"{continent} | {latitude}, {longitude}"
             )
 
 
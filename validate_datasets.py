@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-import csv
 import sys
 from collections import Counter
 from pathlib import Path
 from typing import Dict, Set
 
+from globelog import data
+from globelog.profiling import PhaseTimer
+from globelog.validation import ValidationResult, run_validator
+
 
 DATA_DIR = Path(__file__).parent / "data"
 CURATED_COUNTRIES = DATA_DIR / "curated_countries.csv"
@@ -13,49 +16,68 @@ CURATED_AIRPORTS = DATA_DIR / "curated_airports.csv"
 
 
 def load_countries(path: Path) -> Dict[str, str]:
-    countries: Dict[str, str] = {}
-    with path.open(mode="r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            code = row.get("code", "").strip()
-            if not code:
-                continue
-            countries[code] = row.get("name", "").strip() or code
-    return countries
+    return {code: country.name or code for code, country in data.load_countries(path).items()}
 
 
 def load_airport_countries(path: Path) -> Counter:
-    counts: Counter = Counter()
-    with path.open(mode="r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            code = row.get("iso_country", "").strip()
-            if code:
-                counts[code] += 1
-    return counts
+    return Counter(airport.iso_country for airport in data.load_airports(path).values() if airport.iso_country)
 
 
-def validate() -> int:
+def check_datasets(profile: bool = False) -> ValidationResult:
     if not CURATED_COUNTRIES.exists():
-        print(f"Missing {CURATED_COUNTRIES.name}. Run process_countries.py first.")
-        return 1
+        return ValidationResult(
+            "validate_datasets", False, {}, {}, f"Missing {CURATED_COUNTRIES.name}. Run process_countries.py first."
+        )
     if not CURATED_AIRPORTS.exists():
-        print(f"Missing {CURATED_AIRPORTS.name}. Run process_airports.py first.")
-        return 1
+        return ValidationResult(
+            "validate_datasets", False, {}, {}, f"Missing {CURATED_AIRPORTS.name}. Run process_airports.py first."
+        )
+
+    timer = PhaseTimer(profile)
+    with timer.phase("load"):
+        countries = load_countries(CURATED_COUNTRIES)
+        airport_country_counts = load_airport_countries(CURATED_AIRPORTS)
+
+    with timer.phase("compare"):
+        country_codes: Set[str] = set(countries)
+        airport_codes: Set[str] = set(airport_country_counts)
+
+        missing_in_countries = sorted(airport_codes - country_codes)
+        countries_without_airports = sorted(country_codes - airport_codes)
+
+    return ValidationResult.timed(
+        timer,
+        "validate_datasets",
+        ok=not missing_in_countries,
+        counts={
+            "countries": len(countries),
+            "airports": sum(airport_country_counts.values()),
+            "countries_without_airports": len(countries_without_airports),
+        },
+        findings={
+            "missing_in_countries": missing_in_countries,
+            "countries_without_airports": countries_without_airports,
+        },
+        rows=len(countries) + sum(airport_country_counts.values()),
+    )
 
-    countries = load_countries(CURATED_COUNTRIES)
-    airport_country_counts = load_airport_countries(CURATED_AIRPORTS)
 
-    country_codes: Set[str] = set(countries)
-    airport_codes: Set[str] = set(airport_country_counts)
+def validate() -> int:
+    result = check_datasets()
+    report(result)
+    return 0 if result.ok else 1
 
-    missing_in_countries = sorted(airport_codes - country_codes)
-    countries_without_airports = sorted(country_codes - airport_codes)
 
-    country_total = len(countries)
-    airport_total = sum(airport_country_counts.values())
+def report(result: ValidationResult) -> None:
+    if result.error:
+        print(result.error)
+        return
 
-    print(f"Loaded {country_total} countries and {airport_total} airports.")
+    countries = load_countries(CURATED_COUNTRIES)
+    missing_in_countries = result.findings["missing_in_countries"]
+    countries_without_airports = result.findings["countries_without_airports"]
+
+    print(f"Loaded {result.counts['countries']} countries and {result.counts['airports']} airports.")
 
     if missing_in_countries:
         print("Countries referenced by airports but missing from curated countries:")
@@ -73,11 +95,9 @@ def validate() -> int:
     else:
         print("Every curated country has at least one curated airport.")
 
-    return 0
-
 
 def main() -> None:
-    sys.exit(validate())
+    sys.exit(run_validator("Cross-check curated countries against curated airports.", check_datasets, report))
 
 
 if __name__ == "__main__":
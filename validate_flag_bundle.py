@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import List
+
+from globelog.data import load_countries
+from globelog.flags import ALIGNMENT, ENTRY, FLAG_BUNDLE_PATH, FLAG_EXTENSIONS, HEADER, FlagEntry, read_index
+from globelog.profiling import PhaseTimer
+from globelog.validation import ValidationResult, run_validator
+
+
+DATA_DIR = Path(__file__).parent / "data"
+CURATED_COUNTRIES = DATA_DIR / "curated_countries.csv"
+FORMATS = {extension[1:] for extension in FLAG_EXTENSIONS}
+
+
+class FlagBundleValidationError(RuntimeError):
+    pass
+
+
+def index_problems(entries: List[FlagEntry], size: int) -> List[str]:
+    """Entries that are out of order, of an unknown format, or point outside or across other assets."""
+    problems = []
+    end = HEADER.size + ENTRY.size * len(entries)
+    previous = ""
+    for entry in entries:
+        if entry.code <= previous:
+            problems.append(f"{entry.code}: index not sorted by code or code repeated")
+        if entry.format not in FORMATS:
+            problems.append(f"{entry.code}: unknown format {entry.format!r}")
+        if entry.offset % ALIGNMENT or entry.offset < end:
+            problems.append(f"{entry.code}: offset {entry.offset} is misaligned or overlaps the previous asset")
+        if entry.offset + entry.length > size:
+            problems.append(f"{entry.code}: {entry.length} bytes at {entry.offset} run past the end of the file")
+        if not entry.length:
+            problems.append(f"{entry.code}: empty asset")
+        previous, end = entry.code, max(end, entry.offset + entry.length)
+    return problems
+
+
+def check_bundle(profile: bool = False) -> ValidationResult:
+    if not CURATED_COUNTRIES.exists():
+        raise FlagBundleValidationError("Missing curated_countries.csv. Run process_countries.py first.")
+    if not FLAG_BUNDLE_PATH.exists():
+        raise FlagBundleValidationError(f"Missing {FLAG_BUNDLE_PATH.name}. Run export_flags.py first.")
+
+    timer = PhaseTimer(profile)
+    with timer.phase("load"):
+        country_codes = set(load_countries(CURATED_COUNTRIES))
+    with timer.phase("index"):
+        try:
+            entries, size = read_index(FLAG_BUNDLE_PATH)
+        except ValueError as exc:
+            raise FlagBundleValidationError(str(exc)) from exc
+    with timer.phase("compare"):
+        bundled = {entry.code for entry in entries}
+        missing = sorted(country_codes - bundled)
+        extra = sorted(bundled - country_codes)
+        problems = index_problems(entries, size)
+
+    return ValidationResult.timed(
+        timer,
+        "validate_flag_bundle",
+        ok=not (missing or problems),
+        counts={"countries": len(country_codes), "flags": len(entries), "bytes": size},
+        findings={"missing": missing, "extra_flags": extra, "index_problems": problems},
+        rows=len(country_codes) + len(entries),
+    )
+
+
+def validate_flag_bundle() -> int:
+    result = check_bundle()
+    report(result)
+    return 0 if result.ok else 1
+
+
+def report(result: ValidationResult) -> None:
+    findings = result.findings
+    print(
+        f"Validated {result.counts['countries']} curated countries against the "
+        f"{result.counts['flags']} flags indexed in {FLAG_BUNDLE_PATH.name}."
+    )
+
+    if findings["missing"]:
+        print(f"Missing {len(findings['missing'])} flags:")
+        for code in findings["missing"]:
+            print(f"  {code}")
+
+    if findings["index_problems"]:
+        print("Corrupt index entries:")
+        for line in findings["index_problems"]:
+            print(f"  {line}")
+
+    if findings["extra_flags"]:
+        print(f"Flags without matching country codes: {', '.join(findings['extra_flags'])}")
+
+    if result.ok:
+        print("Every curated country has a flag in the bundle.")
+
+
+def main() -> None:
+    try:
+        sys.exit(run_validator("Check the flag bundle covers every curated country, from its index alone.", check_bundle, report))
+    except FlagBundleValidationError as exc:
+        print(f"Validation failed: {exc}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
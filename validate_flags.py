@@ -1,16 +1,19 @@
 from __future__ import annotations
 
-import csv
 import sys
 import uuid
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+from globelog.data import load_countries
+from globelog.flags import FLAG_EXTENSIONS
+from globelog.profiling import PhaseTimer
+from globelog.validation import ValidationResult, run_validator
+
 
 DATA_DIR = Path(__file__).parent / "data"
 FLAGS_DIR = Path(__file__).parent / "flags"
 CURATED_COUNTRIES = DATA_DIR / "curated_countries.csv"
-FLAG_EXTENSIONS = {".pdf", ".svg", ".png"}
 
 
 class FlagValidationError(RuntimeError):
@@ -18,9 +21,7 @@ class FlagValidationError(RuntimeError):
 
 
 def load_country_codes(path: Path) -> Set[str]:
-    with path.open(mode="r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        return {row.get("code", "").strip() for row in reader if row.get("code", "").strip()}
+    return set(load_countries(path))
 
 
 def index_flag_files(directory: Path) -> Tuple[Dict[str, Path], Dict[str, List[Path]]]:
@@ -57,7 +58,7 @@ def rename_with_case(source: Path, code: str) -> bool:
         return True
 
 
-def validate_flags() -> int:
+def check_flags(profile: bool = False) -> ValidationResult:
     if not CURATED_COUNTRIES.exists():
         raise FlagValidationError(
             "Missing curated_countries.csv. Run process_countries.py first."
@@ -65,72 +66,94 @@ def validate_flags() -> int:
     if not FLAGS_DIR.exists():
         raise FlagValidationError(f"Missing flags directory: {FLAGS_DIR}")
 
-    country_codes = load_country_codes(CURATED_COUNTRIES)
+    timer = PhaseTimer(profile)
+    with timer.phase("load"):
+        country_codes = load_country_codes(CURATED_COUNTRIES)
     if not country_codes:
         raise FlagValidationError("No country codes found in curated_countries.csv")
 
-    flag_index, duplicate_files = index_flag_files(FLAGS_DIR)
+    with timer.phase("scan"):
+        flag_index, duplicate_files = index_flag_files(FLAGS_DIR)
 
-    renamed_count = 0
+    renamed: List[str] = []
     missing: List[str] = []
     failed: List[str] = []
 
-    for code in sorted(country_codes):
-        path = flag_index.get(code)
-        if path is None:
-            missing.append(code)
-            continue
+    with timer.phase("normalise"):
+        for code in sorted(country_codes):
+            path = flag_index.get(code)
+            if path is None:
+                missing.append(code)
+                continue
+
+            if path.stem != code:
+                if rename_with_case(path, code):
+                    renamed.append(code)
+                    # Update index with new path reference
+                    new_path = path.with_name(f"{code}{path.suffix.lower()}")
+                    flag_index[code] = new_path
+                else:
+                    failed.append(code)
+
+        extra_flags = sorted(set(flag_index.keys()) - country_codes)
+
+    return ValidationResult.timed(
+        timer,
+        "validate_flags",
+        ok=not (missing or failed or duplicate_files),
+        counts={"countries": len(country_codes), "flags": len(flag_index), "renamed": len(renamed)},
+        findings={
+            "renamed": renamed,
+            "missing": missing,
+            "failed": sorted(set(failed)),
+            "duplicates": [
+                f"{code}: {', '.join(str(p) for p in paths)}" for code, paths in sorted(duplicate_files.items())
+            ],
+            "extra_flags": extra_flags,
+        },
+        rows=len(country_codes) + len(flag_index),
+    )
 
-        if path.stem != code:
-            if rename_with_case(path, code):
-                renamed_count += 1
-                # Update index with new path reference
-                new_path = path.with_name(f"{code}{path.suffix.lower()}")
-                flag_index[code] = new_path
-            else:
-                failed.append(code)
 
-    extra_flags = sorted(set(flag_index.keys()) - country_codes)
+def validate_flags() -> int:
+    result = check_flags()
+    report(result)
+    return 0 if result.ok else 1
 
-    total_countries = len(country_codes)
-    print(f"Validated {total_countries} curated countries against flag assets.")
 
-    if renamed_count:
-        print(f"Renamed {renamed_count} flag files to uppercase ISO codes.")
+def report(result: ValidationResult) -> None:
+    findings = result.findings
+
+    print(f"Validated {result.counts['countries']} curated countries against flag assets.")
+
+    if findings["renamed"]:
+        print(f"Renamed {len(findings['renamed'])} flag files to uppercase ISO codes.")
     else:
         print("All matching flag files already used uppercase ISO codes.")
 
-    success = True
-    if missing:
-        success = False
-        print(f"Missing {len(missing)} flags:")
-        for code in missing:
+    if findings["missing"]:
+        print(f"Missing {len(findings['missing'])} flags:")
+        for code in findings["missing"]:
             print(f"  {code}")
 
-    if failed:
-        success = False
-        print("Failed to normalize filenames for codes: " + ", ".join(sorted(set(failed))))
+    if findings["failed"]:
+        print("Failed to normalize filenames for codes: " + ", ".join(findings["failed"]))
 
-    if duplicate_files:
-        success = False
+    if findings["duplicates"]:
         print("Duplicate flag files detected:")
-        for code, paths in sorted(duplicate_files.items()):
-            formatted = ", ".join(str(p) for p in paths)
-            print(f"  {code}: {formatted}")
+        for line in findings["duplicates"]:
+            print(f"  {line}")
 
-    if extra_flags:
-        print(f"Flags without matching country codes: {', '.join(extra_flags)}")
+    if findings["extra_flags"]:
+        print(f"Flags without matching country codes: {', '.join(findings['extra_flags'])}")
 
-    if success:
+    if result.ok:
         print("Every curated country has a flag asset in the flags directory.")
-        return 0
-
-    return 1
 
 
 def main() -> None:
     try:
-        sys.exit(validate_flags())
+        sys.exit(run_validator("Check every curated country has a flag asset.", check_flags, report))
     except FlagValidationError as exc:
         print(f"Validation failed: {exc}")
         sys.exit(1)
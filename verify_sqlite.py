@@ -1,12 +1,16 @@
 from __future__ import annotations
 
-import csv
 import random
 import sqlite3
+import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import List, Mapping
 import re
 
+from globelog.data import Airport, Country, load_airports, load_countries
+from globelog.profiling import PhaseTimer
+from globelog.validation import ValidationResult, run_validator
+
 
 ROOT = Path(__file__).parent
 DATA_DIR = ROOT / "data"
@@ -15,38 +19,34 @@ CURATED_COUNTRIES = DATA_DIR / "curated_countries.csv"
 DB_PATH = DATA_DIR / "globelog.sqlite"
 
 
-def load_curated_airports() -> Dict[str, Dict[str, str]]:
-    with CURATED_AIRPORTS.open("r", newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        return {row["iata"]: row for row in reader}
+def load_curated_airports() -> Mapping[str, Airport]:
+    return load_airports(CURATED_AIRPORTS)
 
 
-def load_curated_countries() -> Dict[str, Dict[str, str]]:
-    with CURATED_COUNTRIES.open("r", newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        return {row["code"]: row for row in reader}
+def load_curated_countries() -> Mapping[str, Country]:
+    return load_countries(CURATED_COUNTRIES)
 
 
-def verify_database() -> None:
+def check_database(profile: bool = False) -> ValidationResult:
     if not DB_PATH.exists():
         raise FileNotFoundError("Database not found. Run build_sqlite.py first.")
 
-    airports_csv = load_curated_airports()
-    countries_csv = load_curated_countries()
+    timer = PhaseTimer(profile)
+    with timer.phase("load_csv"):
+        airports_csv = load_curated_airports()
+        countries_csv = load_curated_countries()
 
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
 
     cur = conn.cursor()
-    db_airports = {
-        row["iata"]: row for row in cur.execute("SELECT * FROM airport")
-    }
-    db_countries = {
-        row["code"]: row for row in cur.execute("SELECT * FROM country")
-    }
-
-    missing_in_db = sorted(set(airports_csv) - set(db_airports))
-    extra_in_db = sorted(set(db_airports) - set(airports_csv))
+    with timer.phase("read_db"):
+        db_airports = {
+            row["iata"]: row for row in cur.execute("SELECT * FROM airport")
+        }
+        db_countries = {
+            row["code"]: row for row in cur.execute("SELECT * FROM country")
+        }
 
     mismatches: List[str] = []
     fields_to_compare = [
@@ -59,61 +59,123 @@ def verify_database() -> None:
         "gps_code",
     ]
 
-    for iata, csv_row in airports_csv.items():
-        db_row = db_airports.get(iata)
-        if not db_row:
-            continue
-        for field in fields_to_compare:
-            csv_value = (csv_row.get(field) or "").strip()
-            if field == "continent":
-                db_value = db_row["continent_code"]
-            elif field == "iso_country":
-                db_value = db_row["country_code"]
-            elif field == "timezone":
-                db_value = (db_row["timezone"] or "").strip()
-            else:
-                db_value = (db_row[field] or "").strip()
-            if csv_value != db_value:
-                mismatches.append(f"{iata}: {field} mismatch CSV='{csv_value}' DB='{db_value}'")
-
-    missing_countries = sorted(set(countries_csv) - set(db_countries))
-    extra_countries = sorted(set(db_countries) - set(countries_csv))
-
-    print(f"Curated airports CSV rows: {len(airports_csv)}")
-    print(f"Airports in database: {len(db_airports)}")
-    print(f"Missing airports in database: {missing_in_db}")
-    print(f"Extra airports in database: {extra_in_db}")
-    print(f"Mismatched airport fields: {len(mismatches)}")
-    if mismatches:
-        for line in mismatches[:10]:
+    with timer.phase("compare"):
+        missing_in_db = sorted(set(airports_csv) - set(db_airports))
+        extra_in_db = sorted(set(db_airports) - set(airports_csv))
+
+        for iata, csv_row in airports_csv.items():
+            db_row = db_airports.get(iata)
+            if not db_row:
+                continue
+            for field in fields_to_compare:
+                csv_value = getattr(csv_row, field)
+                if field == "continent":
+                    db_value = db_row["continent_code"]
+                elif field == "iso_country":
+                    db_value = db_row["country_code"]
+                elif field == "timezone":
+                    db_value = (db_row["timezone"] or "").strip()
+                else:
+                    db_value = (db_row[field] or "").strip()
+                if csv_value != db_value:
+                    mismatches.append(f"{iata}: {field} mismatch CSV='{csv_value}' DB='{db_value}'")
+
+        missing_countries = sorted(set(countries_csv) - set(db_countries))
+        extra_countries = sorted(set(db_countries) - set(countries_csv))
+
+        # The rollup tables must agree with a fresh count over the curated CSV.
+        csv_counts = {code: 0 for code in countries_csv}
+        for airport in airports_csv.values():
+            csv_counts[airport.iso_country] = csv_counts.get(airport.iso_country, 0) + 1
+        db_counts = {
+            row["country_code"]: row["airport_count"]
+            for row in cur.execute("SELECT country_code, airport_count FROM country_stats")
+        }
+        stats_mismatches = [
+            f"{code}: country_stats airport_count={db_counts.get(code)} CSV={count}"
+            for code, count in sorted(csv_counts.items())
+            if db_counts.get(code) != count
+        ]
+
+    fts_samples: List[str] = []
+    with timer.phase("fts"):
+        sample_terms = random.sample(list(airports_csv.keys()), k=min(5, len(airports_csv)))
+        for iata in sample_terms:
+            airport_name = airports_csv[iata].name
+            match = re.search(r"[A-Za-z0-9]+", airport_name)
+            if not match:
+                continue
+            token = match.group(0)
+            if not token:
+                continue
+            results = list(
+                cur.execute(
+                    "SELECT iata, name FROM airport_search WHERE airport_search MATCH ? LIMIT 3",
+                    (token,),
+                )
+            )
+            formatted = ", ".join(f"{row['iata']}:{row['name']}" for row in results) or "no hits"
+            fts_samples.append(f"'{token}' -> {formatted}")
+
+    conn.close()
+
+    return ValidationResult.timed(
+        timer,
+        "verify_sqlite",
+        ok=not (missing_in_db or extra_in_db or mismatches or missing_countries or extra_countries or stats_mismatches),
+        counts={
+            "csv_airports": len(airports_csv),
+            "db_airports": len(db_airports),
+            "mismatched_fields": len(mismatches),
+            "csv_countries": len(countries_csv),
+            "db_countries": len(db_countries),
+        },
+        findings={
+            "missing_airports": missing_in_db,
+            "extra_airports": extra_in_db,
+            "mismatches": mismatches,
+            "missing_countries": missing_countries,
+            "extra_countries": extra_countries,
+            "stats_mismatches": stats_mismatches,
+            "fts_samples": fts_samples,
+        },
+        rows=len(airports_csv) + len(db_airports) + len(countries_csv) + len(db_countries),
+    )
+
+
+def verify_database() -> int:
+    result = check_database()
+    report(result)
+    return 0 if result.ok else 1
+
+
+def report(result: ValidationResult) -> None:
+    counts = result.counts
+    findings = result.findings
+
+    print(f"Curated airports CSV rows: {counts['csv_airports']}")
+    print(f"Airports in database: {counts['db_airports']}")
+    print(f"Missing airports in database: {findings['missing_airports']}")
+    print(f"Extra airports in database: {findings['extra_airports']}")
+    print(f"Mismatched airport fields: {counts['mismatched_fields']}")
+    if findings["mismatches"]:
+        for line in findings["mismatches"][:10]:
             print(f"  {line}")
 
-    print(f"Curated countries CSV rows: {len(countries_csv)}")
-    print(f"Countries in database: {len(db_countries)}")
-    print(f"Missing countries in database: {missing_countries}")
-    print(f"Extra countries in database: {extra_countries}")
+    print(f"Curated countries CSV rows: {counts['csv_countries']}")
+    print(f"Countries in database: {counts['db_countries']}")
+    print(f"Missing countries in database: {findings['missing_countries']}")
+    print(f"Extra countries in database: {findings['extra_countries']}")
+    print(f"Mismatched country_stats counts: {findings['stats_mismatches'] or 'none'}")
 
-    sample_terms = random.sample(list(airports_csv.keys()), k=min(5, len(airports_csv)))
     print("FTS sample searches:")
-    for iata in sample_terms:
-        airport_name = airports_csv[iata]["name"]
-        match = re.search(r"[A-Za-z0-9]+", airport_name)
-        if not match:
-            continue
-        token = match.group(0)
-        if not token:
-            continue
-        results = list(
-            cur.execute(
-                "SELECT iata, name FROM airport_search WHERE airport_search MATCH ? LIMIT 3",
-                (token,),
-            )
-        )
-        formatted = ", ".join(f"{row['iata']}:{row['name']}" for row in results) or "no hits"
-        print(f"  '{token}' -> {formatted}")
+    for line in findings["fts_samples"]:
+        print(f"  {line}")
 
-    conn.close()
+
+def main() -> None:
+    sys.exit(run_validator("Compare the SQLite database with the curated CSVs.", check_database, report))
 
 
 if __name__ == "__main__":
-    verify_database()
+    main()
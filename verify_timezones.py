@@ -1,101 +1,101 @@
 from __future__ import annotations
 
-import csv
-import json
-from collections import OrderedDict
+import sys
 from pathlib import Path
-from typing import Dict, Iterable, Tuple
+from typing import Dict
+
+from globelog.data import load_airports
+from globelog.timezones import load_timezone_feed, load_timezone_overrides
+from globelog.profiling import PhaseTimer
+from globelog.validation import ValidationResult, run_validator
 
 
 ROOT = Path(__file__).parent
 DATA_DIR = ROOT / "data"
 CURATED_AIRPORTS = DATA_DIR / "curated_airports.csv"
 AIRPORT_TIMEZONES_JSON = DATA_DIR / "airport-timezones.json"
-TIMEZONE_OVERRIDES_PATH = DATA_DIR / "corrections" / "timezone_overrides.json"
-
-
-def load_curated_airports() -> Dict[str, Dict[str, str]]:
-    with CURATED_AIRPORTS.open("r", newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        return {row["iata"]: row for row in reader}
-
-
-def load_overrides() -> Dict[str, str]:
-    if not TIMEZONE_OVERRIDES_PATH.exists():
-        return {}
-    try:
-        data = json.loads(TIMEZONE_OVERRIDES_PATH.read_text(encoding="utf-8"))
-    except json.JSONDecodeError as exc:
-        raise ValueError(f"Invalid JSON in {TIMEZONE_OVERRIDES_PATH}: {exc}") from exc
-    overrides: Dict[str, str] = {}
-    for code, value in data.items():
-        code = (code or "").strip().upper()
-        if not code:
-            continue
-        if isinstance(value, dict):
-            tz = (value.get("timezone") or "").strip()
-            country = (value.get("countryCode") or "").strip()
-        else:
-            tz = (value or "").strip()
-            country = ""
-        if tz:
-            overrides[code] = {"timezone": tz, "countryCode": country}
-    return overrides
 
 
 def load_timezone_map() -> Dict[str, Dict[str, str]]:
-    data = json.loads(AIRPORT_TIMEZONES_JSON.read_text())
-    deduped: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
-    for entry in data:
-        code = (entry.get("code") or "").strip()
-        if not code or code in deduped:
-            continue
-        deduped[code] = {
-            "timezone": (entry.get("timezone") or "").strip(),
-            "countryCode": (entry.get("countryCode") or "").strip(),
-        }
-    overrides = load_overrides()
-    for code, payload in overrides.items():
-        tz = payload.get("timezone", "")
-        country = payload.get("countryCode") or deduped.get(code, {}).get("countryCode", "")
-        if tz:
-            deduped[code] = {"timezone": tz, "countryCode": country}
+    deduped: Dict[str, Dict[str, str]] = {
+        code: {"timezone": entry.timezone, "countryCode": entry.country_code}
+        for code, entry in load_timezone_feed(AIRPORT_TIMEZONES_JSON).items()
+    }
+    for code, entry in load_timezone_overrides().items():
+        country = entry.country_code or deduped.get(code, {}).get("countryCode", "")
+        deduped[code] = {"timezone": entry.timezone, "countryCode": country}
     return deduped
 
 
-def verify_timezones() -> None:
+def check_timezones(profile: bool = False) -> ValidationResult:
     if not CURATED_AIRPORTS.exists():
         raise FileNotFoundError("curated_airports.csv not found. Run process_airports.py first.")
     if not AIRPORT_TIMEZONES_JSON.exists():
         raise FileNotFoundError("airport-timezones.json not found in data/.")
 
-    airports = load_curated_airports()
-    timezones = load_timezone_map()
+    timer = PhaseTimer(profile)
+    with timer.phase("load"):
+        airports = load_airports(CURATED_AIRPORTS)
+        timezones = load_timezone_map()
 
     covered = []
     missing = []
     mismatched_country = []
 
-    for code, airport in airports.items():
-        tz_entry = timezones.get(code)
-        if tz_entry is None or not tz_entry["timezone"]:
-            missing.append(code)
-            continue
-        covered.append(code)
-        if tz_entry["countryCode"] and tz_entry["countryCode"] != airport["iso_country"]:
-            mismatched_country.append((code, airport["iso_country"], tz_entry["countryCode"]))
-
-    print(f"Curated airports: {len(airports)}")
-    print(f"Timezones available: {len(timezones)} (deduped)")
-    print(f"Covered airports: {len(covered)} ({len(covered)/len(airports)*100:.2f}%)")
+    with timer.phase("compare"):
+        for code, airport in airports.items():
+            tz_entry = timezones.get(code)
+            if tz_entry is None or not tz_entry["timezone"]:
+                missing.append(code)
+                continue
+            covered.append(code)
+            if tz_entry["countryCode"] and tz_entry["countryCode"] != airport.iso_country:
+                mismatched_country.append(
+                    f"{code}: curated={airport.iso_country}, tz_source={tz_entry['countryCode']}"
+                )
+
+    return ValidationResult.timed(
+        timer,
+        "verify_timezones",
+        ok=not missing,
+        counts={
+            "airports": len(airports),
+            "timezones": len(timezones),
+            "covered": len(covered),
+            "missing": len(missing),
+            "country_mismatches": len(mismatched_country),
+        },
+        findings={"missing": missing, "country_mismatches": mismatched_country},
+        rows=len(airports) + len(timezones),
+    )
+
+
+def verify_timezones() -> int:
+    result = check_timezones()
+    report(result)
+    return 0 if result.ok else 1
+
+
+def report(result: ValidationResult) -> None:
+    counts = result.counts
+    missing = result.findings["missing"]
+    mismatched_country = result.findings["country_mismatches"]
+
+    print(f"Curated airports: {counts['airports']}")
+    print(f"Timezones available: {counts['timezones']} (deduped)")
+    print(f"Covered airports: {counts['covered']} ({counts['covered']/counts['airports']*100:.2f}%)")
     print(f"Missing airports: {len(missing)}")
     if missing:
         print("Missing codes:", ", ".join(missing))
 
     print(f"Country mismatches: {len(mismatched_country)}")
-    for code, expected_country, tz_country in mismatched_country[:10]:
-        print(f"  {code}: curated={expected_country}, tz_source={tz_country}")
+    for line in mismatched_country[:10]:
+        print(f"  {line}")
+
+
+def main() -> None:
+    sys.exit(run_validator("Check curated airports against the timezone feed.", check_timezones, report))
 
 
 if __name__ == "__main__":
-    verify_timezones()
+    main()